@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.11"
+# dependencies = []
+# ///
+
+import argparse
+import glob
+import hashlib
+import os
+import re
+import subprocess
+import sys
+import tarfile
+from pathlib import Path, PureWindowsPath
+from typing import IO
+
+from construct_matrix import matches_filters
+
+
+def outside_cwd(path: str) -> bool:
+    """Whether a path or pattern is absolute or climbs out of the directory it is relative to with '..'."""
+    return path.startswith(("/", "\\", "~")) or bool(PureWindowsPath(path).drive) or ".." in re.split(r"[\\/]", path)
+
+
+def collect_files(cwd: Path, patterns: list[str]) -> list[str]:
+    """Files matched by the upload-artifact style patterns, relative to cwd.
+
+    A directory matches every file below it, and a '!pattern' excludes the files matching it or below a matching directory.
+    Files outside cwd are an error, the archive stores every file by its path relative to cwd.
+    """
+    excludes = [pattern[1:] for pattern in patterns if pattern.startswith("!")]
+    files: dict[str, None] = {}
+    for pattern in patterns:
+        if pattern.startswith("!"):
+            continue
+        for match in sorted(glob.glob(pattern, root_dir=cwd, recursive=True)):
+            path = cwd / match
+            candidates = sorted(p for p in path.rglob("*") if not p.is_dir()) if path.is_dir() else [path]
+            for candidate in candidates:
+                name = Path(os.path.relpath(candidate, cwd)).as_posix()
+                if outside_cwd(name):
+                    raise ValueError(f"{candidate} is outside {cwd}, an archive can only hold paths below it")
+                files[name] = None
+
+    def excluded(name: str) -> bool:
+        parts = name.split("/")
+        return any(matches_filters("/".join(parts[:i]), excludes) for i in range(1, len(parts) + 1))
+
+    return [name for name in files if not excluded(name)]
+
+
+def hash_file(path: Path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def write_archive(cwd: Path, files: list[str], fileobj: IO[bytes]) -> tuple[int, int]:
+    """Write files as a tar stream, storing files with identical content once and the copies as hard links.
+
+    Returns the number of files and of deduplicated copies.
+    """
+    stored: dict[tuple[int, str], str] = {}
+    duplicates = 0
+    with tarfile.open(fileobj=fileobj, mode="w|") as tar:
+        for name in files:
+            path = cwd / name
+            info = tar.gettarinfo(path, arcname=name)
+            if not info.isfile():
+                tar.addfile(info)
+                continue
+
+            key = (info.size, hash_file(path))
+            if key in stored:
+                info.type = tarfile.LNKTYPE
+                info.linkname = stored[key]
+                info.size = 0
+                tar.addfile(info)
+                duplicates += 1
+            else:
+                stored[key] = name
+                with open(path, "rb") as f:
+                    tar.addfile(info, f)
+    return len(files), duplicates
+
+
+def archive_files(cwd: Path, files: list[str], output: Path, level: int) -> tuple[int, int]:
+    """Pack files relative to cwd into one zstd compressed tar archive, which uploads far faster than many small files."""
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with subprocess.Popen(["zstd", "-q", "-f", "-T0", f"-{level}", "-o", str(output)], stdin=subprocess.PIPE) as zstd:
+        assert zstd.stdin is not None
+        with zstd.stdin:
+            counts = write_archive(cwd, files, zstd.stdin)
+    if zstd.returncode != 0:
+        raise OSError(f"zstd failed with exit code {zstd.returncode}")
+    return counts
+
+
+def create_archive(cwd: Path, patterns: list[str], output: Path, level: int) -> tuple[int, int]:
+    files = collect_files(cwd, patterns)
+    if not files:
+        raise ValueError(f"No files found matching {patterns}")
+    return archive_files(cwd, files, output, level)
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Pack artifact paths into a deduplicated tar.zst archive before uploading it")
+
+    parser.add_argument("--cwd", required=True, type=Path, help="Directory the paths are relative to, the workspace")
+    parser.add_argument("--paths", required=True, help="Newline separated paths and glob patterns, '!' excludes")
+    parser.add_argument("--output", required=True, type=Path, help="Archive file to create")
+    parser.add_argument("--level", type=int, default=3, help="zstd compression level")
+
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_arguments()
+
+    try:
+        patterns = [line.strip() for line in args.paths.splitlines() if line.strip()]
+        files, duplicates = create_archive(args.cwd, patterns, args.output, args.level)
+        print(f"Archived {files} files to {args.output}, {duplicates} identical copies stored as links")
+
+    except (OSError, ValueError) as e:
+        sys.stderr.write(f"Error: {e}\n")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,22 @@
 #!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.11"
+# dependencies = []
+# ///
 
 import argparse
 import json
+import math
+import re
 import sys
-from typing import Any, cast
+from functools import cache
+from pathlib import Path
+from typing import Any, Final, cast
+
+# phases whose time shrinks with the cores of the runner, setup, configure, package and upload are taken as serial,
+# also as the prefix of the per preset and rerun phases such as build-<preset> and test-rerun
+SCALING_PHASES: Final[tuple[str, ...]] = ("build", "test")
+RUNNER_KEYS: Final[frozenset[str]] = frozenset({"label", "cores", "cost_per_minute"})
 
 
 def parse_json(json_str: str) -> dict[str, Any]:
@@ -13,21 +26,317 @@ def parse_json(json_str: str) -> dict[str, Any]:
         raise ValueError(f"JSON decode error: {err}")
 
 
-def construct_matrix(presets: dict[str, dict[str, Any]], default_runs_on: str, default_toolchain: str) -> dict[str, list[dict[str, Any]]]:
+def read_changed_files(path: Path) -> list[str]:
+    return [line.strip() for line in path.read_text().splitlines() if line.strip()]
+
+
+@cache
+def compile_filter_pattern(pattern: str) -> re.Pattern[str]:
+    """Translate a GitHub workflow path filter pattern into a regular expression."""
+    regex = ""
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+        elif pattern.startswith("**", i):
+            regex += ".*"
+            i += 2
+        elif pattern[i] == "*":
+            regex += "[^/]*"
+            i += 1
+        elif pattern[i] == "?":
+            regex += "[^/]"
+            i += 1
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+    return re.compile(regex)
+
+
+def matches_filters(path: str, patterns: list[str]) -> bool:
+    """Match path against the patterns in order, where a later '!pattern' excludes earlier matches."""
+    matched = False
+    for pattern in patterns:
+        if pattern.startswith("!"):
+            if matched and compile_filter_pattern(pattern[1:]).fullmatch(path):
+                matched = False
+        elif not matched and compile_filter_pattern(pattern).fullmatch(path):
+            matched = True
+    return matched
+
+
+def is_affected(config: dict[str, Any], changed_files: list[str]) -> bool:
+    if "paths" not in config and "paths-ignore" not in config:
+        return True
+
+    for path in changed_files:
+        if "paths" in config and not matches_filters(path, config["paths"]):
+            continue
+        if matches_filters(path, config.get("paths-ignore", [])):
+            continue
+        return True
+    return False
+
+
+def prune_presets(presets: dict[str, dict[str, Any]], changed_files: list[str] | None) -> list[str]:
+    """Names of the presets whose path filters match none of the changed files.
+
+    Without changed files, as for a tag push or an empty diff, nothing is pruned since there is nothing to match against.
+    """
+    if not changed_files:
+        return []
+    return [name for name, config in presets.items() if not is_affected(config, changed_files)]
+
+
+def pack_entries(entries: list[dict[str, Any]], max_presets_per_job: int) -> tuple[list[dict[str, Any]], dict[str, list[dict[str, Any]]]]:
+    """Bin-pack entries sharing runs-on and toolchain into batches of at most max_presets_per_job."""
+    buckets: dict[tuple[str, str], list[dict[str, Any]]] = {}
+    for entry in entries:
+        buckets.setdefault((entry["runs-on"], entry["toolchain"]), []).append(entry)
+
+    singles: list[dict[str, Any]] = []
+    batches: dict[str, list[dict[str, Any]]] = {}
+    for bucket in buckets.values():
+        for i in range(0, len(bucket), max_presets_per_job):
+            chunk = bucket[i : i + max_presets_per_job]
+            if len(chunk) == 1:
+                singles.append(chunk[0])
+            else:
+                batches["+".join(entry["preset"] for entry in chunk)] = chunk
+    return singles, batches
+
+
+def batch_entries(entries: list[dict[str, Any]], presets: dict[str, dict[str, Any]], max_presets_per_job: int) -> list[dict[str, Any]]:
+    """Pack entries sharing a group, or runs-on and toolchain up to max_presets_per_job, into one entry each."""
+    batches: dict[str, list[dict[str, Any]]] = {}
+    singles: list[dict[str, Any]] = []
+
+    sharded: list[dict[str, Any]] = []
+
+    for entry in entries:
+        group = presets[entry["preset"]].get("group")
+        if group and "shard" in entry:
+            raise ValueError(f"Preset '{entry['preset']}' in group '{group}' cannot shard its tests")
+        if group and "split" in entry:
+            raise ValueError(f"Preset '{entry['preset']}' in group '{group}' cannot split its tests into other jobs")
+        if group:
+            batches.setdefault(group, []).append(entry)
+        elif "shard" in entry or "split" in entry:
+            sharded.append(entry)
+        else:
+            singles.append(entry)
+
+    if max_presets_per_job > 1:
+        singles, packed = pack_entries(singles, max_presets_per_job)
+        batches.update(packed)
+
+    result = singles + sharded
+    for name, members in batches.items():
+        if name in presets and presets[name].get("group") != name:
+            raise ValueError(f"Group '{name}' has the same name as a preset outside the group")
+        if len({(member["runs-on"], member["toolchain"]) for member in members}) > 1:
+            raise ValueError(f"Presets in group '{name}' must share runs-on and toolchain")
+
+        result.append({"preset": name, "runs-on": members[0]["runs-on"], "toolchain": members[0]["toolchain"], "presets": members})
+
+    return result
+
+
+def construct_matrix(
+    presets: dict[str, dict[str, Any]],
+    default_runs_on: str,
+    default_toolchain: str,
+    changed_files: list[str] | None = None,
+    max_presets_per_job: int = 1,
+) -> dict[str, list[dict[str, Any]]]:
     include_list = []
+    pruned = prune_presets(presets, changed_files)
 
     for name, config in presets.items():
+        if name in pruned:
+            continue
+
         runs_on = config.get("runs-on", default_runs_on)
         toolchain = config.get("toolchain", default_toolchain)
 
         entry = {"preset": name, "runs-on": runs_on, "toolchain": toolchain}
 
-        if "artifact" in config:
-            entry["artifact"] = config["artifact"]
+        for key in (
+            "artifact",
+            "cache",
+            "incremental",
+            "parallel",
+            "memory_per_job_mb",
+            "related_presets",
+            "critical",
+            "log_limit_mb",
+            "unity_build",
+            "pch",
+            "linker",
+        ):
+            if key in config:
+                entry[key] = config[key]
+
+        test_options = {key: value for key, value in config.get("test", {}).items() if key != "shards"}
+        if test_options:
+            entry["test_options"] = test_options
 
-        include_list.append(entry)
+        shards = config.get("test", {}).get("shards", 1)
+        # a split preset builds once, its test shards become jobs of the test matrix
+        if config.get("split"):
+            include_list.append(entry | {"split": {"shards": shards}})
+        elif shards > 1:
+            include_list.extend(entry | {"shard": {"index": index, "count": shards}} for index in range(1, shards + 1))
+        else:
+            include_list.append(entry)
 
-    return {"include": include_list}
+    return {"include": batch_entries(include_list, presets, max_presets_per_job)}
+
+
+def parse_runners(json_str: str) -> list[dict[str, Any]]:
+    runners = json.loads(json_str) if json_str.strip() else []
+    if not isinstance(runners, list) or not all(isinstance(runner, dict) and RUNNER_KEYS <= runner.keys() for runner in runners):
+        raise ValueError("Runners must be a list of objects with label, cores and cost_per_minute")
+    for runner in runners:
+        for key in ("cores", "cost_per_minute"):
+            value = runner[key]
+            if isinstance(value, bool) or not isinstance(value, int | float) or value <= 0:
+                raise ValueError(f"Runner '{runner['label']}' must have a positive number as {key}, got {json.dumps(value)}")
+    return runners
+
+
+def entry_label(entry: dict[str, Any]) -> str:
+    """Name of the timing records of a matrix entry, as generate_steps.timing_label names them."""
+    shard = entry.get("shard")
+    return f"{entry['preset']}-{shard['index']}of{shard['count']}" if shard else cast(str, entry["preset"])
+
+
+def estimate_seconds(timing: dict[str, Any], measured_cores: int, cores: int) -> float:
+    """Wall time of a previous run scaled to a runner with cores, assuming the build and test phases scale linearly."""
+    scaling = sum(seconds for phase, seconds in timing["phases"].items() if phase.split("-", 1)[0] in SCALING_PHASES)
+    return float(timing["seconds"] - scaling + scaling * measured_cores / cores)
+
+
+def runner_cost(runner: dict[str, Any], seconds: float) -> float:
+    # runners are billed per started minute
+    return float(math.ceil(seconds / 60) * runner["cost_per_minute"])
+
+
+def entry_estimates(entry: dict[str, Any], timings: dict[str, dict[str, Any]], runners: list[dict[str, Any]], default_cores: int) -> list[float] | None:
+    """Estimated wall time of the entry on every runner, None unless every preset of the entry has timings."""
+    labels = [entry_label(member) for member in entry.get("presets", [entry])]
+    if any(label not in timings for label in labels):
+        return None
+    # the setup and upload of a batch are recorded under the batch name
+    if "presets" in entry and entry["preset"] in timings:
+        labels.append(entry["preset"])
+    return [sum(estimate_seconds(timings[label], timings[label].get("cpus") or default_cores, runner["cores"]) for label in labels) for runner in runners]
+
+
+def upgrade_slowest(estimates: list[list[float]], choice: list[int], runners: list[dict[str, Any]], budget: float | None) -> None:
+    """Move the slowest entry to the next bigger runner that makes it faster, until that exceeds the budget."""
+    while True:
+        cost = sum(runner_cost(runners[k], estimates[i][k]) for i, k in enumerate(choice))
+        slowest = max(range(len(choice)), key=lambda i: estimates[i][choice[i]])
+        current = choice[slowest]
+        upgrades = (
+            k
+            for k in range(current + 1, len(runners))
+            if estimates[slowest][k] < estimates[slowest][current]
+            and (
+                budget is None or cost - runner_cost(runners[current], estimates[slowest][current]) + runner_cost(runners[k], estimates[slowest][k]) <= budget
+            )
+        )
+        upgrade = next(upgrades, None)
+        if upgrade is None:
+            return
+        choice[slowest] = upgrade
+
+
+def trim_to_wall_time(estimates: list[list[float]], choice: list[int], runners: list[dict[str, Any]]) -> None:
+    """Move every entry to the cheapest runner that still finishes within the current wall time."""
+    wall = max(estimates[i][k] for i, k in enumerate(choice))
+    for i, seconds in enumerate(estimates):
+        choice[i] = min((k for k in range(len(runners)) if seconds[k] <= wall), key=lambda k: (runner_cost(runners[k], seconds[k]), runners[k]["cores"]))
+
+
+def balance_runners(
+    matrix: dict[str, list[dict[str, Any]]],
+    presets: dict[str, dict[str, Any]],
+    default_runs_on: str,
+    report: dict[str, Any],
+    runners: list[dict[str, Any]],
+    budget: float | None = None,
+) -> dict[str, Any]:
+    """Pick a runner for every matrix entry on the default runs-on, minimising the wall time of the run within the cost budget.
+
+    The time of an entry on a runner is estimated from the timing report of a previous run. Entries whose presets set runs-on
+    or have no timings keep the default runner. A moved entry gets a runner key, its runs-on still selects the setup actions.
+    """
+    runners = sorted(runners, key=lambda runner: (runner["cores"], runner["cost_per_minute"]))
+    default = next((index for index, runner in enumerate(runners) if runner["label"] == default_runs_on), None)
+    if default is None:
+        raise ValueError(f"Runners must include the default runs-on '{default_runs_on}'")
+    timings = {timing["preset"]: timing for timing in report.get("presets", [])}
+
+    entries: list[dict[str, Any]] = []
+    estimates: list[list[float]] = []
+    unbalanced: list[str] = []
+    for entry in matrix["include"]:
+        members = entry.get("presets", [entry])
+        if entry["runs-on"] != default_runs_on or any("runs-on" in presets.get(member["preset"], {}) for member in members):
+            continue
+        entry_estimate = entry_estimates(entry, timings, runners, runners[default]["cores"])
+        if entry_estimate is None:
+            unbalanced.append(entry_label(entry))
+        else:
+            entries.append(entry)
+            estimates.append(entry_estimate)
+
+    decision: dict[str, Any] = {"budget": budget, "legs": [], "unbalanced": unbalanced}
+    if not entries:
+        return decision
+
+    # shed the cost of the light entries first, spend it on the slowest ones, then shed what the new wall time allows
+    choice = [default] * len(entries)
+    trim_to_wall_time(estimates, choice, runners)
+    upgrade_slowest(estimates, choice, runners, budget)
+    trim_to_wall_time(estimates, choice, runners)
+
+    for entry, seconds, k in zip(entries, estimates, choice):
+        if runners[k]["label"] != entry["runs-on"]:
+            entry["runner"] = runners[k]["label"]
+        decision["legs"].append(
+            {"leg": entry_label(entry), "runner": runners[k]["label"], "seconds": round(seconds[k], 1), "cost": runner_cost(runners[k], seconds[k])}
+        )
+    decision["wall_seconds"] = max(leg["seconds"] for leg in decision["legs"])
+    decision["cost"] = round(sum(leg["cost"] for leg in decision["legs"]), 4)
+    return decision
+
+
+def load_runner_decision(
+    matrix: dict[str, list[dict[str, Any]]],
+    presets: dict[str, dict[str, Any]],
+    default_runs_on: str,
+    timings: Path | None,
+    runners_json: str | None,
+    budget: float,
+) -> dict[str, Any]:
+    """Balance the runners when both the timings of a previous run and the runners to choose from are given."""
+    runners = parse_runners(runners_json or "")
+    if not timings or not runners:
+        return {}
+    return balance_runners(matrix, presets, default_runs_on, json.loads(timings.read_text()), runners, budget or None)
+
+
+def add_runner_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--timings", type=Path, help="Timing report JSON of a previous run, written by timing_report.py --output")
+    parser.add_argument(
+        "--runners",
+        help="JSON list of runners to choose from for the presets on the default runs-on, each with label, cores and cost_per_minute",
+    )
+    parser.add_argument("--runner-budget", type=float, default=0, help="Estimated cost the balanced runners may add up to (default: no limit)")
 
 
 def parse_arguments() -> argparse.Namespace:
@@ -36,6 +345,18 @@ def parse_arguments() -> argparse.Namespace:
     parser.add_argument("--default-runs-on", required=True, help="Default runs-on parameter")
     parser.add_argument("--default-toolchain", required=True, help="Default toolchain parameter")
     parser.add_argument("--presets", required=True, help="Presets json object")
+    parser.add_argument(
+        "--changed-files",
+        type=Path,
+        help="File listing the changed files, one per line. Presets whose paths/paths-ignore filters match none of them are pruned",
+    )
+    parser.add_argument(
+        "--max-presets-per-job",
+        type=int,
+        default=1,
+        help="Pack up to this many ungrouped presets sharing runs-on and toolchain into one job",
+    )
+    add_runner_arguments(parser)
 
     return parser.parse_args()
 
@@ -46,12 +367,17 @@ def main() -> None:
     try:
         presets_data = parse_json(args.presets)
 
-        matrix = construct_matrix(presets_data, args.default_runs_on, args.default_toolchain)
+        changed_files = read_changed_files(args.changed_files) if args.changed_files else None
+
+        matrix = construct_matrix(presets_data, args.default_runs_on, args.default_toolchain, changed_files, args.max_presets_per_job)
+        runners = load_runner_decision(matrix, presets_data, args.default_runs_on, args.timings, args.runners, args.runner_budget)
 
         matrix_json = json.dumps(matrix)
         print(f"matrix={matrix_json}")
+        print(f"pruned={json.dumps(prune_presets(presets_data, changed_files))}")
+        print(f"runners={json.dumps(runners)}")
 
-    except ValueError as e:
+    except (ValueError, OSError) as e:
         sys.stderr.write(f"Error: {e}\n")
         sys.exit(1)
 
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.11"
+# dependencies = []
+# ///
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tarfile
+from pathlib import Path
+from typing import Any, Final
+
+from archive_artifact import archive_files, outside_cwd
+
+# read by ctest itself, besides the CTestTestfile.cmake of every directory
+CTEST_FILES: Final[tuple[str, ...]] = ("CMakeCache.txt", "DartConfiguration.tcl", "CTestCustom.cmake")
+# tests load the shared libraries of the project from the build tree
+SHARED_LIBRARY: Final[re.Pattern[str]] = re.compile(r".+\.(?:so(?:\.\d+)*|dylib|dll)")
+# CTestTestfile.cmake and the files generated by gtest_discover_tests include further test lists
+INCLUDE: Final[re.Pattern[str]] = re.compile(r'include\("([^"]+)"\)')
+TEST_PATH_PROPERTIES: Final[tuple[str, ...]] = ("REQUIRED_FILES", "WORKING_DIRECTORY")
+
+
+def list_tests(test_presets: list[str], cwd: Path) -> list[dict[str, Any]]:
+    """Tests of the test presets as resolved by ctest --show-only=json-v1, without running them."""
+    tests: list[dict[str, Any]] = []
+    for preset in test_presets:
+        result = subprocess.run(["ctest", "--preset", preset, "--show-only=json-v1"], cwd=cwd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise OSError(f"ctest --preset {preset} --show-only=json-v1 failed: {result.stderr.strip()}")
+        tests += json.loads(result.stdout).get("tests", [])
+    return tests
+
+
+def included_files(path: Path, seen: set[Path]) -> None:
+    """Add path and every existing file it includes, recursively, to seen."""
+    seen.add(path)
+    for match in INCLUDE.finditer(path.read_text(errors="replace")):
+        included = Path(match.group(1))
+        if included.is_file() and included not in seen:
+            included_files(included, seen)
+
+
+def referenced_paths(tests: list[dict[str, Any]]) -> set[Path]:
+    """Every path a test refers to, from its command line, required files and working directory."""
+    paths: set[Path] = set()
+    for test in tests:
+        paths.update(Path(arg) for arg in test.get("command", []))
+        for prop in test.get("properties", []):
+            if prop["name"] in TEST_PATH_PROPERTIES:
+                values = prop["value"] if isinstance(prop["value"], list) else [prop["value"]]
+                paths.update(Path(value) for value in values)
+    return paths
+
+
+def snapshot_files(tests: list[dict[str, Any]], binary_dir: Path, workspace: Path) -> list[str]:
+    """Files and directories of the binary directory ctest needs to run the tests, relative to the workspace.
+
+    The source tree is checked out by the test job, so only paths below the binary directory are included.
+    """
+    binary_dir = Path(os.path.normpath(binary_dir))
+    paths: set[Path] = {binary_dir / name for name in CTEST_FILES}
+    for testfile in binary_dir.rglob("CTestTestfile.cmake"):
+        included_files(testfile, paths)
+    paths.update(path for path in binary_dir.rglob("*") if SHARED_LIBRARY.fullmatch(path.name))
+    paths.update(path if path.is_absolute() else binary_dir / path for path in referenced_paths(tests))
+
+    selected = set()
+    for path in paths:
+        path = Path(os.path.normpath(path))
+        # a working directory is created empty, its contents are listed as required files when the tests need them
+        if path.is_relative_to(binary_dir) and (path.is_file() or path.is_dir()):
+            selected.add(path.relative_to(workspace).as_posix())
+    return sorted(selected)
+
+
+def create_snapshot(test_presets: list[str], cwd: Path, binary_dir: Path, workspace: Path, archive: Path) -> tuple[int, int]:
+    files = snapshot_files(list_tests(test_presets, cwd), workspace / binary_dir, workspace)
+    return archive_files(workspace, files, archive, 3)
+
+
+def extract_member(tar: tarfile.TarFile, member: tarfile.TarInfo, workspace: Path) -> None:
+    if hasattr(tarfile, "data_filter"):
+        tar.extract(member, workspace, filter="data")
+        return
+    # the extraction filters are missing before Python 3.11.4, refuse the paths and links outside the workspace they would
+    if outside_cwd(member.name) or (member.issym() or member.islnk()) and outside_cwd(member.linkname):
+        raise ValueError(f"{member.name} is outside the workspace, refusing to extract it")
+    tar.extract(member, workspace)
+
+
+def extract_snapshot(archive: Path, workspace: Path) -> int:
+    """Unpack a snapshot into the workspace, at the paths the build job wrote it from."""
+    with subprocess.Popen(["zstd", "-q", "-d", "-c", str(archive)], stdout=subprocess.PIPE) as zstd:
+        assert zstd.stdout is not None
+        with tarfile.open(fileobj=zstd.stdout, mode="r|") as tar:
+            members = 0
+            for member in tar:
+                extract_member(tar, member, workspace)
+                members += 1
+    if zstd.returncode != 0:
+        raise OSError(f"zstd failed with exit code {zstd.returncode}")
+    return members
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Snapshot the part of a binary directory ctest needs, so tests run in other jobs without rebuilding")
+
+    parser.add_argument("action", choices=["create", "extract"], help="Create the snapshot after the build, or extract it before the tests")
+    parser.add_argument("--archive", required=True, type=Path, help="Snapshot tar.zst file")
+    parser.add_argument("--workspace", required=True, type=Path, help="Directory the snapshot paths are relative to, the workspace")
+    parser.add_argument("--preset", action="append", default=[], help="Test preset whose tests the snapshot must run, repeatable")
+    parser.add_argument("--binary-dir", type=Path, help="Binary directory of the configure preset, relative to the workspace")
+
+    args = parser.parse_args()
+    if args.action == "create" and not (args.preset and args.binary_dir):
+        parser.error("create requires --preset and --binary-dir")
+    return args
+
+
+def main() -> None:
+    args = parse_arguments()
+
+    try:
+        if args.action == "create":
+            files, duplicates = create_snapshot(args.preset, Path.cwd(), args.binary_dir, args.workspace, args.archive)
+            print(f"Snapshot of {files} files and directories written to {args.archive}, {duplicates} identical copies stored as links")
+        else:
+            members = extract_snapshot(args.archive, args.workspace)
+            print(f"Extracted {members} files and directories from {args.archive}")
+
+    except (OSError, ValueError, tarfile.TarError) as e:
+        sys.stderr.write(f"Error: {e}\n")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
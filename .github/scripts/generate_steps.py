@@ -1,29 +1,101 @@
 #!/usr/bin/env python3
 
 import argparse
+import hashlib
 import json
 import os
+import shlex
 import sys
+from collections.abc import Callable
 from pathlib import Path
 from typing import Any, Final, cast
 
-from cmakepresets import CMakePresets
-from cmakepresets.constants import CONFIGURE
-from cmakepresets.paths import CMakeRoot
+from archive_artifact import outside_cwd
+from parallelism import detect_parallelism
 
+# cmakepresets is only imported once a project is parsed, so --help, argument errors and presets cache hits start fast
+from presets_cache import CONFIGURE, Presets, Root, SourceRoot, load_presets
 
-def get_related_preset_names(presets: CMakePresets, preset: str) -> dict[str, list[str]]:
+
+def get_related_preset_names(presets: "Presets", preset: str) -> dict[str, list[str]]:
     all_related = presets.find_related_presets(preset)
 
     result: dict[str, list[str]] = {}
     if all_related:
         for preset_type, presets_list in all_related.items():
-            preset_names = [p.get("name") for p in presets_list if p.get("name")]
+            preset_names = [p["name"] for p in presets_list if p.get("name")]
             result[preset_type] = preset_names
 
     return result
 
 
+def parse_boolean(x: str) -> bool:
+    positive_values = ["true", "1", "yes", "y", "on"]
+    negative_values = ["false", "0", "no", "n", "off"]
+
+    value_lower = x.lower()
+    if value_lower in positive_values:
+        return True
+    elif value_lower in negative_values:
+        return False
+    else:
+        print(f"\n\nWarning: '{x}' is not a valid boolean value. Expected one of: {positive_values + negative_values}\n\n")
+        raise argparse.ArgumentTypeError(f"Invalid boolean value: '{x}'")
+
+
+def json_object_parser(option: str, help_text: str) -> Callable[[str], dict[str, Any]]:
+    def parse_json_object(x: str) -> dict[str, Any]:
+        if str(x).strip() == "" or str(x).strip() == "''":
+            x = "{}"
+        try:
+            return cast(dict[str, Any], json.loads(x))
+        except Exception:
+            print(f"Error parsing {option}: {help_text}")
+            raise
+
+    return parse_json_object
+
+
+def parse_shard(x: str) -> dict[str, int]:
+    try:
+        index, count = (int(part) for part in x.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid shard: '{x}', expected INDEX/COUNT")
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"Invalid shard: '{x}', INDEX must be between 1 and COUNT")
+    return {"index": index, "count": count}
+
+
+def parse_parallel(x: str) -> int | str:
+    if x == "auto":
+        return x
+    try:
+        parallel = int(x)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid parallel level: '{x}', expected an integer or 'auto'")
+    if parallel < 1:
+        raise argparse.ArgumentTypeError(f"Invalid parallel level: '{x}', expected at least 1")
+    return parallel
+
+
+def parse_repeat_until_pass(x: str) -> int:
+    try:
+        attempts = int(x)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid repeat until pass: '{x}', expected an integer")
+    # the first run counts as one, so anything below 2 leaves no rerun
+    if attempts < 2:
+        raise argparse.ArgumentTypeError(f"Invalid repeat until pass: '{x}', expected at least 2")
+    return attempts
+
+
+def parse_unity_build(x: str) -> bool | int:
+    # 0 and 1 are booleans, larger numbers the batch size
+    if x.isdigit() and int(x) > 1:
+        return int(x)
+    return parse_boolean(x)
+
+
 def parse_arguments() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Generate build steps from preset")
 
@@ -34,19 +106,6 @@ def parse_arguments() -> argparse.Namespace:
         help="Root directory of the CMake project",
     )
 
-    def parse_boolean(x: str) -> bool:
-        positive_values = ["true", "1", "yes", "y", "on"]
-        negative_values = ["false", "0", "no", "n", "off"]
-
-        value_lower = x.lower()
-        if value_lower in positive_values:
-            return True
-        elif value_lower in negative_values:
-            return False
-        else:
-            print(f"\n\nWarning: '{x}' is not a valid boolean value. Expected one of: {positive_values + negative_values}\n\n")
-            raise argparse.ArgumentTypeError(f"Invalid boolean value: '{x}'")
-
     parser.add_argument(
         "--default-store-artifact",
         type=parse_boolean,
@@ -62,38 +121,274 @@ def parse_arguments() -> argparse.Namespace:
     parser.add_argument("--preset", required=True, type=str, help="The preset to use")
 
     artifact_help: Final[str] = '\n\nThe artifact configuration as JSON (e.g., {"path": ["dir1", "dir2", "!dir1/**/*.md"], "retention_days": 5})\n\n'
+    parser.add_argument("--artifact", type=json_object_parser("--artifact", artifact_help), default={}, help=artifact_help)
 
-    def parse_artifact(x: str) -> dict[str, list[str] | int]:
-        if str(x).strip() == "" or str(x).strip() == "''":
-            x = "{}"
-        try:
-            return cast(dict[str, Any], json.loads(x))
-        except Exception:
-            print(f"Error parsing --artifact: {artifact_help}")
-            raise
+    cache_help: Final[str] = '\n\nThe compiler cache configuration as JSON (e.g., {"launcher": "ccache", "max_size": "500M"})\n\n'
+    parser.add_argument("--cache", type=json_object_parser("--cache", cache_help), default={}, help=cache_help)
+
+    parser.add_argument(
+        "--incremental",
+        type=parse_boolean,
+        default=False,
+        help="Cache the binary directory between runs (true/false/yes/no/1/0)",
+    )
+
+    parser.add_argument("--shard", type=parse_shard, help="Run only this slice of the tests, as INDEX/COUNT (e.g. 2/4)")
+    parser.add_argument("--test-timeout", type=int, help="Seconds a single test may run before ctest stops it")
+    parser.add_argument(
+        "--repeat-until-pass", type=parse_repeat_until_pass, help="Rerun the failed tests until they pass, running every test at most this many times"
+    )
+    parser.add_argument(
+        "--junit",
+        type=parse_boolean,
+        default=False,
+        help="Write the test results as JUnit XML to $CMAKE_BUILDER_JUNIT (true/false/yes/no/1/0)",
+    )
+
+    parser.add_argument(
+        "--related-presets",
+        choices=["first", "all"],
+        default="first",
+        help="Run the first related build/test/package preset, or all of them against the one configured tree",
+    )
+
+    parser.add_argument("--parallel", type=parse_parallel, help="Parallel level for build and test, an integer or 'auto' for the CPU count")
+    parser.add_argument("--memory-per-job-mb", type=int, help="Cap an 'auto' parallel level so every job gets this much memory")
+    parser.add_argument("--log-limit-mb", type=int, help="Cap the log output of every command, keeping the full logs gzipped")
+
+    parser.add_argument("--unity-build", type=parse_unity_build, help="Unity build, true/false or the number of sources per unity file")
+    parser.add_argument("--pch", type=parse_boolean, help="Use (true) or disable (false) the precompiled headers of the project")
+    parser.add_argument("--linker", choices=list(LINKER_TYPES), help="Linker set as CMAKE_LINKER_TYPE")
+    parser.add_argument(
+        "--split",
+        type=int,
+        metavar="SHARDS",
+        help="Only build, and output a snapshot config and test jobs running the tests from it in this many shards",
+    )
+
+    parser.add_argument(
+        "--timing",
+        type=parse_boolean,
+        default=False,
+        help="Wrap the commands to record wall time, peak RSS and exit code (true/false/yes/no/1/0)",
+    )
 
-    parser.add_argument("--artifact", type=parse_artifact, default={}, help=artifact_help)
+    parser.add_argument(
+        "--ninja-report",
+        type=parse_boolean,
+        default=False,
+        help="Output a config for analysing the .ninja_log of the binary directory (true/false/yes/no/1/0)",
+    )
+
+    parser.add_argument("--presets-cache", type=Path, help="Resolved presets cache file, reused while the presets files are unchanged")
+
+    parser.add_argument("--toolchain", default="", help="Toolchain of the matrix leg, used for cache keys")
+    parser.add_argument("--runs-on", default="", help="runs-on of the matrix leg, used for cache keys and the linkers available")
 
     return parser.parse_args()
 
 
-def generate_steps(related_presets: dict[str, list[str]]) -> dict[str, str]:
-    steps: dict[str, str] = {"build": "", "test": "", "package": ""}
-    if "build" in related_presets and related_presets["build"]:
-        build_preset = related_presets["build"][0]
-        steps["build"] = f"cmake --build --preset {build_preset}"
+def configure_command(preset: str) -> str:
+    return f"cmake --preset {preset}"
+
+
+def preflight_command(configure_cmd: str) -> str:
+    """The configure command of a leg discarding any CMakeCache.txt, to catch broken CMakeLists and presets before the matrix fans out."""
+    return f"{configure_cmd} --fresh"
+
+
+JUNIT_DIR: Final[str] = "$CMAKE_BUILDER_JUNIT"
+
+
+def ctest_options(name: str, shard: dict[str, int] | None, test_options: dict[str, Any], suffix: str = "") -> str:
+    """--timeout and --output-junit options of a test preset, the JUnit file named after the preset, shard and suffix."""
+    options = ""
+    if test_options.get("timeout"):
+        options += f" --timeout {test_options['timeout']}"
+    if test_options.get("junit"):
+        options += f' --output-junit "{JUNIT_DIR}/{timing_label(name, shard)}{suffix}.xml"'
+    return options
+
+
+def generate_steps(
+    related_presets: dict[str, list[str]],
+    shard: dict[str, int] | None = None,
+    parallel: int | None = None,
+    all_related: bool = False,
+    test_options: dict[str, Any] | None = None,
+) -> dict[str, list[tuple[str, str]]]:
+    """(preset, command) pairs per phase, for the first related preset of each type or with all_related for every one."""
+    commands: dict[str, list[tuple[str, str]]] = {"build": [], "test": [], "package": []}
+    for phase in commands:
+        names = related_presets.get(phase) or []
+        for name in names if all_related else names[:1]:
+            if phase == "build":
+                command = f"cmake --build --preset {name}"
+                if parallel:
+                    command += f" --parallel {parallel}"
+            elif phase == "test":
+                command = f"ctest --preset {name}"
+                if parallel:
+                    command += f" -j {parallel}"
+                if shard:
+                    command += f" -I {shard['index']},,{shard['count']}"
+                command += ctest_options(name, shard, test_options or {})
+            else:
+                command = f"cmake --build --preset {name} --target package"
+            commands[phase].append((name, command))
+    return commands
+
+
+def generate_reruns(
+    test_presets: list[str], shard: dict[str, int] | None = None, parallel: int | None = None, test_options: dict[str, Any] | None = None
+) -> dict[str, str]:
+    """Command per test preset rerunning only its failed tests, so a flaky test costs a retry instead of the whole leg.
+
+    repeat_until_pass counts every run of a test, the first one included.
+    """
+    test_options = test_options or {}
+    attempts = test_options.get("repeat_until_pass")
+    if not attempts:
+        return {}
+
+    reruns = {}
+    for name in test_presets:
+        command = f"ctest --preset {name} --rerun-failed --repeat until-pass:{attempts - 1}"
+        if parallel:
+            command += f" -j {parallel}"
+        reruns[name] = command + ctest_options(name, shard, test_options, ".rerun")
+    return reruns
+
+
+COMPILER_CACHE_DIR: Final[str] = ".cmake-builder-cache"
+COMPILER_CACHE_ENV: Final[dict[str, tuple[str, str]]] = {
+    "ccache": ("CCACHE_DIR", "CCACHE_MAXSIZE"),
+    "sccache": ("SCCACHE_DIR", "SCCACHE_CACHE_SIZE"),
+}
+
+
+STEP_TIMER: Final[str] = 'uv run --script "$CMAKE_BUILDER_SCRIPTS/step_timer.py" run'
+
+
+def timing_label(preset: str, shard: dict[str, int] | None = None) -> str:
+    """Name of the timing records of a matrix leg, unique across the shards of a preset."""
+    return f"{preset}-{shard['index']}of{shard['count']}" if shard else preset
+
+
+def wrap_timing(command: str, label: str, phase: str, retried: bool = False) -> str:
+    """Run the command through step_timer.py to record its wall time, peak RSS and exit code."""
+    return f"{STEP_TIMER} --preset {shlex.quote(label)} --phase {phase}{' --retried' if retried else ''} -- {command}"
+
+
+LOG_FILTER: Final[str] = 'uv run --script "$CMAKE_BUILDER_SCRIPTS/log_filter.py"'
+
+
+def wrap_log_filter(command: str, label: str, phase: str, limit_mb: int, retried: bool = False) -> str:
+    """Run the command through log_filter.py to cap its log, keep the full log gzipped and summarize its errors."""
+    return f"{LOG_FILTER} --preset {shlex.quote(label)} --phase {phase} --limit-mb {limit_mb}{' --retried' if retried else ''} -- {command}"
 
-    if "test" in related_presets and related_presets["test"]:
-        test_preset = related_presets["test"][0]
-        steps["test"] = f"ctest --preset {test_preset}"
 
-    if "package" in related_presets and related_presets["package"]:
-        package_preset = related_presets["package"][0]
-        steps["package"] = f"cmake --build --preset {package_preset} --target package"
-    return steps
+def join_commands(
+    configure_cmd: str,
+    step_commands: dict[str, list[tuple[str, str]]],
+    label: str,
+    timing: bool = False,
+    log_limit_mb: int | None = None,
+    reruns: dict[str, str] | None = None,
+) -> dict[str, str]:
+    """One command line per phase, with every command wrapped for timing and log capping when enabled.
+
+    A test command with a rerun is followed by it when it fails, and the pair only fails when the rerun does,
+    so a failure of the first run is recorded as retried and the rerun records the outcome.
+    """
+
+    def wrap(command: str, phase: str, retried: bool = False) -> str:
+        if log_limit_mb:
+            command = wrap_log_filter(command, label, phase, log_limit_mb, retried)
+        return wrap_timing(command, label, phase, retried) if timing else command
+
+    commands = {"configure": wrap(configure_cmd, "configure")}
+    for phase, phase_commands in step_commands.items():
+        # several presets of one phase are timed and logged separately as <phase>-<preset>
+        named_phase = phase if len(phase_commands) == 1 else f"{phase}-{{}}"
+        wrapped = []
+        for name, command in phase_commands:
+            rerun = reruns.get(name) if phase == "test" and reruns else None
+            command = wrap(command, named_phase.format(name), retried=rerun is not None)
+            if rerun:
+                command = f"({command} || {wrap(rerun, named_phase.format(name) + '-rerun')})"
+            wrapped.append(command)
+        # the presets of a phase share one binary directory, which Ninja can't build concurrently, so they run in turn
+        commands[phase] = " && ".join(wrapped)
+    return commands
+
+
+# CMAKE_LINKER_TYPE needs CMake 3.29, older versions ignore it with a warning
+LINKER_TYPES: Final[dict[str, str]] = {"mold": "MOLD", "lld": "LLD", "gold": "GOLD", "bfd": "BFD"}
+
 
+# the linkers that setup-runners can install on the runners other than Linux, by the prefix of their runs-on label
+RUNNER_LINKERS: Final[dict[str, tuple[str, ...]]] = {"macos": ("lld",), "windows": ("lld",)}
 
-def get_binary_dir_path(presets: CMakePresets, preset_name: str, root: CMakeRoot) -> str:
+
+def get_build_acceleration_flags(config: dict[str, Any], runs_on: str = "") -> str:
+    """-D cache variables for the unity_build, pch and linker options, leaving the preset's own settings alone when unset."""
+    flags = ""
+
+    unity_build = config.get("unity_build")
+    if unity_build is not None:
+        flags += f" -DCMAKE_UNITY_BUILD={'ON' if unity_build else 'OFF'}"
+        # an integer is the number of sources per unity file
+        if not isinstance(unity_build, bool):
+            flags += f" -DCMAKE_UNITY_BUILD_BATCH_SIZE={unity_build}"
+
+    # CMake can only switch off the precompiled headers a project declares, not add them
+    if config.get("pch") is not None:
+        flags += f" -DCMAKE_DISABLE_PRECOMPILE_HEADERS={'OFF' if config['pch'] else 'ON'}"
+
+    linker = config.get("linker")
+    if linker:
+        for prefix, linkers in RUNNER_LINKERS.items():
+            if runs_on.startswith(prefix) and linker not in linkers:
+                raise ValueError(f"Linker '{linker}' is not available on {runs_on}, use one of: {', '.join(linkers)}")
+        flags += f" -DCMAKE_LINKER_TYPE={LINKER_TYPES[linker]}"
+
+    return flags
+
+
+ARTIFACT_ARCHIVE_DIR: Final[str] = ".cmake-builder-artifact"
+DEFAULT_COMPRESSION_LEVEL: Final[int] = 6
+# zstd level of an archive, its default and fastest levels, since zstd takes level 0 as its default level
+DEFAULT_ARCHIVE_LEVEL: Final[int] = 3
+MIN_ARCHIVE_LEVEL: Final[int] = 1
+LOCK_FILE_PATTERNS: Final[tuple[str, ...]] = ("*.lock", "vcpkg.json", "vcpkg-configuration.json", "package-lock.json")
+MTIMES_MANIFEST: Final[str] = ".cmake-builder-mtimes.json"
+NINJA_LOG: Final[str] = ".ninja_log"
+
+
+def get_configure_hash(presets: "Presets", preset_name: str) -> str:
+    """Hash of the fully resolved configure preset."""
+    resolved = presets.resolve_macro_values(CONFIGURE, preset_name)
+    return hashlib.sha256(json.dumps(resolved, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def get_compiler_cache_config(presets: "Presets", preset_name: str, cache: dict[str, Any], toolchain: str, runs_on: str) -> dict[str, Any]:
+    launcher = cache["launcher"]
+    dir_env, size_env = COMPILER_CACHE_ENV[launcher]
+    key_prefix = f"{launcher}-{preset_name}-{toolchain}-{runs_on}-"
+
+    return {
+        "launcher": launcher,
+        "key": f"{key_prefix}{get_configure_hash(presets, preset_name)}",
+        "restore_keys": key_prefix,
+        "path": f"{COMPILER_CACHE_DIR}/{launcher}",
+        "dir_env": dir_env,
+        "size_env": size_env,
+        "max_size": cache.get("max_size", ""),
+    }
+
+
+def get_binary_dir_path(presets: "Presets", preset_name: str, root: "Root") -> str:
     """Get the binary directory path relative to workspace or project root."""
     resolved = presets.resolve_macro_values(CONFIGURE, preset_name)
     binary_dir = Path(resolved.get("binaryDir", "build"))
@@ -107,48 +402,262 @@ def get_binary_dir_path(presets: CMakePresets, preset_name: str, root: CMakeRoot
     return cast(str, root.get_relative_path(binary_dir))
 
 
-def main() -> None:
-    try:
-        args: argparse.Namespace = parse_arguments()
-        root = CMakeRoot(args.cmake_project_root)
-        presets = CMakePresets(root)
+def get_presets_files(presets: "Presets", root: "Root") -> list[Path]:
+    """CMakePresets.json, CMakeUserPresets.json and every file they include."""
+    return [root.source_dir / filename for filename in presets.parser.loaded_files]
 
-        config_preset = presets.get_preset_by_name(CONFIGURE, args.preset)
 
-        if config_preset:
-            related_presets: dict[str, list[str]] = get_related_preset_names(presets, args.preset)
-            configure_cmd = f"cmake --preset {args.preset}"
-        else:
-            raise ValueError(f"Preset '{args.preset}' not found in the CMake project")
-
-        steps = generate_steps(related_presets)
+def hash_files(root: "Root", files: list[Path]) -> str:
+    digest = hashlib.sha256()
+    for path in sorted(set(files)):
+        if path.is_file():
+            digest.update(root.get_relative_path(path).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
 
-        relative_path = get_binary_dir_path(presets, args.preset, root)
 
-        default_artifact_config: dict[str, Any] = {
-            "path": [relative_path],
-            "retention_days": args.default_artifact_retention_days,
+def get_incremental_config(presets: "Presets", root: "Root", preset_name: str, toolchain: str, runs_on: str) -> dict[str, Any] | None:
+    """Cache config for the binary directory, or None if it lives outside the workspace."""
+    resolved = presets.resolve_macro_values(CONFIGURE, preset_name)
+    binary_dir = Path(os.path.normpath(root.source_dir / resolved.get("binaryDir", "build")))
+    workspace_path = Path(os.environ.get("GITHUB_WORKSPACE", root.source_dir))
+
+    if not binary_dir.is_relative_to(workspace_path):
+        sys.stderr.write(f"Warning: binaryDir '{binary_dir}' of preset '{preset_name}' is outside the workspace, incremental build disabled\n")
+        return None
+
+    inputs = get_presets_files(presets, root)
+    if resolved.get("toolchainFile"):
+        inputs.append(root.source_dir / resolved["toolchainFile"])
+    for pattern in LOCK_FILE_PATTERNS:
+        inputs.extend(root.source_dir.glob(pattern))
+
+    path = get_binary_dir_path(presets, preset_name, root)
+
+    return {
+        "key": f"build-{preset_name}-{toolchain}-{runs_on}-{hash_files(root, inputs)}",
+        "path": path,
+        "manifest": f"{path}/{MTIMES_MANIFEST}",
+    }
+
+
+SNAPSHOT_DIR: Final[str] = ".cmake-builder-snapshot"
+CTEST_SNAPSHOT: Final[str] = 'uv run --script "$CMAKE_BUILDER_SCRIPTS/ctest_snapshot.py"'
+
+
+def get_split_config(
+    presets: "Presets",
+    root: "Root",
+    preset: str,
+    test_presets: list[str],
+    shards: int,
+    parallel: int | None = None,
+    timing: bool = False,
+    log_limit_mb: int | None = None,
+    test_options: dict[str, Any] | None = None,
+) -> tuple[dict[str, str] | None, list[dict[str, Any]]]:
+    """Snapshot config of the build job and one test job per shard, for a preset that builds once and tests in other jobs."""
+    if not test_presets:
+        return None, []
+
+    path = f"{SNAPSHOT_DIR}/{preset}.tar.zst"
+    preset_args = " ".join(f"--preset {name}" for name in test_presets)
+    binary_dir = shlex.quote(get_binary_dir_path(presets, preset, root))
+    snapshot = {
+        "name": f"snapshot-{preset}",
+        "path": path,
+        "create": f'{CTEST_SNAPSHOT} create {preset_args} --binary-dir {binary_dir} --workspace "$GITHUB_WORKSPACE" --archive "$GITHUB_WORKSPACE/{path}"',
+        "extract": f'{CTEST_SNAPSHOT} extract --workspace "$GITHUB_WORKSPACE" --archive "$GITHUB_WORKSPACE/{path}"',
+    }
+
+    tests = []
+    for shard in [{"index": index, "count": shards} for index in range(1, shards + 1)] if shards > 1 else [None]:
+        step_commands = generate_steps({"test": test_presets}, shard, parallel, all_related=True, test_options=test_options)
+        reruns = generate_reruns(test_presets, shard, parallel, test_options)
+        test = join_commands("", {"test": step_commands["test"]}, timing_label(preset, shard), timing, log_limit_mb, reruns)["test"]
+        tests.append({"shard": shard, "test": test} if shard else {"test": test})
+    return snapshot, tests
+
+
+def check_archive_paths(preset: str, paths: list[str]) -> None:
+    """Reject artifact paths an archive can't hold, it stores every file relative to the workspace."""
+    outside = [path for path in paths if not path.startswith("!") and outside_cwd(path)]
+    if outside:
+        raise ValueError(f"Artifact paths of '{preset}' must be relative paths inside the workspace to be archived: {', '.join(outside)}")
+
+
+def get_artifact_config(
+    presets: "Presets",
+    root: "Root",
+    preset: str,
+    artifact: dict[str, Any],
+    default_store_artifact: bool | None,
+    default_artifact_retention_days: int,
+) -> dict[str, Any] | None:
+    relative_path = get_binary_dir_path(presets, preset, root)
+
+    default_artifact_config: dict[str, Any] = {
+        "path": [relative_path],
+        "retention_days": default_artifact_retention_days,
+    }
+
+    artifact_config = None
+
+    if artifact or default_store_artifact:
+        if "path" in artifact:
+            default_artifact_config["path"] = artifact["path"]
+        if "retention_days" in artifact:
+            default_artifact_config["retention_days"] = artifact["retention_days"]
+
+        default_artifact_config["path"] = "\n".join(default_artifact_config["path"])
+
+        # an archive is already compressed, zipping it again only costs time, the compression level becomes its zstd level
+        if artifact.get("archive"):
+            check_archive_paths(preset, default_artifact_config["path"].splitlines())
+            default_artifact_config["archive"] = f"{ARTIFACT_ARCHIVE_DIR}/{preset}.{artifact['archive']}"
+            default_artifact_config["archive_level"] = max(MIN_ARCHIVE_LEVEL, artifact.get("compression_level", DEFAULT_ARCHIVE_LEVEL))
+            default_artifact_config["compression_level"] = 0
+        else:
+            default_artifact_config["compression_level"] = artifact.get("compression_level", DEFAULT_COMPRESSION_LEVEL)
+
+        artifact_config = default_artifact_config
+
+    return artifact_config
+
+
+def generate_outputs(
+    presets: "Presets",
+    root: "Root",
+    preset: str,
+    default_store_artifact: bool | None,
+    default_artifact_retention_days: int,
+    config: dict[str, Any],
+    toolchain: str = "",
+    runs_on: str = "",
+    resolve_auto: bool = False,
+    timing: bool = False,
+    ninja_report: bool = False,
+) -> dict[str, Any]:
+    """Generate the configure/build/test/package commands, artifact and cache configs for a configure preset.
+
+    A parallel level of "auto" is resolved from this machine only with resolve_auto, otherwise it is returned
+    as a parallel config for the runner of the matrix leg to resolve. With timing every command is wrapped
+    to record its wall time, peak RSS and exit code, and with a log_limit_mb in the config to cap its log output.
+    With ninja_report a config for analysing the .ninja_log of the binary directory after the build is returned.
+    With a split config the tests are returned as separate test jobs instead, run from a snapshot the build uploads.
+    """
+    config_preset = presets.get_preset_by_name(CONFIGURE, preset)
+
+    if config_preset:
+        related_presets: dict[str, list[str]] = get_related_preset_names(presets, preset)
+        configure_cmd = configure_command(preset)
+    else:
+        raise ValueError(f"Preset '{preset}' not found in the CMake project")
+
+    artifact: dict[str, Any] = config.get("artifact") or {}
+
+    cache_config = None
+    if config.get("cache"):
+        cache_config = get_compiler_cache_config(presets, preset, config["cache"], toolchain, runs_on)
+        launcher = cache_config["launcher"]
+        configure_cmd += f" -DCMAKE_C_COMPILER_LAUNCHER={launcher} -DCMAKE_CXX_COMPILER_LAUNCHER={launcher}"
+
+    configure_cmd += get_build_acceleration_flags(config, runs_on)
+
+    incremental_config = None
+    if config.get("incremental"):
+        incremental_config = get_incremental_config(presets, root, preset, toolchain, runs_on)
+
+    parallel = config.get("parallel")
+    parallel_config = None
+    if parallel == "auto":
+        memory_per_job_mb = config.get("memory_per_job_mb") or 0
+        if resolve_auto:
+            parallel = detect_parallelism(memory_per_job_mb)
+        else:
+            parallel = None
+            parallel_config = {"memory_per_job_mb": memory_per_job_mb}
+
+    test_options = config.get("test_options") or {}
+    step_commands = generate_steps(related_presets, config.get("shard"), parallel, config.get("related_presets") == "all", test_options)
+    reruns = generate_reruns([name for name, _ in step_commands["test"]], config.get("shard"), parallel, test_options)
+
+    # a split preset only builds, its tests run in separate jobs from a snapshot of the binary directory
+    snapshot_config = None
+    tests: list[dict[str, Any]] = []
+    if config.get("split"):
+        test_presets = [name for name, _ in step_commands.pop("test")]
+        snapshot_config, tests = get_split_config(
+            presets, root, preset, test_presets, config["split"]["shards"], parallel, timing, config.get("log_limit_mb"), test_options
+        )
+
+    artifact_config = get_artifact_config(presets, root, preset, artifact, default_store_artifact, default_artifact_retention_days)
+
+    ninja_config = None
+    if ninja_report:
+        ninja_config = {
+            "key": f"ninja-report-{preset}-{toolchain}-{runs_on}",
+            "logs": {preset: f"{get_binary_dir_path(presets, preset, root)}/{NINJA_LOG}"},
         }
 
+    # every shard builds the same tree, only the first one uploads and analyses it
+    if (config.get("shard") or {}).get("index", 1) > 1:
         artifact_config = None
+        ninja_config = None
+
+    label = timing_label(preset, config.get("shard"))
+    commands = join_commands(configure_cmd, step_commands, label, timing, config.get("log_limit_mb"), reruns)
 
-        if args.artifact or args.default_store_artifact:
-            if "path" in args.artifact:
-                default_artifact_config["path"] = args.artifact["path"]
-            if "retention_days" in args.artifact:
-                default_artifact_config["retention_days"] = args.artifact["retention_days"]
+    return {
+        **commands,
+        "preflight": preflight_command(configure_cmd),
+        "artifact": artifact_config,
+        "cache": cache_config,
+        "incremental": incremental_config,
+        "parallel": parallel_config,
+        "ninja_log": ninja_config,
+        "snapshot": snapshot_config,
+        "tests": tests,
+    }
 
-            default_artifact_config["path"] = "\n".join(default_artifact_config["path"])
 
-            artifact_config = default_artifact_config
+def main() -> None:
+    try:
+        args: argparse.Namespace = parse_arguments()
 
-        outputs = {
-            "configure": configure_cmd or "",
-            "build": steps["build"],
-            "test": steps["test"],
-            "package": steps["package"],
-            "artifact": json.dumps(artifact_config) if artifact_config else "",
+        root = SourceRoot(args.cmake_project_root)
+        presets = load_presets(root, args.presets_cache)
+
+        config = {
+            "artifact": args.artifact,
+            "cache": args.cache,
+            "incremental": args.incremental,
+            "shard": args.shard,
+            "parallel": args.parallel,
+            "memory_per_job_mb": args.memory_per_job_mb,
+            "related_presets": args.related_presets,
+            "log_limit_mb": args.log_limit_mb,
+            "unity_build": args.unity_build,
+            "pch": args.pch,
+            "linker": args.linker,
+            "split": {"shards": args.split} if args.split else None,
+            "test_options": {"timeout": args.test_timeout, "repeat_until_pass": args.repeat_until_pass, "junit": args.junit},
         }
+        outputs = generate_outputs(
+            presets,
+            root,
+            args.preset,
+            args.default_store_artifact,
+            args.default_artifact_retention_days,
+            config,
+            args.toolchain,
+            args.runs_on,
+            resolve_auto=True,
+            timing=args.timing,
+            ninja_report=args.ninja_report,
+        )
+        for key in ("artifact", "cache", "incremental", "parallel", "ninja_log", "snapshot", "tests"):
+            outputs[key] = json.dumps(outputs[key]) if outputs[key] else ""
 
         for key, value in outputs.items():
             print(f"{key}={value}")
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.11"
+# dependencies = []
+# ///
+
+import argparse
+import json
+import re
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Any, Final
+
+from timing_report import format_seconds
+
+OUTCOMES: Final[tuple[str, ...]] = ("passed", "failed", "skipped")
+# the JUnit file of the rerun of a test preset's failed tests, see generate_steps.generate_reruns
+RERUN_SUFFIX: Final[str] = ".rerun"
+SHARD_SUFFIX: Final[re.Pattern[str]] = re.compile(r"-\d+of\d+$")
+
+
+def parse_junit(path: Path) -> list[dict[str, Any]]:
+    """Name, time and outcome of every test case of a JUnit XML file, as written by ctest --output-junit or other runners."""
+    cases = []
+    for case in ET.parse(path).getroot().iter("testcase"):
+        # ctest marks the outcome with a status attribute, other runners with child elements only
+        if case.find("failure") is not None or case.find("error") is not None or case.get("status") == "fail":
+            outcome = "failed"
+        elif case.find("skipped") is not None or case.get("status") in ("notrun", "disabled"):
+            outcome = "skipped"
+        else:
+            outcome = "passed"
+        cases.append({"name": case.get("name", ""), "seconds": float(case.get("time") or 0), "outcome": outcome})
+    return cases
+
+
+def load_runs(input_dir: Path) -> dict[str, list[dict[str, Any]]]:
+    """Test cases of every JUnit file in any subdirectory of input_dir, by file name without .xml."""
+    return {path.stem: parse_junit(path) for path in sorted(input_dir.rglob("*.xml"))}
+
+
+def build_report(runs: dict[str, list[dict[str, Any]]]) -> dict[str, Any]:
+    """Totals and every test sorted slowest first, a failed test taking the outcome of its rerun and counting as flaky when that passed."""
+    tests = []
+    for run, cases in runs.items():
+        if run.endswith(RERUN_SUFFIX):
+            continue
+        reruns = {case["name"]: case for case in runs.get(f"{run}{RERUN_SUFFIX}", [])}
+        for case in cases:
+            test = case | {"preset": SHARD_SUFFIX.sub("", run), "flaky": False}
+            rerun = reruns.get(case["name"])
+            if case["outcome"] == "failed" and rerun:
+                test["outcome"] = rerun["outcome"]
+                test["flaky"] = rerun["outcome"] == "passed"
+            tests.append(test)
+
+    totals: dict[str, Any] = {"tests": len(tests)} | {outcome: sum(test["outcome"] == outcome for test in tests) for outcome in OUTCOMES}
+    totals["flaky"] = sum(test["flaky"] for test in tests)
+    totals["seconds"] = round(sum(test["seconds"] for test in tests), 3)
+    return {"totals": totals, "tests": sorted(tests, key=lambda test: test["seconds"], reverse=True)}
+
+
+def rerun_commands(tests: list[dict[str, Any]]) -> list[str]:
+    """ctest command per test preset running only its failed tests, for reproducing them locally."""
+    failed: dict[str, list[str]] = {}
+    for test in tests:
+        if test["outcome"] == "failed":
+            failed.setdefault(test["preset"], []).append(re.escape(test["name"]))
+    return [f"ctest --preset {preset} -R '^({'|'.join(sorted(names))})$'" for preset, names in sorted(failed.items())]
+
+
+def render_markdown(report: dict[str, Any], top: int) -> str:
+    lines = ["## Test results", ""]
+    totals = report["totals"]
+    if not totals["tests"]:
+        return "\n".join(lines + ["No test results found.", ""])
+
+    lines += [
+        f"{totals['tests']} tests: {totals['passed']} passed, {totals['failed']} failed, {totals['skipped']} skipped, "
+        f"{totals['flaky']} flaky, {format_seconds(totals['seconds'])} in total",
+        "",
+    ]
+
+    commands = rerun_commands(report["tests"])
+    if commands:
+        lines += ["### Failed tests", "", "Run only the failed tests locally:", "", "```", *commands, "```", ""]
+
+    flaky = [test for test in report["tests"] if test["flaky"]]
+    if flaky:
+        lines += ["### Flaky tests", "", "Failed at first and passed when rerun:", "", "| Preset | Test |", "|---|---|"]
+        lines += [f"| {test['preset']} | {test['name']} |" for test in flaky]
+        lines.append("")
+
+    lines += ["### Slowest tests", "", "| Preset | Test | Time | Result |", "|---|---|---:|---|"]
+    for test in report["tests"][:top]:
+        lines.append(f"| {test['preset']} | {test['name']} | {format_seconds(test['seconds'])} | {'flaky' if test['flaky'] else test['outcome']} |")
+
+    return "\n".join(lines + [""])
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Summarize the JUnit test results of every job of a workflow run")
+
+    parser.add_argument("--input-dir", required=True, type=Path, help="Directory with the JUnit XML files of every job")
+    parser.add_argument("--summary", type=Path, help="Markdown file to append the report to, e.g. $GITHUB_STEP_SUMMARY")
+    parser.add_argument("--output", type=Path, help="Write the full report as JSON to this file")
+    parser.add_argument("--top", type=int, default=20, help="Number of tests listed in the slowest tests table")
+
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_arguments()
+
+    try:
+        report = build_report(load_runs(args.input_dir))
+        markdown = render_markdown(report, args.top)
+
+        if args.summary:
+            with open(args.summary, "a") as summary:
+                summary.write(markdown)
+        else:
+            print(markdown)
+
+        if args.output:
+            args.output.write_text(json.dumps(report, indent=2))
+
+    except (OSError, ValueError, ET.ParseError) as e:
+        sys.stderr.write(f"Error: {e}\n")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
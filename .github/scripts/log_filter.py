@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.11"
+# dependencies = []
+# ///
+
+import argparse
+import gzip
+import io
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import IO, Final
+
+CHUNK_SIZE: Final[int] = 64 * 1024
+MAX_EXCERPT_LINES: Final[int] = 20
+
+# substrings of the lines below, found far faster than matching the regular expression against every line
+ERROR_KEYWORDS: Final[tuple[bytes, ...]] = (b" error", b"CMake Error", b"FAILED: ", b"undefined reference to", b" - ")
+# compiler and linker diagnostics, CMake and Ninja errors, and the failed tests listed by ctest
+ERROR_LINE: Final[re.Pattern[bytes]] = re.compile(
+    rb".*?:\d+(?::\d+)?: (?:fatal )?error\b.*"
+    rb"|.*?\(\d+(?:,\d+)?\): (?:fatal )?error [A-Z]+\d+:.*"
+    rb"|CMake Error\b.*"
+    rb"|FAILED: .*"
+    rb"|.*\bundefined reference to\b.*"
+    rb"|(?:.*[/\\])?(?:collect2|ld|lld|ld\.lld|link|clang|clang\+\+|gcc|g\+\+|c\+\+)(?:\.exe)?: (?:fatal )?error\b.*"
+    rb"|\s*\d+ - .+ \((?:Failed|Timeout|SEGFAULT|Subprocess aborted|Exception|Not Run|Child aborted)\)\r?"
+)
+
+
+def find_error_lines(text: bytes, limit: int) -> list[str]:
+    """First limit error lines of text, in the order they appear."""
+    lines: dict[int, str] = {}
+    for keyword in ERROR_KEYWORDS:
+        found = 0
+        position = text.find(keyword)
+        # any later line with this keyword comes after limit error lines
+        while position != -1 and found < limit:
+            line_start = text.rfind(b"\n", 0, position) + 1
+            line_end = text.find(b"\n", position)
+            line_end = len(text) if line_end == -1 else line_end
+            if ERROR_LINE.fullmatch(text, line_start, line_end):
+                lines[line_start] = text[line_start:line_end].decode(errors="replace").rstrip("\r")
+                found += 1
+            position = text.find(keyword, line_end)
+    return [lines[start] for start in sorted(lines)[:limit]]
+
+
+class LogFilter:
+    """Forward command output up to a size limit while keeping all of it gzipped and collecting the first error lines."""
+
+    def __init__(self, log: io.BufferedIOBase, output: IO[bytes], limit: int) -> None:
+        self.log = log
+        self.output = output
+        self.limit = limit
+        self.forwarded = 0
+        self.total = 0
+        self.excerpt: list[str] = []
+        self.partial = b""
+
+    @property
+    def truncated(self) -> bool:
+        return self.total > self.forwarded
+
+    def write(self, chunk: bytes) -> None:
+        self.total += len(chunk)
+        self.log.write(chunk)
+
+        if self.forwarded < self.limit:
+            allowed = chunk[: self.limit - self.forwarded]
+            # cut at a line boundary unless a single line is longer than the whole limit
+            if len(allowed) < len(chunk) and b"\n" in allowed:
+                allowed = allowed[: allowed.rindex(b"\n") + 1]
+            self.output.write(allowed)
+            self.output.flush()
+            self.forwarded += len(allowed)
+            if len(allowed) < len(chunk):
+                self.forwarded = self.limit
+
+        if len(self.excerpt) < MAX_EXCERPT_LINES:
+            lines = self.partial + chunk
+            complete = lines.rfind(b"\n") + 1
+            self.scan(lines[:complete])
+            self.partial = lines[complete:][-CHUNK_SIZE:]
+
+    def scan(self, text: bytes) -> None:
+        self.excerpt += find_error_lines(text, MAX_EXCERPT_LINES - len(self.excerpt))
+
+    def close(self) -> None:
+        if self.partial:
+            self.scan(self.partial)
+            self.partial = b""
+
+
+def run_filtered(command: list[str], log_path: Path, output: IO[bytes], limit: int) -> tuple[int, LogFilter]:
+    """Run a command with its stdout and stderr streamed through a LogFilter and return its exit code."""
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    # the fastest compression level, the full log only needs to be smaller than the raw output
+    with gzip.open(log_path, "wb", compresslevel=1) as log:
+        log_filter = LogFilter(log, output, limit)
+        try:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        except FileNotFoundError as e:
+            sys.stderr.write(f"Error: {e}\n")
+            return 127, log_filter
+
+        assert process.stdout is not None
+        with process:
+            fd = process.stdout.fileno()
+            while chunk := os.read(fd, CHUNK_SIZE):
+                log_filter.write(chunk)
+        log_filter.close()
+    return process.returncode, log_filter
+
+
+def render_excerpt(preset: str, phase: str, exit_code: int, excerpt: list[str]) -> str:
+    lines = [f"### {preset}: {phase} failed with exit code {exit_code}", ""]
+    if excerpt:
+        lines += ["```", *excerpt, "```"]
+    else:
+        lines.append("No error lines found, see the full log.")
+    return "\n".join(lines + [""])
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Cap the log output of a build step, keep the full log gzipped and summarize its errors")
+
+    parser.add_argument("--preset", required=True, help="Preset the step belongs to")
+    parser.add_argument("--phase", required=True, help="Phase of the step (e.g. configure, build, test)")
+    parser.add_argument("--limit-mb", type=int, required=True, help="Stop forwarding the output to the job log after this many MB")
+    parser.add_argument("--retried", action="store_true", help="A failure of the command is retried by another step, whose errors are summarized instead")
+    parser.add_argument(
+        "--log-dir",
+        type=Path,
+        default=Path(os.environ.get("CMAKE_BUILDER_LOGS", ".cmake-builder-logs")),
+        help="Directory for the full gzipped logs (default: $CMAKE_BUILDER_LOGS)",
+    )
+    parser.add_argument(
+        "--summary",
+        type=Path,
+        default=os.environ.get("GITHUB_STEP_SUMMARY") or None,
+        help="Markdown file to append the error lines of a failed step to (default: $GITHUB_STEP_SUMMARY)",
+    )
+
+    # everything after -- is the command to run, passed through untouched
+    argv = sys.argv[1:]
+    command: list[str] = []
+    if "--" in argv:
+        command = argv[argv.index("--") + 1 :]
+        argv = argv[: argv.index("--")]
+
+    args = parser.parse_args(argv)
+    args.command = command
+    if not command:
+        parser.error("a command is required after --")
+    return args
+
+
+def main() -> None:
+    args = parse_arguments()
+
+    try:
+        log_path = args.log_dir / f"{args.preset}.{args.phase}.log.gz"
+        exit_code, log_filter = run_filtered(args.command, log_path, sys.stdout.buffer, args.limit_mb * 1024 * 1024)
+
+        if log_filter.truncated:
+            print(f"::warning::{args.preset}: {args.phase} output truncated after {args.limit_mb} MB, the full log is {log_path}", flush=True)
+
+        if exit_code != 0 and not args.retried:
+            excerpt = render_excerpt(args.preset, args.phase, exit_code, log_filter.excerpt)
+            # the error lines may be past the truncation point, repeat them in the job log
+            if log_filter.truncated:
+                print(excerpt, flush=True)
+            if args.summary:
+                with open(args.summary, "a") as summary:
+                    summary.write(excerpt)
+
+    except OSError as e:
+        sys.stderr.write(f"Error: {e}\n")
+        sys.exit(1)
+
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
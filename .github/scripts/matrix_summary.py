@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.11"
+# dependencies = []
+# ///
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Final
+
+PASSED: Final[tuple[str, ...]] = ("success", "skipped")
+
+
+def leg_name(entry: dict[str, Any], prefix: str = "") -> str:
+    """Name of the main job of a matrix entry, or with prefix "test " of the test job, as rendered by the workflow."""
+    shard = entry.get("shard")
+    suffix = f" [{shard['index']}/{shard['count']}]" if shard else ""
+    return f"{prefix}{entry['preset']}{suffix} ({entry['toolchain']}@{entry['runs-on']})"
+
+
+def load_jobs(path: Path) -> dict[str, str]:
+    """Conclusion of every job of the run, from one JSON object per line as listed by the jobs API."""
+    jobs: dict[str, str] = {}
+    for line in path.read_text().splitlines():
+        if line.strip():
+            job = json.loads(line)
+            jobs[job["name"]] = job.get("conclusion") or job.get("status") or "unknown"
+    return jobs
+
+
+def leg_results(matrix: dict[str, Any], jobs: dict[str, str], prefix: str = "") -> list[dict[str, Any]]:
+    """Match every matrix entry to its job, which is prefixed with the calling job's name in a reusable workflow."""
+    results = []
+    for entry in matrix.get("include", []):
+        name = leg_name(entry, prefix)
+        conclusion = next((conclusion for job, conclusion in jobs.items() if job == name or job.endswith(f" / {name}")), "not started")
+        results.append({"name": name, "critical": entry.get("critical", False), "conclusion": conclusion})
+    return results
+
+
+def render_markdown(legs: list[dict[str, Any]], pruned: list[str]) -> str:
+    lines = ["## Matrix results", ""]
+    if legs:
+        lines += ["| Leg | Critical | Result |", "|---|---|---|"]
+        lines += [f"| {leg['name']} | {'yes' if leg['critical'] else ''} | {leg['conclusion']} |" for leg in legs]
+        lines.append("")
+
+    skipped = [leg["name"] for leg in legs if leg["conclusion"] in ("cancelled", "skipped", "not started")]
+    if skipped:
+        lines += [f"Skipped or cancelled legs: {', '.join(skipped)}", ""]
+    if pruned:
+        lines += [f"Pruned presets without relevant changes: {', '.join(pruned)}", ""]
+    return "\n".join(lines)
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Report the result of every matrix leg and fail unless the planned jobs succeeded")
+
+    parser.add_argument("--matrix", required=True, help="Matrix JSON object produced by plan.py")
+    parser.add_argument("--test-matrix", default="{}", help="Matrix JSON object of the test jobs of split presets, produced by plan.py")
+    parser.add_argument("--pruned", default="[]", help="JSON list of pruned presets")
+    parser.add_argument("--results", required=True, help="JSON object of the plan, preflight, main and test job results")
+    parser.add_argument("--jobs", type=Path, help="File with the name and conclusion of every job of the run, one JSON object per line")
+    parser.add_argument("--summary", type=Path, help="Markdown file to append the report to, e.g. $GITHUB_STEP_SUMMARY")
+
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_arguments()
+
+    try:
+        results = json.loads(args.results)
+        jobs = load_jobs(args.jobs) if args.jobs and args.jobs.is_file() else {}
+        legs = leg_results(json.loads(args.matrix or "{}"), jobs) + leg_results(json.loads(args.test_matrix or "{}"), jobs, "test ")
+        markdown = render_markdown(legs, json.loads(args.pruned or "[]"))
+
+    except (OSError, ValueError, KeyError) as e:
+        sys.stderr.write(f"Error: {e}\n")
+        sys.exit(1)
+
+    print(markdown)
+    if args.summary:
+        with open(args.summary, "a") as summary:
+            summary.write(markdown)
+
+    # main is skipped when every preset was pruned, preflight when it is not enabled, test without split presets
+    if results.get("plan") != "success" or any(result not in PASSED for job, result in results.items() if job != "plan"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.11"
+# dependencies = []
+# ///
+
+import argparse
+import bisect
+import json
+import sys
+from pathlib import Path
+from typing import Any, Final
+
+from parallelism import available_cpus
+
+COMPILE_SUFFIXES: Final[tuple[str, ...]] = (".o", ".obj", ".gch", ".pch", ".ifc", ".pcm")
+LINK_SUFFIXES: Final[tuple[str, ...]] = (".exe", ".so", ".dll", ".dylib", ".a", ".lib")
+
+
+def parse_ninja_log(text: str) -> list[dict[str, Any]]:
+    """Edges of the last build recorded in a .ninja_log, as start/end in ms and their outputs.
+
+    Ninja appends to the log on every build and writes entries in the order they finish,
+    so an end time going backwards marks the start of a later build.
+    """
+    lines = text.splitlines()
+    if not lines or not lines[0].startswith("# ninja log v"):
+        raise ValueError("not a ninja log")
+
+    builds: list[dict[tuple[int, int, str], dict[str, Any]]] = [{}]
+    last_end = 0
+    for line in lines[1:]:
+        fields = line.split("\t")
+        if len(fields) != 5:
+            continue
+        start, end, output, command_hash = int(fields[0]), int(fields[1]), fields[3], fields[4]
+        if end < last_end:
+            builds.append({})
+        last_end = end
+
+        # the outputs of one command share a single entry per output, merge them into one edge
+        edge = builds[-1].setdefault((start, end, command_hash), {"start": start, "end": end, "outputs": []})
+        edge["outputs"].append(output)
+
+    return list(builds[-1].values())
+
+
+def classify(edge: dict[str, Any], build_dir: Path | None = None) -> str:
+    """Kind of an edge by its first output, a suffix-less output only being a link when it is an executable of build_dir.
+
+    Custom command stamps, phony-like outputs and generated headers have no suffix either, so the name alone can't tell them apart.
+    """
+    output = edge["outputs"][0]
+    suffix = Path(output).suffix
+    if output.endswith(COMPILE_SUFFIXES):
+        return "compile"
+    if suffix in LINK_SUFFIXES or ".so." in output:
+        return "link"
+    if not suffix and build_dir and (build_dir / output).is_file() and (build_dir / output).stat().st_mode & 0o111:
+        return "link"
+    return "other"
+
+
+def critical_path(edges: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Estimate the critical path from the schedule alone.
+
+    The log has no dependency graph, so walk back from the last edge to finish, each time taking
+    the edge that finished last before the current one started as the one it waited for.
+    """
+    by_end = sorted(edges, key=lambda edge: edge["end"])
+    ends = [edge["end"] for edge in by_end]
+
+    path: list[dict[str, Any]] = []
+    index = len(by_end) - 1
+    while index >= 0:
+        path.append(by_end[index])
+        # only look at edges before the current one so zero length edges cannot loop
+        index = bisect.bisect_right(ends, by_end[index]["start"], hi=index) - 1
+    return path[::-1]
+
+
+def edge_summary(edge: dict[str, Any], build_dir: Path | None = None) -> dict[str, Any]:
+    return {"output": edge["outputs"][0], "kind": classify(edge, build_dir), "ms": edge["end"] - edge["start"]}
+
+
+def analyze(edges: list[dict[str, Any]], cpus: int, top: int, build_dir: Path | None = None) -> dict[str, Any]:
+    """Slowest edges, estimated critical path and effective parallelism of a build, whose outputs are relative to build_dir."""
+    if not edges:
+        raise ValueError("no build edges in the ninja log")
+
+    wall_ms = max(edge["end"] for edge in edges) - min(edge["start"] for edge in edges)
+    total_ms = sum(edge["end"] - edge["start"] for edge in edges)
+    effective_parallelism = round(total_ms / wall_ms, 2) if wall_ms else 1.0
+
+    summaries = sorted((edge_summary(edge, build_dir) for edge in edges), key=lambda summary: summary["ms"], reverse=True)
+    path = critical_path(edges)
+
+    return {
+        "edges": len(edges),
+        "wall_ms": wall_ms,
+        "total_ms": total_ms,
+        "cpus": cpus,
+        "effective_parallelism": effective_parallelism,
+        "utilization": round(effective_parallelism / cpus, 2),
+        "critical_path_ms": sum(edge["end"] - edge["start"] for edge in path),
+        "critical_path": [edge_summary(edge, build_dir) for edge in path],
+        "slowest": {kind: [summary for summary in summaries if summary["kind"] == kind][:top] for kind in ("compile", "link")},
+        "durations": {summary["output"]: summary["ms"] for summary in summaries},
+    }
+
+
+def diff_reports(current: dict[str, Any], baseline: dict[str, Any], top: int) -> dict[str, Any]:
+    """Change in wall time and the edges that slowed down the most since the baseline."""
+    changes = [
+        {"output": output, "ms": ms, "baseline_ms": baseline["durations"][output], "delta_ms": ms - baseline["durations"][output]}
+        for output, ms in current["durations"].items()
+        if output in baseline["durations"]
+    ]
+    return {
+        "wall_ms_delta": current["wall_ms"] - baseline["wall_ms"],
+        "critical_path_ms_delta": current["critical_path_ms"] - baseline["critical_path_ms"],
+        "regressions": sorted((change for change in changes if change["delta_ms"] > 0), key=lambda change: change["delta_ms"], reverse=True)[:top],
+        "new_edges": len(current["durations"].keys() - baseline["durations"].keys()),
+    }
+
+
+def format_ms(ms: int) -> str:
+    return f"{ms / 1000:.1f}s"
+
+
+def render_markdown(preset: str, report: dict[str, Any], diff: dict[str, Any] | None) -> str:
+    lines = [
+        f"### Ninja build of {preset}",
+        "",
+        f"{report['edges']} edges in {format_ms(report['wall_ms'])}, {format_ms(report['total_ms'])} of work.",
+        f"Effective parallelism {report['effective_parallelism']} on {report['cpus']} CPUs ({report['utilization']:.0%} utilization).",
+        f"Estimated critical path {format_ms(report['critical_path_ms'])} over {len(report['critical_path'])} edges.",
+        "",
+    ]
+    if diff:
+        lines += [
+            f"Compared to the last build on the default branch: wall time {diff['wall_ms_delta'] / 1000:+.1f}s, "
+            f"critical path {diff['critical_path_ms_delta'] / 1000:+.1f}s, {diff['new_edges']} new edges.",
+            "",
+        ]
+
+    for kind in ("compile", "link"):
+        if report["slowest"][kind]:
+            lines += [f"| Slowest {kind} | Time |", "|---|---:|"]
+            lines += [f"| `{summary['output']}` | {format_ms(summary['ms'])} |" for summary in report["slowest"][kind]]
+            lines.append("")
+
+    if diff and diff["regressions"]:
+        lines += ["| Slower than baseline | Time | Change |", "|---|---:|---:|"]
+        lines += [f"| `{change['output']}` | {format_ms(change['ms'])} | {change['delta_ms'] / 1000:+.1f}s |" for change in diff["regressions"]]
+        lines.append("")
+
+    return "\n".join(lines)
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Report the slowest edges, critical path and parallelism of a Ninja build")
+
+    parser.add_argument("--logs", required=True, help='JSON object mapping preset names to their .ninja_log (e.g. {"debug": "build/debug/.ninja_log"})')
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest compile and link edges to report")
+    parser.add_argument("--baseline-dir", type=Path, help="Directory with the <preset>.json reports of a previous run to diff against")
+    parser.add_argument("--output-dir", type=Path, help="Directory to write the <preset>.json reports to")
+    parser.add_argument("--summary", type=Path, help="Markdown file to append the report to, e.g. $GITHUB_STEP_SUMMARY")
+
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_arguments()
+
+    try:
+        logs: dict[str, str] = json.loads(args.logs)
+        cpus = available_cpus()
+        markdown = []
+        for preset, log_path in logs.items():
+            if not Path(log_path).is_file():
+                sys.stderr.write(f"Warning: {log_path} not found, skipping the build analysis of '{preset}'\n")
+                continue
+
+            # the edge outputs are relative to the build directory holding the log
+            report = analyze(parse_ninja_log(Path(log_path).read_text()), cpus, args.top, Path(log_path).parent)
+
+            diff = None
+            baseline_path = args.baseline_dir / f"{preset}.json" if args.baseline_dir else None
+            if baseline_path and baseline_path.is_file():
+                diff = diff_reports(report, json.loads(baseline_path.read_text()), args.top)
+
+            if args.output_dir:
+                args.output_dir.mkdir(parents=True, exist_ok=True)
+                (args.output_dir / f"{preset}.json").write_text(json.dumps(report))
+            markdown.append(render_markdown(preset, report, diff))
+
+        if args.summary:
+            with open(args.summary, "a") as summary:
+                summary.write("\n".join(markdown))
+        else:
+            print("\n".join(markdown))
+
+    except (OSError, ValueError, KeyError) as e:
+        sys.stderr.write(f"Error: {e}\n")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
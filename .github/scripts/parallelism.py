@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.11"
+# dependencies = []
+# ///
+
+import argparse
+import os
+
+
+def available_cpus() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def total_memory_mb() -> int | None:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def resolve_parallel(cpus: int, memory_mb: int | None, memory_per_job_mb: int | None) -> int:
+    """Number of parallel jobs for the cpus, capped so every job gets memory_per_job_mb of memory."""
+    jobs = cpus
+    if memory_mb and memory_per_job_mb:
+        jobs = min(jobs, memory_mb // memory_per_job_mb)
+    return max(1, jobs)
+
+
+def detect_parallelism(memory_per_job_mb: int | None = None) -> int:
+    return resolve_parallel(available_cpus(), total_memory_mb(), memory_per_job_mb)
+
+
+def parallelism_env(memory_per_job_mb: int | None = None) -> dict[str, str]:
+    """Environment picked up by cmake --build and ctest when no explicit parallel level is given."""
+    jobs = str(detect_parallelism(memory_per_job_mb))
+    return {"CMAKE_BUILD_PARALLEL_LEVEL": jobs, "CTEST_PARALLEL_LEVEL": jobs}
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Detect the parallel level for cmake --build and ctest on this runner")
+    parser.add_argument("--memory-per-job-mb", type=int, default=0, help="Cap the parallel level so every job gets this much memory")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_arguments()
+
+    for key, value in parallelism_env(args.memory_per_job_mb).items():
+        print(f"{key}={value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+
+import argparse
+import hashlib
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+from construct_matrix import add_runner_arguments, construct_matrix, load_runner_decision, parse_json, prune_presets, read_changed_files
+from generate_steps import ARTIFACT_ARCHIVE_DIR, DEFAULT_ARCHIVE_LEVEL, check_archive_paths, generate_outputs, parse_boolean
+from presets_cache import Presets, Root, SourceRoot, load_presets
+from validate_presets import validate_presets
+
+
+def hash_keys(keys: list[str]) -> str:
+    return hashlib.sha256(json.dumps(sorted(keys)).encode()).hexdigest()[:16]
+
+
+def merge_batch_configs(entry: dict[str, Any]) -> None:
+    """Combine the artifact, cache, linker, critical and build analysis configs of a batch's presets into one config per batch entry."""
+    members = entry["presets"]
+    key_suffix = f"{entry['preset']}-{entry['toolchain']}-{entry['runs-on']}-"
+
+    artifacts = [member.pop("artifact") for member in members if "artifact" in member]
+    if artifacts:
+        entry["artifact"] = {
+            "path": "\n".join(artifact["path"] for artifact in artifacts),
+            "retention_days": max(artifact["retention_days"] for artifact in artifacts),
+            "compression_level": min(artifact["compression_level"] for artifact in artifacts),
+        }
+        # one archive for the whole batch, so files shared by its presets are stored once
+        if any("archive" in artifact for artifact in artifacts):
+            check_archive_paths(entry["preset"], entry["artifact"]["path"].splitlines())
+            entry["artifact"]["archive"] = f"{ARTIFACT_ARCHIVE_DIR}/{entry['preset']}.tar.zst"
+            entry["artifact"]["archive_level"] = min(artifact.get("archive_level", DEFAULT_ARCHIVE_LEVEL) for artifact in artifacts if "archive" in artifact)
+            entry["artifact"]["compression_level"] = 0
+
+    caches = [member.pop("cache") for member in members if "cache" in member]
+    if caches:
+        if len({cache["launcher"] for cache in caches}) > 1:
+            raise ValueError(f"Presets in group '{entry['preset']}' must use the same compiler cache launcher")
+        restore_keys = f"{caches[0]['launcher']}-{key_suffix}"
+        entry["cache"] = caches[0] | {
+            "key": f"{restore_keys}{hash_keys([cache['key'] for cache in caches])}",
+            "restore_keys": restore_keys,
+        }
+
+    incrementals = [member.pop("incremental") for member in members if "incremental" in member]
+    if incrementals:
+        entry["incremental"] = {
+            "key": f"build-{key_suffix}{hash_keys([incremental['key'] for incremental in incrementals])}",
+            "path": "\n".join(incremental["path"] for incremental in incrementals),
+            "manifest": incrementals[0]["manifest"],
+        }
+
+    # the runner setup installs the linkers of every preset in the batch
+    linkers = sorted({member["linker"] for member in members if "linker" in member})
+    if linkers:
+        entry["linker"] = " ".join(linkers)
+
+    # a batch cancels the run when any of its critical presets fails, and skips its remaining presets itself
+    if any(member.get("critical") for member in members):
+        entry["critical"] = True
+
+    ninja_logs = [member.pop("ninja_log") for member in members if "ninja_log" in member]
+    if ninja_logs:
+        entry["ninja_log"] = {
+            "key": f"ninja-report-{key_suffix}".removesuffix("-"),
+            "logs": {preset: path for ninja_log in ninja_logs for preset, path in ninja_log["logs"].items()},
+        }
+
+
+def plan(
+    presets_data: dict[str, Any],
+    presets: "Presets",
+    root: "Root",
+    default_runs_on: str,
+    default_toolchain: str,
+    default_store_artifact: bool | None,
+    default_artifact_retention_days: int,
+    changed_files: list[str] | None = None,
+    max_presets_per_job: int = 1,
+    timing: bool = False,
+    ninja_report: bool = False,
+) -> dict[str, list[dict[str, Any]]]:
+    """Validate the presets input and build the matrix with every leg's steps embedded."""
+    validate_presets(presets_data)
+
+    matrix = construct_matrix(presets_data, default_runs_on, default_toolchain, changed_files, max_presets_per_job)
+
+    for entry in matrix["include"]:
+        for leg in entry.get("presets", [entry]):
+            outputs = generate_outputs(
+                presets,
+                root,
+                leg["preset"],
+                default_store_artifact,
+                default_artifact_retention_days,
+                leg,
+                leg["toolchain"],
+                leg["runs-on"],
+                timing=timing,
+                ninja_report=ninja_report,
+            )
+
+            for key in (
+                "artifact",
+                "cache",
+                "incremental",
+                "parallel",
+                "memory_per_job_mb",
+                "related_presets",
+                "log_limit_mb",
+                "unity_build",
+                "pch",
+                "split",
+                "test_options",
+            ):
+                leg.pop(key, None)
+            for key, value in outputs.items():
+                if value:
+                    leg[key] = value
+
+        if "presets" in entry:
+            merge_batch_configs(entry)
+
+    return matrix
+
+
+def split_test_matrix(matrix: dict[str, list[dict[str, Any]]]) -> dict[str, list[dict[str, Any]]]:
+    """Move the test jobs of the split presets out of the build matrix into a matrix of their own.
+
+    A test job keeps the parallel config of an 'auto' parallel level, for its runner to resolve as the build job does.
+    """
+    include = []
+    for entry in matrix["include"]:
+        for leg in entry.get("presets", [entry]):
+            for test in leg.pop("tests", []):
+                job = {"preset": leg["preset"], "runs-on": leg["runs-on"], "toolchain": leg["toolchain"], "snapshot": leg["snapshot"]}
+                if leg.get("parallel"):
+                    job["parallel"] = leg["parallel"]
+                include.append(job | test)
+    return {"include": include}
+
+
+def preflight_legs(matrix: dict[str, list[dict[str, Any]]], runs_on: str, toolchain: str) -> list[dict[str, str]]:
+    """Configure-only legs for every preset of the matrix that builds with the given runner and toolchain.
+
+    The preflight commands of every leg move out of the matrix. A preflight leg keeps the linker and compiler cache launcher
+    its configure command uses, for the preflight job to install them as the matrix leg would.
+    """
+    legs: dict[str, dict[str, str]] = {}
+    for entry in matrix["include"]:
+        launcher = entry.get("cache", {}).get("launcher")
+        for leg in entry.get("presets", [entry]):
+            configure = leg.pop("preflight")
+            if leg["runs-on"] != runs_on or leg["toolchain"] != toolchain:
+                continue
+            preflight = {"preset": leg["preset"], "configure": configure}
+            if leg.get("linker"):
+                preflight["linker"] = leg["linker"]
+            if launcher:
+                preflight["launcher"] = launcher
+            legs.setdefault(leg["preset"], preflight)
+    return list(legs.values())
+
+
+def preflight_setup(legs: list[dict[str, str]]) -> dict[str, str]:
+    """Space separated linkers and compiler cache launchers the preflight job installs."""
+    return {key: " ".join(sorted({leg[key] for leg in legs if key in leg})) for key in ("linker", "launcher")}
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Validate presets, construct the build matrix and generate the steps for every preset")
+
+    parser.add_argument("--cmake-project-root", required=True, type=Path, help="Root directory of the CMake project")
+    parser.add_argument("--default-runs-on", required=True, help="Default runs-on parameter")
+    parser.add_argument("--default-toolchain", required=True, help="Default toolchain parameter")
+    parser.add_argument(
+        "--default-store-artifact",
+        type=parse_boolean,
+        help="Default boolean value whether to store artifacts (true/false/yes/no/1/0)",
+    )
+    parser.add_argument("--default-artifact-retention-days", required=True, type=int, help="Default retention days for artifacts")
+    parser.add_argument("--presets", required=True, help="Presets json object")
+    parser.add_argument(
+        "--changed-files",
+        type=Path,
+        help="File listing the changed files, one per line. Presets whose paths/paths-ignore filters match none of them are pruned",
+    )
+    parser.add_argument(
+        "--max-presets-per-job",
+        type=int,
+        default=1,
+        help="Pack up to this many ungrouped presets sharing runs-on and toolchain into one job",
+    )
+    parser.add_argument(
+        "--timing-report",
+        type=parse_boolean,
+        default=False,
+        help="Wrap every command to record wall time, peak RSS and exit code (true/false/yes/no/1/0)",
+    )
+    parser.add_argument("--presets-cache", type=Path, help="Resolved presets cache file, reused while the presets files are unchanged")
+    parser.add_argument(
+        "--ninja-report",
+        type=parse_boolean,
+        default=False,
+        help="Analyse the .ninja_log of every preset after the build (true/false/yes/no/1/0)",
+    )
+    add_runner_arguments(parser)
+
+    return parser.parse_args()
+
+
+def main() -> None:
+    try:
+        args = parse_arguments()
+        presets_data = parse_json(args.presets)
+
+        changed_files = read_changed_files(args.changed_files) if args.changed_files else None
+
+        root = SourceRoot(args.cmake_project_root)
+        presets = load_presets(root, args.presets_cache)
+
+        matrix = plan(
+            presets_data,
+            presets,
+            root,
+            args.default_runs_on,
+            args.default_toolchain,
+            args.default_store_artifact,
+            args.default_artifact_retention_days,
+            changed_files,
+            args.max_presets_per_job,
+            args.timing_report,
+            args.ninja_report,
+        )
+        test_matrix = split_test_matrix(matrix)
+        preflight = preflight_legs(matrix, args.default_runs_on, args.default_toolchain)
+        runners = load_runner_decision(matrix, presets_data, args.default_runs_on, args.timings, args.runners, args.runner_budget)
+
+        matrix_json = json.dumps(matrix)
+        print(f"matrix={matrix_json}")
+        print(f"pruned={json.dumps(prune_presets(presets_data, changed_files))}")
+        print(f"preflight={json.dumps(preflight)}")
+        print(f"preflight_setup={json.dumps(preflight_setup(preflight))}")
+        print(f"runners={json.dumps(runners)}")
+        print(f"test_matrix={json.dumps(test_matrix)}")
+        print(f"junit={json.dumps(any(config.get('test', {}).get('junit') for config in presets_data.values()))}")
+
+    except Exception as e:
+        sys.stderr.write(f"Error: {e}\n")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+
+import hashlib
+import json
+import os
+import re
+import sys
+from importlib.metadata import version
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Final, NamedTuple, TypeAlias, cast
+
+if TYPE_CHECKING:
+    from cmakepresets import CMakePresets
+    from cmakepresets.paths import CMakeRoot
+
+CACHE_FORMAT: Final[int] = 1
+PRESETS_FILES: Final[tuple[str, ...]] = ("CMakePresets.json", "CMakeUserPresets.json")
+ENV_MACRO: Final[re.Pattern[str]] = re.compile(r"\$p?env\{(\w+)\}")
+# cmakepresets.constants.CONFIGURE, without importing the package on a cache hit
+CONFIGURE: Final[str] = "configure"
+
+
+class SourceRoot:
+    """The parts of cmakepresets' CMakeRoot generate_steps uses, resolving the project root the same way without importing cmakepresets."""
+
+    def __init__(self, path: Path) -> None:
+        path = path if path.is_absolute() else Path.cwd() / path
+        self.source_dir = path.parent if str(path).endswith("CMakePresets.json") else path
+
+    def get_relative_path(self, path: Path) -> str:
+        try:
+            return str(path.relative_to(self.source_dir))
+        except ValueError:
+            return str(path)
+
+
+Root: TypeAlias = "CMakeRoot | SourceRoot"
+
+
+def find_presets_files(source_dir: Path) -> list[Path]:
+    """CMakePresets.json, CMakeUserPresets.json and every file they include, without loading cmakepresets."""
+    pending = [source_dir / name for name in PRESETS_FILES]
+    found: list[Path] = []
+    while pending:
+        path = pending.pop(0)
+        if path in found or not path.is_file():
+            continue
+        found.append(path)
+        includes = json.loads(path.read_text()).get("include", [])
+        # CMakeUserPresets.json implicitly includes CMakePresets.json, which is already listed
+        pending.extend(path.parent / include for include in includes)
+    return found
+
+
+def cache_key(source_dir: Path) -> str | None:
+    """Hash of the presets files and the environment variables they reference, or None if it can't be determined."""
+    # resolved paths embed the source directory
+    digest = hashlib.sha256(f"{CACHE_FORMAT}:{version('cmakepresets')}:{source_dir}".encode())
+    env_names: set[str] = set()
+    for path in find_presets_files(source_dir):
+        content = path.read_bytes()
+        # an include path with a macro can only be expanded by cmakepresets itself
+        if any("$" in include for include in json.loads(content).get("include", [])):
+            return None
+        digest.update(str(path.relative_to(source_dir)).encode())
+        digest.update(content)
+        env_names.update(ENV_MACRO.findall(content.decode()))
+
+    for name in sorted(env_names):
+        digest.update(f"{name}={os.environ.get(name, '')}".encode())
+    return digest.hexdigest()
+
+
+def serialize_presets(presets: "CMakePresets", key: str) -> dict[str, Any]:
+    """The resolved configure presets and their related build/test/package presets."""
+    configure: dict[str, Any] = {}
+    for preset in presets.configure_presets:
+        name = preset["name"]
+        if preset.get("hidden"):
+            continue
+        try:
+            configure[name] = {
+                "preset": presets.get_preset_by_name(CONFIGURE, name),
+                "resolved": presets.resolve_macro_values(CONFIGURE, name),
+                "related": presets.find_related_presets(name),
+            }
+        except Exception:
+            # left out of the cache, the error is raised when the preset is actually used
+            continue
+    return {"key": key, "loaded_files": list(presets.parser.loaded_files), "configure": configure}
+
+
+class CachedParser(NamedTuple):
+    loaded_files: list[str]
+
+
+class CachedPresets:
+    """The parts of the CMakePresets API generate_steps uses, answered from a resolved presets cache.
+
+    Presets missing from the cache, e.g. hidden ones, are answered by loading the project after all.
+    """
+
+    def __init__(self, data: dict[str, Any], root: Root) -> None:
+        self.configure: dict[str, Any] = data["configure"]
+        self.parser = CachedParser(data["loaded_files"])
+        self.root = root
+        self.presets: "CMakePresets | None" = None
+
+    def load(self) -> "CMakePresets":
+        if self.presets is None:
+            self.presets = parse_presets(self.root)
+        return self.presets
+
+    def get_preset_by_name(self, preset_type: str, name: str) -> dict[str, Any] | None:
+        if preset_type == CONFIGURE and name in self.configure:
+            return dict(self.configure[name]["preset"])
+        return cast(dict[str, Any] | None, self.load().get_preset_by_name(preset_type, name))
+
+    def resolve_macro_values(self, preset_type: str, name: str) -> dict[str, Any]:
+        if preset_type == CONFIGURE and name in self.configure:
+            return dict(self.configure[name]["resolved"])
+        return cast(dict[str, Any], self.load().resolve_macro_values(preset_type, name))
+
+    def find_related_presets(self, name: str) -> dict[str, list[dict[str, Any]]] | None:
+        if name in self.configure:
+            return cast(dict[str, list[dict[str, Any]]] | None, self.configure[name]["related"])
+        return cast(dict[str, list[dict[str, Any]]] | None, self.load().find_related_presets(name))
+
+
+Presets: TypeAlias = "CMakePresets | CachedPresets"
+
+
+def parse_presets(root: Root) -> "CMakePresets":
+    from cmakepresets import CMakePresets
+    from cmakepresets.paths import CMakeRoot
+
+    return CMakePresets(CMakeRoot(root.source_dir))
+
+
+def load_presets(root: Root, cache_file: Path | None) -> Presets:
+    """Load the presets of the project from cache_file if its key matches, otherwise parse them and refresh cache_file.
+
+    cmakepresets is only imported when the presets are parsed, a cache hit never loads it.
+    """
+    key = cache_key(root.source_dir) if cache_file else None
+    if cache_file is None or key is None:
+        return parse_presets(root)
+
+    if cache_file.is_file():
+        try:
+            data = json.loads(cache_file.read_text())
+            if data.get("key") == key:
+                return CachedPresets(data, root)
+        except json.JSONDecodeError:
+            sys.stderr.write(f"Warning: ignoring corrupt presets cache {cache_file}\n")
+
+    presets = parse_presets(root)
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    cache_file.write_text(json.dumps(serialize_presets(presets, key), default=str))
+    return presets
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Final
+
+from construct_matrix import parse_json
+from parallelism import available_cpus, resolve_parallel, total_memory_mb
+from plan import plan
+from run_presets import PHASES
+from timing_report import format_seconds
+
+if TYPE_CHECKING:
+    from cmakepresets.paths import CMakeRoot
+
+    from presets_cache import Presets
+
+# options that only make sense on a CI runner, the tests run unsharded and without JUnit files since all legs share this machine
+CI_ONLY_OPTIONS: Final[tuple[str, ...]] = (
+    "runs-on",
+    "toolchain",
+    "artifact",
+    "cache",
+    "incremental",
+    "group",
+    "critical",
+    "log_limit_mb",
+    "paths",
+    "paths-ignore",
+    "split",
+)
+
+
+def local_presets(presets_data: dict[str, dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    local: dict[str, dict[str, Any]] = {}
+    for name, config in presets_data.items():
+        local[name] = {key: value for key, value in config.items() if key not in CI_ONLY_OPTIONS}
+        if "test" in local[name]:
+            local[name]["test"] = {key: value for key, value in local[name]["test"].items() if key not in ("shards", "junit")}
+    return local
+
+
+def plan_legs(presets_data: dict[str, dict[str, Any]], presets: "Presets", root: "CMakeRoot") -> list[dict[str, Any]]:
+    """One leg with the configure/build/test/package commands of every preset, as the CI matrix would run them."""
+    matrix = plan(local_presets(presets_data), presets, root, "local", "local", False, 1)
+    return [leg for entry in matrix["include"] for leg in entry.get("presets", [entry])]
+
+
+# longest output line read at once, a longer line is written in pieces of this length
+MAX_LINE_LENGTH: Final[int] = 1024 * 1024
+
+
+async def stream_output(stream: asyncio.StreamReader, prefix: bytes) -> None:
+    while True:
+        try:
+            line = await stream.readuntil(b"\n")
+        except asyncio.IncompleteReadError as e:
+            line = e.partial
+        except asyncio.LimitOverrunError as e:
+            line = await stream.read(e.consumed)
+        if not line:
+            return
+        # one write per line, so lines of concurrent presets never interleave
+        sys.stdout.buffer.write(prefix + line.rstrip(b"\n") + b"\n")
+        sys.stdout.buffer.flush()
+
+
+async def run_leg(leg: dict[str, Any], cwd: Path, env: dict[str, str], width: int) -> dict[str, Any]:
+    """Run the phases of one preset in order, stopping at the first failure."""
+    result: dict[str, Any] = {"preset": leg["preset"], "failed": None, "phases": {}}
+    prefix = f"[{leg['preset']:<{width}}] "
+    for phase in PHASES:
+        command = leg.get(phase)
+        if not command:
+            continue
+
+        start = time.monotonic()
+        process = await asyncio.create_subprocess_shell(
+            command, cwd=cwd, env=env, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT, limit=MAX_LINE_LENGTH
+        )
+        assert process.stdout is not None
+        await stream_output(process.stdout, prefix.encode())
+        exit_code = await process.wait()
+        result["phases"][phase] = time.monotonic() - start
+
+        if exit_code != 0:
+            print(f"{prefix}{phase} failed with exit code {exit_code}", flush=True)
+            result["failed"] = phase
+            break
+    return result
+
+
+async def run_legs(legs: list[dict[str, Any]], cwd: Path, jobs: int) -> list[dict[str, Any]]:
+    """Run up to jobs presets at a time, sharing the CPUs between the builds and tests of the running presets."""
+    if not legs:
+        return []
+
+    semaphore = asyncio.Semaphore(jobs)
+    parallel = str(max(1, available_cpus() // min(jobs, len(legs))))
+    env = os.environ | {"CMAKE_BUILD_PARALLEL_LEVEL": parallel, "CTEST_PARALLEL_LEVEL": parallel}
+    width = max(len(leg["preset"]) for leg in legs)
+
+    async def bounded(leg: dict[str, Any]) -> dict[str, Any]:
+        async with semaphore:
+            return await run_leg(leg, cwd, env, width)
+
+    return list(await asyncio.gather(*(bounded(leg) for leg in legs)))
+
+
+def render_table(results: list[dict[str, Any]]) -> str:
+    phases = [phase for phase in PHASES if any(phase in result["phases"] for result in results)]
+    lines = [f"| Preset | Result | {' | '.join(phases)} | Total |", f"|---|---|{'---:|' * len(phases)}---:|"]
+    for result in results:
+        status = f"failed ({result['failed']})" if result["failed"] else "passed"
+        cells = [format_seconds(result["phases"].get(phase)) for phase in phases]
+        lines.append(f"| {result['preset']} | {status} | {' | '.join(cells)} | {format_seconds(sum(result['phases'].values()))} |")
+    return "\n".join(lines)
+
+
+def parse_jobs(x: str) -> int:
+    try:
+        jobs = int(x)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid number of jobs: '{x}', expected an integer")
+    if jobs < 1:
+        raise argparse.ArgumentTypeError(f"Invalid number of jobs: '{x}', expected at least 1")
+    return jobs
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the configure, build, test and package steps of every preset concurrently on this machine")
+
+    parser.add_argument("--cmake-project-root", required=True, type=Path, help="Root directory of the CMake project")
+    parser.add_argument("--presets", help="Presets json object as passed to the workflow (default: every configure preset that is not hidden)")
+    parser.add_argument("--jobs", type=parse_jobs, help="Number of presets run at a time (default: the CPU count, capped by --memory-per-preset-mb)")
+    parser.add_argument("--memory-per-preset-mb", type=int, default=0, help="Run only as many presets at a time as get this much memory each")
+
+    return parser.parse_args()
+
+
+def main() -> None:
+    try:
+        args = parse_arguments()
+
+        from cmakepresets import CMakePresets
+        from cmakepresets.paths import CMakeRoot
+
+        root = CMakeRoot(args.cmake_project_root)
+        presets = CMakePresets(root)
+        if args.presets:
+            presets_data = parse_json(args.presets)
+        else:
+            presets_data = {preset["name"]: {} for preset in presets.configure_presets if not preset.get("hidden")}
+
+        if not presets_data:
+            print("No presets to run")
+            return
+
+        legs = plan_legs(presets_data, presets, root)
+        jobs = args.jobs or resolve_parallel(available_cpus(), total_memory_mb(), args.memory_per_preset_mb)
+
+    except Exception as e:
+        sys.stderr.write(f"Error: {e}\n")
+        sys.exit(1)
+
+    results = asyncio.run(run_legs(legs, root.source_dir, jobs))
+    print(f"\n{render_table(results)}")
+
+    if any(result["failed"] for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
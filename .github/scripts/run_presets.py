@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.11"
+# dependencies = []
+# ///
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Final, cast
+
+from parallelism import parallelism_env
+
+PHASES: Final[tuple[str, ...]] = ("configure", "build", "test", "package")
+CRITICAL_PHASES: Final[tuple[str, ...]] = ("configure", "build")
+
+
+def run_preset(leg: dict[str, Any], cwd: Path) -> tuple[str | None, float]:
+    """Run the phases of one preset in order, stopping at the first failure and returning the failed phase."""
+    start = time.monotonic()
+    env: dict[str, str] | None = None
+    if "parallel" in leg:
+        env = os.environ | parallelism_env(leg["parallel"]["memory_per_job_mb"])
+
+    for phase in PHASES:
+        command = leg.get(phase)
+        if not command:
+            continue
+
+        print(f"::group::{leg['preset']}: {phase}", flush=True)
+        print(command, flush=True)
+        result = subprocess.run(command, shell=True, cwd=cwd, env=env)
+        print("::endgroup::", flush=True)
+
+        if result.returncode != 0:
+            print(f"::error::{leg['preset']}: {phase} failed with exit code {result.returncode}", flush=True)
+            return phase, time.monotonic() - start
+    return None, time.monotonic() - start
+
+
+def run_presets(legs: list[dict[str, Any]], cwd: Path, fail_fast: bool = False) -> tuple[bool, bool]:
+    """Run every preset of a batch and print a summary.
+
+    Failures do not stop the batch unless fail_fast is set and the configure or build of a critical preset fails,
+    then the remaining presets are skipped. Returns whether every preset succeeded and whether a critical one failed.
+    """
+    results: list[tuple[str, str, float]] = []
+    critical_failure = False
+    for leg in legs:
+        if critical_failure:
+            results.append((leg["preset"], "skipped", 0.0))
+            continue
+
+        failed_phase, elapsed = run_preset(leg, cwd)
+        results.append((leg["preset"], "failure" if failed_phase else "success", elapsed))
+        critical_failure = fail_fast and bool(leg.get("critical")) and failed_phase in CRITICAL_PHASES
+
+    print("\npreset results:")
+    for preset, status, elapsed in results:
+        print(f"  {preset}: {status} ({elapsed:.1f}s)")
+
+    return all(status == "success" for _, status, _ in results), critical_failure
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the steps of a batch of presets sequentially")
+
+    parser.add_argument("--cwd", required=True, type=Path, help="Root directory of the CMake project")
+    parser.add_argument("--presets", required=True, help="JSON list of matrix entries with configure/build/test/package commands")
+    parser.add_argument("--fail-fast", action="store_true", help="Skip the remaining presets when the configure or build of a critical preset fails")
+    parser.add_argument("--output", type=Path, help="File to append critical_failure=true|false to, e.g. $GITHUB_OUTPUT")
+
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_arguments()
+
+    try:
+        legs = cast(list[dict[str, Any]], json.loads(args.presets))
+    except json.JSONDecodeError as e:
+        sys.stderr.write(f"Error: JSON decode error: {e}\n")
+        sys.exit(1)
+
+    success, critical_failure = run_presets(legs, args.cwd, args.fail_fast)
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(f"critical_failure={str(critical_failure).lower()}\n")
+
+    if not success:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
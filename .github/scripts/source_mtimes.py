@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.11"
+# dependencies = []
+# ///
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+
+def list_tracked_files(source_dir: Path) -> list[str]:
+    result = subprocess.run(["git", "ls-files", "-z"], cwd=source_dir, capture_output=True, check=True)
+    return [name for name in result.stdout.decode().split("\0") if name]
+
+
+def hash_file(path: Path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def save_mtimes(source_dir: Path, manifest: Path) -> int:
+    """Record content hash, size and mtime of every tracked file."""
+    entries: dict[str, list[Any]] = {}
+    for name in list_tracked_files(source_dir):
+        path = source_dir / name
+        if path.is_file():
+            stat = path.stat()
+            entries[name] = [hash_file(path), stat.st_size, stat.st_mtime_ns]
+
+    manifest.parent.mkdir(parents=True, exist_ok=True)
+    manifest.write_text(json.dumps(entries))
+    return len(entries)
+
+
+def restore_mtimes(source_dir: Path, manifest: Path) -> int:
+    """Reset the mtime of every file whose content is unchanged since the manifest was saved.
+
+    A fresh checkout stamps every file with the checkout time, which would make a restored
+    binary directory look stale to Ninja and rebuild everything.
+    """
+    if not manifest.is_file():
+        return 0
+
+    entries: dict[str, list[Any]] = json.loads(manifest.read_text())
+    restored = 0
+    for name, (digest, size, mtime_ns) in entries.items():
+        path = source_dir / name
+        if path.is_file() and path.stat().st_size == size and hash_file(path) == digest:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+            restored += 1
+    return restored
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Save or restore source file timestamps for incremental builds")
+
+    parser.add_argument("action", choices=["save", "restore"], help="Save the manifest or restore timestamps from it")
+    parser.add_argument("--source-dir", required=True, type=Path, help="Directory of the git checkout")
+    parser.add_argument("--manifest", required=True, type=Path, help="Manifest file stored in the binary directory")
+
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_arguments()
+
+    try:
+        if args.action == "save":
+            count = save_mtimes(args.source_dir, args.manifest)
+            print(f"Recorded timestamps of {count} files")
+        else:
+            count = restore_mtimes(args.source_dir, args.manifest)
+            print(f"Restored timestamps of {count} unchanged files")
+
+    except (OSError, ValueError, subprocess.CalledProcessError) as e:
+        sys.stderr.write(f"Error: {e}\n")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
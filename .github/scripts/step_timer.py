@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.11"
+# dependencies = []
+# ///
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from parallelism import available_cpus
+
+
+def peak_child_rss_mb() -> float | None:
+    """Peak resident set size of the largest child process waited for so far."""
+    if sys.platform == "win32":
+        return None
+
+    import resource
+
+    max_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return round(max_rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_step(command: list[str]) -> tuple[int, float, float | None]:
+    """Run a command and return its exit code, wall time in seconds and peak RSS in MB."""
+    start = time.monotonic()
+    try:
+        exit_code = subprocess.run(command).returncode
+    except FileNotFoundError as e:
+        sys.stderr.write(f"Error: {e}\n")
+        exit_code = 127
+    return exit_code, round(time.monotonic() - start, 3), peak_child_rss_mb()
+
+
+def record_path(output_dir: Path, preset: str, phase: str) -> Path:
+    return output_dir / f"{preset}.{phase}.json"
+
+
+def write_record(output_dir: Path, record: dict[str, Any]) -> Path:
+    path = record_path(output_dir, record["preset"], record["phase"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(record))
+    return path
+
+
+def start_timer(output_dir: Path, preset: str, phase: str) -> None:
+    """Mark the start of a phase that is not a command, such as an action step."""
+    path = record_path(output_dir, preset, phase).with_suffix(".start")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(str(time.time()))
+
+
+def stop_timer(output_dir: Path, preset: str, phase: str, exit_code: int) -> dict[str, Any]:
+    start_path = record_path(output_dir, preset, phase).with_suffix(".start")
+    seconds = round(time.time() - float(start_path.read_text()), 3)
+    start_path.unlink()
+
+    record = {"preset": preset, "phase": phase, "seconds": seconds, "max_rss_mb": None, "exit_code": exit_code, "cpus": available_cpus()}
+    write_record(output_dir, record)
+    return record
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Record wall time, peak memory and exit code of a build step")
+
+    parser.add_argument("action", choices=["run", "start", "stop"], help="Run and time a command, or start/stop the timer of a phase")
+    parser.add_argument("--preset", required=True, help="Preset the step belongs to")
+    parser.add_argument("--phase", required=True, help="Phase of the step (e.g. configure, build, test)")
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=Path(os.environ.get("CMAKE_BUILDER_TIMINGS", ".cmake-builder-timings")),
+        help="Directory for the timing records (default: $CMAKE_BUILDER_TIMINGS)",
+    )
+    parser.add_argument("--exit-code", type=int, default=0, help="Exit code recorded by stop")
+    parser.add_argument("--retried", action="store_true", help="A failure of the command is retried by another step, which records the outcome")
+
+    # everything after -- is the command to run, passed through untouched
+    argv = sys.argv[1:]
+    command: list[str] = []
+    if "--" in argv:
+        command = argv[argv.index("--") + 1 :]
+        argv = argv[: argv.index("--")]
+
+    args = parser.parse_args(argv)
+    args.command = command
+    if args.action == "run" and not command:
+        parser.error("run requires a command after --")
+    return args
+
+
+def main() -> None:
+    args = parse_arguments()
+
+    try:
+        if args.action == "start":
+            start_timer(args.output_dir, args.preset, args.phase)
+        elif args.action == "stop":
+            stop_timer(args.output_dir, args.preset, args.phase, args.exit_code)
+        else:
+            exit_code, seconds, max_rss_mb = run_step(args.command)
+            record = {
+                "preset": args.preset,
+                "phase": args.phase,
+                "seconds": seconds,
+                "max_rss_mb": max_rss_mb,
+                "exit_code": exit_code,
+                # the runner balancing of later runs scales the build and test time by the cores it ran on
+                "cpus": available_cpus(),
+            }
+            if args.retried:
+                record["retried"] = True
+            write_record(args.output_dir, record)
+            sys.exit(exit_code)
+
+    except (OSError, ValueError) as e:
+        sys.stderr.write(f"Error: {e}\n")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
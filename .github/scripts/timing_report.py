@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.11"
+# dependencies = []
+# ///
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Final
+
+PHASES: Final[tuple[str, ...]] = ("setup", "configure", "build", "test", "package", "upload")
+
+
+def load_records(input_dir: Path) -> list[dict[str, Any]]:
+    """Timing records written by step_timer.py, in any subdirectory of input_dir."""
+    return [json.loads(path.read_text()) for path in sorted(input_dir.rglob("*.json"))]
+
+
+def build_report(records: list[dict[str, Any]]) -> dict[str, Any]:
+    """Per-preset totals and every step, both sorted slowest first."""
+    presets: dict[str, dict[str, Any]] = {}
+    for record in records:
+        preset = presets.setdefault(
+            record["preset"], {"preset": record["preset"], "seconds": 0.0, "max_rss_mb": None, "cpus": None, "failed": [], "phases": {}}
+        )
+        preset["seconds"] = round(preset["seconds"] + record["seconds"], 3)
+        preset["phases"][record["phase"]] = round(preset["phases"].get(record["phase"], 0.0) + record["seconds"], 3)
+        if record.get("max_rss_mb") is not None:
+            preset["max_rss_mb"] = max(preset["max_rss_mb"] or 0.0, record["max_rss_mb"])
+        if record.get("cpus"):
+            preset["cpus"] = max(preset["cpus"] or 0, record["cpus"])
+        # a failed test run that is retried only fails the preset when its rerun does
+        if record.get("exit_code") and not record.get("retried"):
+            preset["failed"].append(record["phase"])
+
+    return {
+        "presets": sorted(presets.values(), key=lambda preset: preset["seconds"], reverse=True),
+        "steps": sorted(records, key=lambda record: record["seconds"], reverse=True),
+    }
+
+
+def format_seconds(seconds: float | None) -> str:
+    if seconds is None:
+        return ""
+    minutes, seconds = divmod(seconds, 60)
+    return f"{int(minutes)}m {seconds:04.1f}s" if minutes else f"{seconds:.1f}s"
+
+
+def render_markdown(report: dict[str, Any], top: int) -> str:
+    phases = [phase for phase in PHASES if any(phase in preset["phases"] for preset in report["presets"])]
+    phases += sorted({phase for preset in report["presets"] for phase in preset["phases"]} - set(phases))
+
+    lines = ["## Build performance", ""]
+    if not report["presets"]:
+        return "\n".join(lines + ["No timing records found.", ""])
+
+    lines.append(f"| Preset | Total | {' | '.join(phases)} | Peak RSS (MB) | Failed |")
+    lines.append(f"|---|---:|{'---:|' * len(phases)}---:|---|")
+    for preset in report["presets"]:
+        cells = [format_seconds(preset["phases"].get(phase)) for phase in phases]
+        max_rss_mb = "" if preset["max_rss_mb"] is None else f"{preset['max_rss_mb']:.0f}"
+        lines.append(f"| {preset['preset']} | {format_seconds(preset['seconds'])} | {' | '.join(cells)} | {max_rss_mb} | {', '.join(preset['failed'])} |")
+
+    lines += ["", "### Slowest steps", "", "| Preset | Phase | Time | Peak RSS (MB) | Exit code |", "|---|---|---:|---:|---:|"]
+    for step in report["steps"][:top]:
+        max_rss_mb = "" if step.get("max_rss_mb") is None else f"{step['max_rss_mb']:.0f}"
+        lines.append(f"| {step['preset']} | {step['phase']} | {format_seconds(step['seconds'])} | {max_rss_mb} | {step['exit_code']} |")
+
+    return "\n".join(lines + [""])
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Aggregate the step timings of a workflow run into a performance report")
+
+    parser.add_argument("--input-dir", required=True, type=Path, help="Directory with the timing records of every job")
+    parser.add_argument("--summary", type=Path, help="Markdown file to append the report to, e.g. $GITHUB_STEP_SUMMARY")
+    parser.add_argument("--output", type=Path, help="Write the full report as JSON to this file")
+    parser.add_argument("--top", type=int, default=20, help="Number of steps listed in the slowest steps table")
+
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_arguments()
+
+    try:
+        report = build_report(load_records(args.input_dir))
+        markdown = render_markdown(report, args.top)
+
+        if args.summary:
+            with open(args.summary, "a") as summary:
+                summary.write(markdown)
+        else:
+            print(markdown)
+
+        if args.output:
+            args.output.write_text(json.dumps(report, indent=2))
+
+    except (OSError, ValueError, KeyError) as e:
+        sys.stderr.write(f"Error: {e}\n")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
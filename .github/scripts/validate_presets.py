@@ -1,12 +1,20 @@
 #!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.11"
+# dependencies = ["jsonschema>=4.23.0"]
+# ///
 
 import argparse
 import json
 import sys
+from functools import cache
 from pathlib import Path
-from typing import Any, cast
+from typing import TYPE_CHECKING, Any, Final, cast
 
-import jsonschema
+if TYPE_CHECKING:
+    from jsonschema.protocols import Validator
+
+SCHEMA_PATH: Final[Path] = Path(__file__).parent / "preset-schema.json"
 
 
 def parse_json(json_str: str) -> dict[str, Any]:
@@ -16,22 +24,33 @@ def parse_json(json_str: str) -> dict[str, Any]:
         raise ValueError(f"JSON decode error: {err}")
 
 
-def validate_presets(presets_data: dict[str, Any]) -> None:
-    schema_path = Path(__file__).parent / "preset-schema.json"
+@cache
+def get_validator() -> "Validator":
+    """Load the preset schema and build its validator once per process."""
+    import jsonschema
 
     try:
-        with open(schema_path) as schema_file:
+        with open(SCHEMA_PATH) as schema_file:
             preset_schema = json.load(schema_file)
     except FileNotFoundError:
-        raise ValueError(f"Schema file not found: {schema_path}")
+        raise ValueError(f"Schema file not found: {SCHEMA_PATH}")
 
-    try:
-        jsonschema.validate(instance=presets_data, schema=preset_schema)
-    except jsonschema.ValidationError as err:
-        error_path = ""
-        if hasattr(err, "absolute_path") and err.absolute_path:
-            error_path = f" @ {' -> '.join(str(x) for x in err.absolute_path)}"
-        raise ValueError(f"Preset validation error{error_path}: {err}")
+    validator_class = jsonschema.validators.validator_for(preset_schema)
+    validator_class.check_schema(preset_schema)
+    return cast("Validator", validator_class(preset_schema))
+
+
+def validate_presets(presets_data: dict[str, Any]) -> None:
+    """Validate the presets against the schema, reporting every error at once."""
+    errors = sorted(get_validator().iter_errors(presets_data), key=lambda err: [str(x) for x in err.absolute_path])
+    if not errors:
+        return
+
+    messages = []
+    for err in errors:
+        error_path = f" @ {' -> '.join(str(x) for x in err.absolute_path)}" if err.absolute_path else ""
+        messages.append(f"Preset validation error{error_path}: {err.message}")
+    raise ValueError("\n".join(messages))
 
 
 def parse_arguments() -> argparse.Namespace:
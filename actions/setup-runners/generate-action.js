@@ -1,3 +1,4 @@
+const crypto = require('crypto');
 const fs = require('fs');
 const path = require('path');
 
@@ -22,6 +23,11 @@ const baseActionExists = checkActionExists(baseActionPath);
 const toolchainActionExists = checkActionExists(toolchainActionPath);
 const presetActionExists = checkActionExists(presetActionPath);
 
+// Packages installed by the actions, listed in an apt-packages.txt next to each action that installs from it
+const aptManifests = [baseActionPath, toolchainActionPath, presetActionPath]
+  .map(actionPath => `${actionPath}/apt-packages.txt`)
+  .filter(manifestPath => fs.existsSync(manifestPath));
+
 // If no actions exist, exit gracefully
 if (!baseActionExists && !toolchainActionExists && !presetActionExists) {
   console.log("No actions found, exiting gracefully");
@@ -57,6 +63,39 @@ runs:
   using: composite
   steps:`;
 
+// Restore the .debs downloaded by a previous run, keyed on the runner image and the declared packages
+const aptCacheDir = '~/.cache/cmake-builder-apt';
+if (aptManifests.length > 0) {
+  const manifestHash = crypto.createHash('sha256');
+  for (const manifestPath of aptManifests) {
+    manifestHash.update(fs.readFileSync(manifestPath));
+  }
+  const imageOs = process.env.ImageOS || runsOn;
+  const imageVersion = process.env.ImageVersion || 'unknown';
+  const aptCacheKey = `cmake-builder-apt-${imageOs}-${imageVersion}-${manifestHash.digest('hex').slice(0, 16)}`;
+
+  console.log(`Found apt manifests: ${aptManifests.join(', ')}`);
+  actionContent += `
+    - id: apt-cache
+      uses: actions/cache/restore@caa296126883cff596d87d8935842f9db880ef25 # v5.1.0
+      with:
+        path: ${aptCacheDir}
+        key: ${aptCacheKey}
+    - name: Install cached apt packages
+      if: steps.apt-cache.outputs.cache-hit == 'true'
+      shell: bash
+      run: |
+        # the cache is empty when every package was already on the image, the actions then install them as usual
+        if compgen -G ${aptCacheDir}/\\*.deb >/dev/null; then
+          sudo dpkg -i ${aptCacheDir}/*.deb
+          echo "CMAKE_BUILDER_APT_CACHE_HIT=true" >> "$GITHUB_ENV"
+        fi
+    - name: Keep downloaded apt packages
+      if: steps.apt-cache.outputs.cache-hit != 'true'
+      shell: bash
+      run: echo 'Binary::apt::APT::Keep-Downloaded-Packages "true";' | sudo tee /etc/apt/apt.conf.d/99cmake-builder-keep-debs >/dev/null`;
+}
+
 // Add steps for each action that exists
 if (baseActionExists) {
   console.log("Found BASE action");
@@ -91,6 +130,21 @@ if (presetActionExists) {
         secret4: \${{ inputs.secret4 }}`;
 }
 
+if (aptManifests.length > 0) {
+  actionContent += `
+    - name: Collect downloaded apt packages
+      if: steps.apt-cache.outputs.cache-hit != 'true'
+      shell: bash
+      run: |
+        mkdir -p ${aptCacheDir}
+        find /var/cache/apt/archives -maxdepth 1 -name '*.deb' -exec cp {} ${aptCacheDir}/ \\;
+    - if: steps.apt-cache.outputs.cache-hit != 'true'
+      uses: actions/cache/save@caa296126883cff596d87d8935842f9db880ef25 # v5.1.0
+      with:
+        path: ${aptCacheDir}
+        key: \${{ steps.apt-cache.outputs.cache-primary-key }}`;
+}
+
 // Write the generated action file
 fs.writeFileSync(`${selectSetupActionsPath}/action.yml`, actionContent);
 
@@ -0,0 +1,106 @@
+import subprocess
+import sys
+import tarfile
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / ".github" / "scripts"))
+from archive_artifact import collect_files, create_archive, main, outside_cwd
+
+
+class TestArchiveArtifact:
+    @pytest.fixture(scope="function")  # type: ignore
+    def workspace(self, tmp_path: Path) -> Path:
+        for name, content in {
+            "build/debug/app": "binary debug",
+            "build/debug/include/shared.h": "int shared();",
+            "build/debug/tests/broken_tests": "broken",
+            "build/debug/CMakeFiles/app.dir/main.o": "object",
+            "build/release/app": "binary release",
+            "build/release/include/shared.h": "int shared();",
+            "build/release/docs/index.md": "docs",
+        }.items():
+            path = tmp_path / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+        return tmp_path
+
+    def test_collect_files(self, workspace: Path) -> None:
+        patterns = ["build/debug", "!build/debug/tests", "!**/CMakeFiles", "build/*/docs/*.md", "build/debug/app"]
+        assert collect_files(workspace, patterns) == ["build/debug/app", "build/debug/include/shared.h", "build/release/docs/index.md"]
+
+    def test_collect_files_without_matches(self, workspace: Path) -> None:
+        assert collect_files(workspace, ["missing", "!build"]) == []
+
+    @pytest.mark.parametrize(  # type: ignore
+        "path, expected",
+        [
+            ("build", False),
+            ("build/a..b/**", False),
+            ("/abs", True),
+            ("\\server\\share", True),
+            ("C:/build", True),
+            ("~/build", True),
+            ("build/../..", True),
+            ("build\\..\\..", True),
+        ],
+    )
+    def test_outside_cwd(self, path: str, expected: bool) -> None:
+        assert outside_cwd(path) is expected
+
+    @pytest.mark.parametrize("pattern", ["../outside", "{workspace}/outside"])  # type: ignore
+    def test_collect_files_outside_cwd(self, pattern: str, workspace: Path) -> None:
+        (workspace / "inside").mkdir()
+        (workspace / "outside").write_text("outside")
+
+        with pytest.raises(ValueError, match="is outside .*, an archive can only hold paths below it"):
+            collect_files(workspace / "inside", [pattern.format(workspace=workspace)])
+
+    def test_create_archive_deduplicates(self, workspace: Path, tmp_path: Path) -> None:
+        output = tmp_path / "out" / "artifact.tar.zst"
+        (workspace / "build/debug/app-link").symlink_to("app")
+
+        assert create_archive(workspace, ["build/debug/app*", "build/debug/include", "build/release/include"], output, 3) == (4, 1)
+
+        tar_file = tmp_path / "artifact.tar"
+        subprocess.run(["zstd", "-q", "-d", str(output), "-o", str(tar_file)], check=True)
+        with tarfile.open(tar_file) as tar:
+            members = {member.name: member for member in tar.getmembers()}
+            assert members["build/debug/include/shared.h"].isfile()
+            assert members["build/release/include/shared.h"].islnk()
+            assert members["build/release/include/shared.h"].linkname == "build/debug/include/shared.h"
+            assert members["build/debug/app-link"].issym()
+
+            extracted = tmp_path / "extracted"
+            tar.extractall(extracted, filter="data")
+        assert (extracted / "build/release/include/shared.h").read_text() == "int shared();"
+        assert (extracted / "build/debug/app").read_text() == "binary debug"
+
+    def test_create_archive_without_files(self, workspace: Path) -> None:
+        with pytest.raises(ValueError, match="No files found"):
+            create_archive(workspace, ["missing"], workspace / "artifact.tar.zst", 3)
+
+    def test_create_archive_zstd_failure(self, workspace: Path) -> None:
+        # the output is a directory, which zstd refuses to overwrite
+        with pytest.raises(OSError, match="zstd failed"):
+            create_archive(workspace, ["build/debug/app"], workspace / "build", 3)
+
+    def test_main(self, workspace: Path, capsys: Any) -> None:
+        output = workspace / ".cmake-builder-artifact" / "debug.tar.zst"
+        argv = ["archive_artifact.py", "--cwd", str(workspace), "--paths", "build/debug\nbuild/release\n", "--output", str(output)]
+        with patch("sys.argv", argv):
+            main()
+
+        assert output.is_file()
+        assert "Archived 7 files" in capsys.readouterr().out
+
+    @patch("sys.stderr")
+    @patch("sys.exit")
+    def test_main_no_files(self, mock_exit: Any, mock_stderr: Any, workspace: Path) -> None:
+        with patch("sys.argv", ["archive_artifact.py", "--cwd", str(workspace), "--paths", "missing", "--output", str(workspace / "a.tar.zst")]):
+            main()
+        assert any("Error: No files found" in args[0] for args, _ in mock_stderr.write.call_args_list)
+        mock_exit.assert_called_with(1)
@@ -0,0 +1,187 @@
+import gzip
+import io
+import json
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, Final
+
+import pytest
+from cmakepresets import CMakePresets
+from cmakepresets.paths import CMakeRoot
+
+sys.path.insert(0, str(Path(__file__).parent.parent / ".github" / "scripts"))
+from construct_matrix import construct_matrix
+from generate_steps import generate_outputs
+from log_filter import CHUNK_SIZE, LogFilter
+from plan import plan
+from validate_presets import validate_presets
+
+SCRIPTS_DIR: Final[Path] = Path(__file__).parent.parent / ".github" / "scripts"
+
+# budgets as multiples of a baseline measured in the same run, so a loaded or slow runner raises both alike:
+# the cold start import over the start of a bare interpreter
+IMPORT_BUDGETS: Final[dict[str, float]] = {"construct_matrix": 8.0, "validate_presets": 8.0, "generate_steps": 8.0, "plan": 8.0}
+# cumulative `python -X importtime` of the module itself over that of the stdlib modules every script imports
+IMPORTTIME_BUDGETS: Final[dict[str, float]] = {"construct_matrix": 4.0, "validate_presets": 4.0, "generate_steps": 5.0, "plan": 6.0}
+REFERENCE_IMPORTS: Final[tuple[str, ...]] = ("argparse", "json", "pathlib")
+# a call over a JSON round trip of the presets input of 500 presets
+CALL_BUDGETS: Final[dict[str, float]] = {"validate_presets": 150.0, "construct_matrix": 50.0, "generate_outputs": 100.0, "plan": 500.0}
+# runtime at 500 presets over 50 presets, linear scaling gives 10
+MAX_SCALING: Final[float] = 25.0
+
+# the log filter over gzipping the same output, which it has to do anyway
+MAX_LOG_FILTER_OVERHEAD: Final[float] = 8.0
+
+INHERITS_DEPTH: Final[int] = 50
+INCLUDE_FILES: Final[int] = 20
+
+
+def measure(fn: Callable[[], Any], repeat: int = 5) -> float:
+    """Best wall time of repeat calls, the least noisy estimate of the cost of a call."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def importtime(module: str, names: tuple[str, ...]) -> float:
+    """Cumulative `python -X importtime` of the given top-level imports of a fresh interpreter importing module."""
+    command = [sys.executable, "-X", "importtime", "-c", f"import sys; sys.path.insert(0, {str(SCRIPTS_DIR)!r}); import {module}"]
+    stderr = subprocess.run(command, capture_output=True, text=True, check=True).stderr
+    return sum(int(line.split("|")[1]) for line in stderr.splitlines()[1:] if line.split("|")[-1].strip() in names) / 1_000_000
+
+
+def synthetic_presets(count: int) -> dict[str, Any]:
+    presets_data: dict[str, Any] = {}
+    for i in range(count):
+        presets_data[f"preset-{i}"] = {
+            "runs-on": ["ubuntu-latest", "macos-latest", "windows-latest"][i % 3],
+            "artifact": {"path": ["build/tests", "!build/tests/**/*.md"], "retention_days": 1},
+            "cache": {"launcher": "ccache"},
+            "paths": ["src/**", "!src/docs/**"],
+        }
+        if i % 5 == 0:
+            presets_data[f"preset-{i}"]["group"] = f"group-{i % 3}"
+    return presets_data
+
+
+@pytest.fixture(scope="module")  # type: ignore
+def baseline() -> dict[str, float]:
+    """Seconds of the reference work the budgets are multiples of, measured on this machine."""
+    presets_data = synthetic_presets(500)
+    return {
+        "startup": measure(lambda: subprocess.run([sys.executable, "-c", "pass"], check=True), repeat=5),
+        "importtime": min(importtime(", ".join(REFERENCE_IMPORTS), REFERENCE_IMPORTS) for _ in range(3)),
+        "call": measure(lambda: json.loads(json.dumps(presets_data)), repeat=10),
+    }
+
+
+@pytest.mark.benchmark
+class TestBenchmarks:
+    @pytest.fixture(scope="function")  # type: ignore
+    def deep_project(self, tmp_path: Path) -> CMakeRoot:
+        """A project whose presets inherit in a chain of INHERITS_DEPTH spread over INCLUDE_FILES include files."""
+        root = tmp_path
+        per_file = INHERITS_DEPTH // INCLUDE_FILES + 1
+        includes = []
+        for file_index in range(INCLUDE_FILES):
+            configure_presets = []
+            for depth in range(file_index * per_file, min((file_index + 1) * per_file, INHERITS_DEPTH)):
+                preset: dict[str, Any] = {"name": f"level-{depth}", "hidden": True, "cacheVariables": {f"VAR_{depth}": str(depth)}}
+                if depth == 0:
+                    preset |= {"generator": "Ninja", "binaryDir": "${sourceDir}/build/${presetName}"}
+                else:
+                    preset["inherits"] = f"level-{depth - 1}"
+                configure_presets.append(preset)
+
+            name = f"presets/level-{file_index}.json"
+            (root / name).parent.mkdir(exist_ok=True)
+            file_includes = [f"level-{file_index - 1}.json"] if file_index else []
+            (root / name).write_text(json.dumps({"version": 6, "include": file_includes, "configurePresets": configure_presets}))
+            includes.append(name)
+
+        leaf = f"level-{INHERITS_DEPTH - 1}"
+        (root / "CMakePresets.json").write_text(
+            json.dumps(
+                {
+                    "version": 6,
+                    "include": includes,
+                    "configurePresets": [{"name": "deep", "inherits": leaf}],
+                    "buildPresets": [{"name": "deep", "configurePreset": "deep"}],
+                    "testPresets": [{"name": "deep", "configurePreset": "deep"}],
+                },
+            ),
+        )
+        return CMakeRoot(root)
+
+    @pytest.mark.parametrize("module", list(IMPORT_BUDGETS))  # type: ignore
+    def test_cold_start_import(self, module: str, baseline: dict[str, float]) -> None:
+        command = [sys.executable, "-c", f"import sys; sys.path.insert(0, {str(SCRIPTS_DIR)!r}); import {module}"]
+        ratio = measure(lambda: subprocess.run(command, check=True), repeat=3) / baseline["startup"]
+        assert ratio < IMPORT_BUDGETS[module], f"importing {module} took {ratio:.1f}x the interpreter startup"
+
+    @pytest.mark.parametrize("module", list(IMPORTTIME_BUDGETS))  # type: ignore
+    def test_importtime(self, module: str, baseline: dict[str, float]) -> None:
+        ratio = min(importtime(module, (module,)) for _ in range(3)) / baseline["importtime"]
+        assert ratio < IMPORTTIME_BUDGETS[module], f"importing {module} took {ratio:.1f}x importing {', '.join(REFERENCE_IMPORTS)}"
+
+    @pytest.mark.parametrize("count", [1, 50, 500])  # type: ignore
+    def test_validate_presets(self, count: int, baseline: dict[str, float]) -> None:
+        presets_data = synthetic_presets(count)
+        ratio = measure(lambda: validate_presets(presets_data)) / baseline["call"]
+        assert ratio < CALL_BUDGETS["validate_presets"], f"validating {count} presets took {ratio:.1f}x the baseline"
+
+    @pytest.mark.parametrize("count", [1, 50, 500])  # type: ignore
+    def test_construct_matrix(self, count: int, baseline: dict[str, float]) -> None:
+        presets_data = synthetic_presets(count)
+        changed_files = [f"src/module_{i}/file_{i}.cpp" for i in range(300)]
+        ratio = measure(lambda: construct_matrix(presets_data, "ubuntu-latest", "gcc", changed_files, 4)) / baseline["call"]
+        assert ratio < CALL_BUDGETS["construct_matrix"], f"constructing the matrix of {count} presets took {ratio:.1f}x the baseline"
+
+    @pytest.mark.parametrize("fn", [validate_presets, lambda data: construct_matrix(data, "ubuntu-latest", "gcc", ["src/main.cpp"], 4)])  # type: ignore
+    def test_scales_linearly(self, fn: Callable[[dict[str, Any]], Any]) -> None:
+        small, large = synthetic_presets(50), synthetic_presets(500)
+        scaling = measure(lambda: fn(large)) / measure(lambda: fn(small))
+        assert scaling < MAX_SCALING, f"500 presets took {scaling:.1f}x as long as 50 presets"
+
+    def test_generate_outputs_deep_inherits(self, deep_project: CMakeRoot, baseline: dict[str, float]) -> None:
+        def generate() -> None:
+            presets = CMakePresets(deep_project)
+            generate_outputs(presets, deep_project, "deep", True, 5, {"cache": {"launcher": "ccache"}, "incremental": True}, "gcc", "ubuntu-latest")
+
+        ratio = measure(generate) / baseline["call"]
+        assert ratio < CALL_BUDGETS["generate_outputs"], f"generating the steps of a {INHERITS_DEPTH} deep preset took {ratio:.1f}x the baseline"
+
+    def test_plan_deep_inherits(self, deep_project: CMakeRoot, baseline: dict[str, float]) -> None:
+        presets_data = {"deep": {"cache": {"launcher": "ccache"}, "incremental": True, "test": {"shards": 20}}}
+
+        def run_plan() -> None:
+            plan(presets_data, CMakePresets(deep_project), deep_project, "ubuntu-latest", "gcc", True, 5)
+
+        ratio = measure(run_plan, repeat=3) / baseline["call"]
+        assert ratio < CALL_BUDGETS["plan"], f"planning 20 shards of a {INHERITS_DEPTH} deep preset took {ratio:.1f}x the baseline"
+
+    def test_log_filter_throughput(self) -> None:
+        line = b"[123/4567] Building CXX object src/CMakeFiles/app.dir/some/path/file.cpp.o -Werror -Wall -Wextra\n"
+        data = line * (32 * 1024 * 1024 // len(line))
+        chunks = [data[i : i + CHUNK_SIZE] for i in range(0, len(data), CHUNK_SIZE)]
+
+        def gzip_log() -> None:
+            with gzip.GzipFile(fileobj=io.BytesIO(), mode="wb", compresslevel=1) as log:
+                for chunk in chunks:
+                    log.write(chunk)
+
+        def filter_log() -> None:
+            with gzip.GzipFile(fileobj=io.BytesIO(), mode="wb", compresslevel=1) as log:
+                log_filter = LogFilter(log, io.BytesIO(), 1024 * 1024)
+                for chunk in chunks:
+                    log_filter.write(chunk)
+                log_filter.close()
+
+        overhead = measure(filter_log, repeat=3) / measure(gzip_log, repeat=3)
+        assert overhead < MAX_LOG_FILTER_OVERHEAD, f"filtering the log took {overhead:.1f}x gzipping it"
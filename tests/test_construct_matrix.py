@@ -8,7 +8,18 @@ import pytest
 from pytest import FixtureRequest
 
 sys.path.insert(0, str(Path(__file__).parent.parent / ".github" / "scripts"))
-from construct_matrix import construct_matrix, main, parse_json
+from construct_matrix import (
+    balance_runners,
+    batch_entries,
+    construct_matrix,
+    entry_estimates,
+    estimate_seconds,
+    main,
+    matches_filters,
+    parse_json,
+    parse_runners,
+    prune_presets,
+)
 
 
 class TestConstructMatrix:
@@ -18,6 +29,7 @@ class TestConstructMatrix:
             "preset1": {"runs-on": "ubuntu-latest", "toolchain": "gcc"},
             "preset2": {"toolchain": "clang"},
             "preset3": {"runs-on": "windows-latest", "artifact": {"path": ["build/artifacts"], "retention_days": 14}},
+            "preset4": {"cache": {"launcher": "ccache"}, "incremental": True},
         }
 
     def test_parse_json_valid(self) -> None:
@@ -38,7 +50,7 @@ class TestConstructMatrix:
 
         # Check matrix format
         assert "include" in matrix
-        assert len(matrix["include"]) == 3
+        assert len(matrix["include"]) == 4
 
         # Check preset1
         preset1_entry = next(entry for entry in matrix["include"] if entry["preset"] == "preset1")
@@ -58,6 +70,12 @@ class TestConstructMatrix:
 
         assert preset3_entry["artifact"]["path"] == ["build/artifacts"]
         assert preset3_entry["artifact"]["retention_days"] == 14
+        assert "cache" not in preset3_entry
+
+        # Check preset4 with compiler cache
+        preset4_entry = next(entry for entry in matrix["include"] if entry["preset"] == "preset4")
+        assert preset4_entry["cache"] == {"launcher": "ccache"}
+        assert preset4_entry["incremental"] is True
 
     @patch(
         "sys.argv",
@@ -90,3 +108,342 @@ class TestConstructMatrix:
         assert matrix["include"][0]["preset"] == "preset1"
         assert matrix["include"][0]["runs-on"] == "windows-latest"
         assert matrix["include"][0]["toolchain"] == "gcc"
+
+    @pytest.mark.parametrize(
+        "path, patterns, expected",
+        [
+            ("src/main.cpp", ["src/**"], True),
+            ("src/lib/a.cpp", ["src/*"], False),
+            ("src/lib/a.cpp", ["src/**/*.cpp"], True),
+            ("README.md", ["**/*.md"], True),
+            ("docs/guide/index.md", ["**/*.md"], True),
+            ("docs/a.md", ["docs/?.md"], True),
+            ("docs/ab.md", ["docs/?.md"], False),
+            ("src/main.cpp", ["src/**", "!src/*.cpp"], False),
+            ("src/main.cpp", ["src/**", "!src/*.cpp", "src/main.cpp"], True),
+            ("src/main.cpp", ["!src/**"], False),
+            ("src/main.cpp", [], False),
+        ],
+    )  # type: ignore
+    def test_matches_filters(self, path: str, patterns: list[str], expected: bool) -> None:
+        assert matches_filters(path, patterns) is expected
+
+    def test_prune_presets(self) -> None:
+        presets: dict[str, dict[str, Any]] = {
+            "always": {},
+            "linux": {"paths": ["src/**", "platform/linux/**"]},
+            "windows": {"paths": ["src/**", "platform/windows/**"]},
+            "code": {"paths-ignore": ["docs/**", "**/*.md"]},
+            "linux-code": {"paths": ["platform/linux/**"], "paths-ignore": ["**/*.md"]},
+        }
+
+        assert prune_presets(presets, None) == []
+        assert prune_presets(presets, ["docs/index.md", "README.md"]) == ["linux", "windows", "code", "linux-code"]
+        assert prune_presets(presets, ["platform/linux/main.cpp"]) == ["windows"]
+        assert prune_presets(presets, ["platform/linux/README.md"]) == ["windows", "code", "linux-code"]
+        assert prune_presets(presets, ["src/main.cpp"]) == ["linux-code"]
+        # a tag push or an empty diff lists no files, which builds everything as without the list
+        assert prune_presets(presets, []) == []
+
+    def test_construct_matrix_with_changed_files(self) -> None:
+        presets: dict[str, dict[str, Any]] = {"linux": {"paths": ["linux/**"]}, "windows": {"paths": ["windows/**"]}}
+
+        matrix = construct_matrix(presets, "ubuntu-latest", "gcc", ["windows/main.cpp"])
+
+        assert [entry["preset"] for entry in matrix["include"]] == ["windows"]
+
+    @patch("sys.stdout")
+    def test_main_with_changed_files(self, mock_stdout: Any, tmp_path: Path) -> None:
+        changed_files = tmp_path / "changed-files.txt"
+        changed_files.write_text("docs/index.md\n\nREADME.md\n")
+        argv = [
+            "construct_matrix.py",
+            "--default-runs-on",
+            "ubuntu-latest",
+            "--default-toolchain",
+            "gcc",
+            "--presets",
+            '{"debug": {"paths-ignore": ["**/*.md"]}, "release": {}}',
+            "--changed-files",
+            str(changed_files),
+        ]
+        with patch("sys.argv", argv):
+            main()
+
+        output_lines = [args[0] for args, _ in mock_stdout.write.call_args_list]
+        matrix_line = next(line for line in output_lines if line.startswith("matrix="))
+        assert [entry["preset"] for entry in json.loads(matrix_line.split("=", 1)[1])["include"]] == ["release"]
+        assert 'pruned=["debug"]' in output_lines
+
+    @pytest.fixture(scope="function")  # type: ignore
+    def runners(self) -> list[dict[str, Any]]:
+        return [
+            {"label": "ubuntu-16", "cores": 16, "cost_per_minute": 0.032},
+            {"label": "ubuntu-latest", "cores": 4, "cost_per_minute": 0.008},
+            {"label": "ubuntu-8", "cores": 8, "cost_per_minute": 0.016},
+            {"label": "ubuntu-2", "cores": 2, "cost_per_minute": 0.004},
+        ]
+
+    @pytest.fixture(scope="function")  # type: ignore
+    def timings(self) -> dict[str, Any]:
+        return {
+            "presets": [
+                {"preset": "heavy", "seconds": 1260.0, "cpus": 4, "phases": {"setup": 60.0, "build": 1200.0}},
+                {"preset": "light", "seconds": 120.0, "cpus": None, "phases": {"setup": 60.0, "build": 60.0}},
+                {"preset": "mac", "seconds": 600.0, "cpus": 3, "phases": {"build": 600.0}},
+            ]
+        }
+
+    def test_estimate_seconds(self) -> None:
+        timing = {"seconds": 100.0, "phases": {"configure": 20.0, "build": 60.0, "test": 20.0}}
+        assert estimate_seconds(timing, 8, 4) == 180.0
+        assert estimate_seconds(timing, 8, 16) == 60.0
+
+        # the per preset phases of related_presets: all and the test reruns scale as well
+        timing = {"seconds": 100.0, "phases": {"configure": 20.0, "build-app": 40.0, "build-docs": 20.0, "test": 10.0, "test-rerun": 10.0}}
+        assert estimate_seconds(timing, 8, 4) == 180.0
+
+    def test_entry_estimates_of_batch(self, runners: list[dict[str, Any]]) -> None:
+        timings = {
+            "a": {"seconds": 40.0, "phases": {"build": 40.0}},
+            "b-1of2": {"seconds": 20.0, "cpus": 2, "phases": {"test": 20.0}},
+            "all": {"seconds": 30.0, "phases": {"setup": 30.0}},
+        }
+        entry = {"preset": "all", "presets": [{"preset": "a"}, {"preset": "b", "shard": {"index": 1, "count": 2}}]}
+
+        assert entry_estimates(entry, timings, runners[1:2], 4) == [40.0 + 10.0 + 30.0]
+        assert entry_estimates(entry | {"presets": [{"preset": "a"}, {"preset": "c"}]}, timings, runners, 4) is None
+
+    @pytest.mark.parametrize(
+        "budget, heavy_runner, wall_seconds, cost",
+        [(None, "ubuntu-16", 360.0, 0.204), (0.2, "ubuntu-8", 660.0, 0.188), (0.1, "ubuntu-latest", 1260.0, 0.18)],
+    )  # type: ignore
+    def test_balance_runners(
+        self, budget: float | None, heavy_runner: str, wall_seconds: float, cost: float, runners: list[dict[str, Any]], timings: dict[str, Any]
+    ) -> None:
+        presets: dict[str, dict[str, Any]] = {
+            "heavy": {},
+            "light": {},
+            "fresh": {},
+            "mac": {"runs-on": "macos-latest"},
+            "pinned": {"runs-on": "ubuntu-latest"},
+        }
+        matrix = construct_matrix(presets, "ubuntu-latest", "gcc")
+
+        decision = balance_runners(matrix, presets, "ubuntu-latest", timings, runners, budget)
+
+        assert [(leg["leg"], leg["runner"]) for leg in decision["legs"]] == [("heavy", heavy_runner), ("light", "ubuntu-2")]
+        assert decision["unbalanced"] == ["fresh"]
+        assert decision["wall_seconds"] == wall_seconds
+        assert decision["cost"] == cost
+        assert decision["budget"] == budget
+
+        runner_keys = {entry["preset"]: entry.get("runner") for entry in matrix["include"]}
+        assert runner_keys == {
+            "heavy": None if heavy_runner == "ubuntu-latest" else heavy_runner,
+            "light": "ubuntu-2",
+            "fresh": None,
+            "mac": None,
+            "pinned": None,
+        }
+
+    def test_balance_runners_without_timings(self, runners: list[dict[str, Any]]) -> None:
+        matrix = construct_matrix({"debug": {}}, "ubuntu-latest", "gcc")
+        assert balance_runners(matrix, {"debug": {}}, "ubuntu-latest", {}, runners) == {"budget": None, "legs": [], "unbalanced": ["debug"]}
+
+    def test_balance_runners_requires_default_runner(self, runners: list[dict[str, Any]]) -> None:
+        with pytest.raises(ValueError, match="default runs-on 'macos-latest'"):
+            balance_runners({"include": []}, {}, "macos-latest", {}, runners)
+
+    @pytest.mark.parametrize("runners_json", ['{"label": "ubuntu-latest"}', '[{"label": "ubuntu-latest", "cores": 4}]', "[1]"])  # type: ignore
+    def test_parse_runners_invalid(self, runners_json: str) -> None:
+        with pytest.raises(ValueError, match="Runners must be a list"):
+            parse_runners(runners_json)
+
+    @pytest.mark.parametrize(  # type: ignore
+        "runner, error",
+        [
+            ({"cores": 0, "cost_per_minute": 0.008}, "positive number as cores, got 0"),
+            ({"cores": "4", "cost_per_minute": 0.008}, 'positive number as cores, got "4"'),
+            ({"cores": True, "cost_per_minute": 0.008}, "positive number as cores, got true"),
+            ({"cores": 4, "cost_per_minute": -1}, "positive number as cost_per_minute, got -1"),
+            ({"cores": 4, "cost_per_minute": None}, "positive number as cost_per_minute, got null"),
+        ],
+    )
+    def test_parse_runners_invalid_numbers(self, runner: dict[str, Any], error: str) -> None:
+        with pytest.raises(ValueError, match=f"Runner 'ubuntu-latest' must have a {error}"):
+            parse_runners(json.dumps([{"label": "ubuntu-latest", "cores": 2, "cost_per_minute": 0.008}, {"label": "ubuntu-latest"} | runner]))
+
+    @patch("sys.stdout")
+    def test_main_with_runners(self, mock_stdout: Any, tmp_path: Path, runners: list[dict[str, Any]], timings: dict[str, Any]) -> None:
+        timings_path = tmp_path / "timing-report.json"
+        timings_path.write_text(json.dumps(timings))
+        argv = [
+            "construct_matrix.py",
+            "--default-runs-on",
+            "ubuntu-latest",
+            "--default-toolchain",
+            "gcc",
+            "--presets",
+            '{"heavy": {}, "light": {}}',
+            "--timings",
+            str(timings_path),
+            "--runners",
+            json.dumps(runners),
+            "--runner-budget",
+            "0.2",
+        ]
+        with patch("sys.argv", argv):
+            main()
+
+        output_lines = [args[0] for args, _ in mock_stdout.write.call_args_list]
+        matrix = json.loads(next(line for line in output_lines if line.startswith("matrix=")).split("=", 1)[1])
+        assert [entry.get("runner") for entry in matrix["include"]] == ["ubuntu-8", "ubuntu-2"]
+        decision = json.loads(next(line for line in output_lines if line.startswith("runners=")).split("=", 1)[1])
+        assert decision["cost"] == 0.188
+
+    @patch("sys.stdout")
+    def test_main_without_timings_skips_balancing(self, mock_stdout: Any, runners: list[dict[str, Any]]) -> None:
+        argv = ["construct_matrix.py", "--default-runs-on", "ubuntu-latest", "--default-toolchain", "gcc", "--presets", '{"debug": {}}']
+        with patch("sys.argv", argv + ["--runners", json.dumps(runners)]):
+            main()
+
+        assert "runners={}" in [args[0] for args, _ in mock_stdout.write.call_args_list]
+
+    @patch("sys.stderr")
+    @patch("sys.exit")
+    def test_main_with_missing_changed_files(self, mock_exit: Any, mock_stderr: Any, tmp_path: Path) -> None:
+        argv = [
+            "construct_matrix.py",
+            "--default-runs-on",
+            "ubuntu-latest",
+            "--default-toolchain",
+            "gcc",
+            "--presets",
+            '{"debug": {}}',
+            "--changed-files",
+            str(tmp_path / "missing.txt"),
+        ]
+        with patch("sys.argv", argv):
+            main()
+
+        assert any("Error:" in args[0] for args, _ in mock_stderr.write.call_args_list)
+        mock_exit.assert_called_with(1)
+
+    def test_construct_matrix_with_group(self) -> None:
+        presets: dict[str, dict[str, Any]] = {
+            "debug": {"group": "small"},
+            "release": {"group": "small", "artifact": {"retention_days": 1}},
+            "asan": {},
+        }
+
+        matrix = construct_matrix(presets, "ubuntu-latest", "gcc")
+
+        assert matrix["include"] == [
+            {"preset": "asan", "runs-on": "ubuntu-latest", "toolchain": "gcc"},
+            {
+                "preset": "small",
+                "runs-on": "ubuntu-latest",
+                "toolchain": "gcc",
+                "presets": [
+                    {"preset": "debug", "runs-on": "ubuntu-latest", "toolchain": "gcc"},
+                    {"preset": "release", "runs-on": "ubuntu-latest", "toolchain": "gcc", "artifact": {"retention_days": 1}},
+                ],
+            },
+        ]
+
+    def test_construct_matrix_with_max_presets_per_job(self) -> None:
+        presets: dict[str, dict[str, Any]] = {
+            "a": {},
+            "b": {},
+            "c": {},
+            "mac": {"runs-on": "macos-latest"},
+            "grouped": {"group": "g"},
+        }
+
+        matrix = construct_matrix(presets, "ubuntu-latest", "gcc", max_presets_per_job=2)
+
+        assert [(entry["preset"], [member["preset"] for member in entry.get("presets", [])]) for entry in matrix["include"]] == [
+            ("c", []),
+            ("mac", []),
+            ("g", ["grouped"]),
+            ("a+b", ["a", "b"]),
+        ]
+
+    def test_batch_entries_group_must_share_runner(self) -> None:
+        presets: dict[str, dict[str, Any]] = {"linux": {"group": "g"}, "mac": {"group": "g", "runs-on": "macos-latest"}}
+
+        with pytest.raises(ValueError) as e:
+            construct_matrix(presets, "ubuntu-latest", "gcc")
+        assert "Presets in group 'g' must share runs-on and toolchain" in str(e.value)
+
+    def test_batch_entries_group_name_collision(self) -> None:
+        presets: dict[str, dict[str, Any]] = {"debug": {"group": "release"}, "release": {}}
+
+        with pytest.raises(ValueError) as e:
+            batch_entries([{"preset": "debug", "runs-on": "x", "toolchain": "y"}], presets, 1)
+        assert "Group 'release' has the same name as a preset outside the group" in str(e.value)
+
+        # a group may be named after one of its own presets
+        presets = {"debug": {"group": "debug"}, "release": {"group": "debug"}}
+        assert construct_matrix(presets, "ubuntu-latest", "gcc")["include"][0]["preset"] == "debug"
+
+    def test_construct_matrix_with_test_shards(self) -> None:
+        presets: dict[str, dict[str, Any]] = {"debug": {"test": {"shards": 3}}, "release": {"test": {"shards": 1}}, "a": {}, "b": {}}
+
+        matrix = construct_matrix(presets, "ubuntu-latest", "gcc", max_presets_per_job=4)
+
+        assert matrix["include"] == [
+            {"preset": "debug", "runs-on": "ubuntu-latest", "toolchain": "gcc", "shard": {"index": 1, "count": 3}},
+            {"preset": "debug", "runs-on": "ubuntu-latest", "toolchain": "gcc", "shard": {"index": 2, "count": 3}},
+            {"preset": "debug", "runs-on": "ubuntu-latest", "toolchain": "gcc", "shard": {"index": 3, "count": 3}},
+            {
+                "preset": "release+a+b",
+                "runs-on": "ubuntu-latest",
+                "toolchain": "gcc",
+                "presets": [
+                    {"preset": "release", "runs-on": "ubuntu-latest", "toolchain": "gcc"},
+                    {"preset": "a", "runs-on": "ubuntu-latest", "toolchain": "gcc"},
+                    {"preset": "b", "runs-on": "ubuntu-latest", "toolchain": "gcc"},
+                ],
+            },
+        ]
+
+    def test_construct_matrix_with_test_options(self) -> None:
+        presets: dict[str, dict[str, Any]] = {"debug": {"test": {"shards": 2, "junit": True, "repeat_until_pass": 3}}, "release": {"test": {"shards": 1}}}
+
+        matrix = construct_matrix(presets, "ubuntu-latest", "gcc")
+
+        assert [(entry["preset"], entry.get("test_options")) for entry in matrix["include"]] == [
+            ("release", None),
+            ("debug", {"junit": True, "repeat_until_pass": 3}),
+            ("debug", {"junit": True, "repeat_until_pass": 3}),
+        ]
+
+    def test_construct_matrix_split(self) -> None:
+        presets: dict[str, dict[str, Any]] = {"debug": {"split": True, "test": {"shards": 3}}, "release": {"split": True}, "a": {}, "b": {}}
+
+        matrix = construct_matrix(presets, "ubuntu-latest", "gcc", max_presets_per_job=4)
+
+        # split presets build in one job each and are never packed with other presets
+        assert matrix["include"] == [
+            {"preset": "debug", "runs-on": "ubuntu-latest", "toolchain": "gcc", "split": {"shards": 3}},
+            {"preset": "release", "runs-on": "ubuntu-latest", "toolchain": "gcc", "split": {"shards": 1}},
+            {
+                "preset": "a+b",
+                "runs-on": "ubuntu-latest",
+                "toolchain": "gcc",
+                "presets": [
+                    {"preset": "a", "runs-on": "ubuntu-latest", "toolchain": "gcc"},
+                    {"preset": "b", "runs-on": "ubuntu-latest", "toolchain": "gcc"},
+                ],
+            },
+        ]
+
+        with pytest.raises(ValueError, match="Preset 'debug' in group 'g' cannot split its tests"):
+            construct_matrix({"debug": {"group": "g", "split": True}}, "ubuntu-latest", "gcc")
+
+    def test_construct_matrix_grouped_shards(self) -> None:
+        with pytest.raises(ValueError) as e:
+            construct_matrix({"debug": {"group": "g", "test": {"shards": 2}}}, "ubuntu-latest", "gcc")
+        assert "Preset 'debug' in group 'g' cannot shard its tests" in str(e.value)
@@ -0,0 +1,162 @@
+import io
+import json
+import shutil
+import subprocess
+import sys
+import tarfile
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / ".github" / "scripts"))
+from ctest_snapshot import create_snapshot, extract_snapshot, list_tests, main, snapshot_files
+
+
+class TestCtestSnapshot:
+    @pytest.fixture(scope="function")  # type: ignore
+    def workspace(self, tmp_path: Path) -> Path:
+        workspace = tmp_path / "workspace"
+        build = workspace / "build" / "debug"
+        for name, content in {
+            "build/debug/CMakeCache.txt": "CMAKE_BUILD_TYPE:STRING=Debug",
+            "build/debug/CTestTestfile.cmake": f'include("{build}/tests/app_include.cmake")\nsubdirs("tests")',
+            "build/debug/tests/CTestTestfile.cmake": "",
+            "build/debug/tests/app_include.cmake": f'include("{build}/tests/app_tests.cmake")\ninclude("{build}/tests/missing.cmake")',
+            "build/debug/tests/app_tests.cmake": f'include("{build}/CTestTestfile.cmake")',
+            "build/debug/tests/app_test": "binary",
+            "build/debug/lib/libcore.so.1.2": "library",
+            "build/debug/lib/libfoo.dylib": "library",
+            "build/debug/lib/copy/libcore.so.1.2": "library",
+            "build/debug/CMakeFiles/app.dir/main.o": "object",
+            "build/debug/data/input.txt": "input",
+            "build/debug/data/other.txt": "other",
+            "build/debug/data/unused.txt": "unused",
+            "src/script.py": "print()",
+        }.items():
+            path = workspace / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+        (build / "tests" / "app_test").chmod(0o755)
+        (build / "workdir").mkdir()
+        return workspace
+
+    def show_only(self, workspace: Path) -> list[dict[str, Any]]:
+        build = workspace / "build" / "debug"
+        return [
+            {
+                "name": "app",
+                "command": [str(build / "tests" / "app_test"), "--gtest_filter=*", str(workspace / "src" / "script.py"), "data/input.txt"],
+                "properties": [
+                    {"name": "WORKING_DIRECTORY", "value": str(build / "workdir")},
+                    {"name": "REQUIRED_FILES", "value": [str(build / "data" / "other.txt")]},
+                ],
+            },
+            {"name": "not_built", "properties": [{"name": "WILL_FAIL", "value": True}]},
+        ]
+
+    def test_snapshot_files(self, workspace: Path) -> None:
+        assert snapshot_files(self.show_only(workspace), workspace / "build" / "tests" / ".." / "debug", workspace) == [
+            "build/debug/CMakeCache.txt",
+            "build/debug/CTestTestfile.cmake",
+            "build/debug/data/input.txt",
+            "build/debug/data/other.txt",
+            "build/debug/lib/copy/libcore.so.1.2",
+            "build/debug/lib/libcore.so.1.2",
+            "build/debug/lib/libfoo.dylib",
+            "build/debug/tests/CTestTestfile.cmake",
+            "build/debug/tests/app_include.cmake",
+            "build/debug/tests/app_test",
+            "build/debug/tests/app_tests.cmake",
+            "build/debug/workdir",
+        ]
+
+    def test_list_tests(self, workspace: Path) -> None:
+        show_only = json.dumps({"kind": "ctestInfo", "tests": self.show_only(workspace)})
+        with patch("subprocess.run", return_value=subprocess.CompletedProcess([], 0, show_only, "")) as mock_run:
+            tests = list_tests(["debug", "integration"], workspace)
+
+        assert [test["name"] for test in tests] == ["app", "not_built"] * 2
+        mock_run.assert_called_with(["ctest", "--preset", "integration", "--show-only=json-v1"], cwd=workspace, capture_output=True, text=True)
+
+    def test_list_tests_failure(self, workspace: Path) -> None:
+        failed = subprocess.CompletedProcess([], 1, "", "No such test preset\n")
+        with patch("subprocess.run", return_value=failed), pytest.raises(OSError, match="--show-only=json-v1 failed: No such test preset"):
+            list_tests(["missing"], workspace)
+
+    def test_create_and_extract_snapshot(self, workspace: Path, tmp_path: Path) -> None:
+        archive = workspace / ".cmake-builder-snapshot" / "debug.tar.zst"
+        with patch("ctest_snapshot.list_tests", return_value=self.show_only(workspace)) as mock_list_tests:
+            assert create_snapshot(["debug"], workspace, Path("build/debug"), workspace, archive) == (12, 2)
+        mock_list_tests.assert_called_with(["debug"], workspace)
+
+        shutil.rmtree(workspace / "build")
+        assert extract_snapshot(archive, workspace) == 12
+
+        build = workspace / "build" / "debug"
+        assert (build / "lib" / "copy" / "libcore.so.1.2").read_text() == "library"
+        assert (build / "tests" / "app_test").stat().st_mode & 0o111
+        assert (build / "workdir").is_dir()
+        assert not (build / "CMakeFiles").exists()
+        assert not (build / "data" / "unused.txt").exists()
+
+    def test_extract_snapshot_without_data_filter(self, workspace: Path, monkeypatch: Any) -> None:
+        archive = workspace / "debug.tar.zst"
+        with patch("ctest_snapshot.list_tests", return_value=self.show_only(workspace)):
+            create_snapshot(["debug"], workspace, Path("build/debug"), workspace, archive)
+        monkeypatch.delattr(tarfile, "data_filter")
+
+        assert extract_snapshot(archive, workspace / "extracted") == 12
+        assert (workspace / "extracted" / "build" / "debug" / "lib" / "copy" / "libcore.so.1.2").read_text() == "library"
+
+        for name, linkname in (("../evil", ""), ("build/evil", "/etc/passwd")):
+            tar_path = workspace / "evil.tar"
+            with tarfile.open(tar_path, "w") as tar:
+                member = tarfile.TarInfo(name)
+                if linkname:
+                    member.type, member.linkname = tarfile.SYMTYPE, linkname
+                tar.addfile(member, io.BytesIO(b""))
+            subprocess.run(["zstd", "-q", "-f", str(tar_path), "-o", str(archive)], check=True)
+
+            with pytest.raises(ValueError, match=f"{name} is outside the workspace"):
+                extract_snapshot(archive, workspace / "extracted")
+        assert not (workspace / "evil").exists()
+
+    def test_extract_snapshot_zstd_failure(self, workspace: Path) -> None:
+        archive = workspace / "debug.tar.zst"
+        with patch("ctest_snapshot.list_tests", return_value=[]):
+            create_snapshot(["debug"], workspace, Path("build/debug"), workspace, archive)
+        # the tar stream ends before the trailing garbage, which zstd then fails on
+        archive.write_bytes(archive.read_bytes() + b"garbage")
+
+        with pytest.raises(OSError, match="zstd failed"):
+            extract_snapshot(archive, workspace / "extracted")
+
+    def test_main(self, workspace: Path, capsys: Any) -> None:
+        archive = workspace / "snapshot.tar.zst"
+        create = ["ctest_snapshot.py", "create", "--preset", "debug", "--binary-dir", "build/debug", "--workspace", str(workspace), "--archive", str(archive)]
+        with patch("sys.argv", create), patch("ctest_snapshot.list_tests", return_value=[]):
+            main()
+        assert "Snapshot of 8 files and directories" in capsys.readouterr().out
+
+        extracted = workspace / "extracted"
+        with patch("sys.argv", ["ctest_snapshot.py", "extract", "--workspace", str(extracted), "--archive", str(archive)]):
+            main()
+        assert "Extracted 8 files and directories" in capsys.readouterr().out
+        assert (extracted / "build" / "debug" / "CMakeCache.txt").is_file()
+
+    def test_main_create_requires_preset(self, workspace: Path) -> None:
+        with patch("sys.argv", ["ctest_snapshot.py", "create", "--workspace", str(workspace), "--archive", "snapshot.tar.zst"]):
+            with pytest.raises(SystemExit) as e:
+                main()
+        assert e.value.code == 2
+
+    @patch("sys.stderr")
+    @patch("sys.exit")
+    def test_main_missing_archive(self, mock_exit: Any, mock_stderr: Any, workspace: Path) -> None:
+        with patch("sys.argv", ["ctest_snapshot.py", "extract", "--workspace", str(workspace), "--archive", str(workspace / "missing.tar.zst")]):
+            main()
+
+        assert any("Error:" in args[0] for args, _ in mock_stderr.write.call_args_list)
+        mock_exit.assert_called_with(1)
@@ -1,3 +1,4 @@
+import argparse
 import json
 import sys
 from collections.abc import Generator
@@ -10,7 +11,9 @@ from cmakepresets import CMakePresets
 from pyfakefs.fake_filesystem_unittest import Patcher
 
 sys.path.insert(0, str(Path(__file__).parent.parent / ".github" / "scripts"))
-from generate_steps import get_related_preset_names, main
+from generate_steps import get_configure_hash, get_incremental_config, get_related_preset_names, main
+
+TIMER = 'uv run --script "$CMAKE_BUILDER_SCRIPTS/step_timer.py" run'
 
 
 class TestGenerateSteps:
@@ -25,21 +28,26 @@ class TestGenerateSteps:
                 "version": 6,
                 "configurePresets": [
                     {"name": "test-preset", "generator": "Ninja", "binaryDir": "${sourceDir}/build/${presetName}"},
-                    {"name": "config"},
+                    {"name": "config", "toolchainFile": "${sourceDir}/cmake/toolchain.cmake"},
                     {"name": "config_build"},
                     {"name": "config_build_test"},
                     {"name": "config_build_test_package", "binaryDir": "/shared_build/project/${presetName}"},
+                    {"name": "multi", "generator": "Ninja", "binaryDir": "${sourceDir}/build/${presetName}"},
                 ],
                 "buildPresets": [
                     {"name": "test-build", "configurePreset": "test-preset"},
                     {"name": "config_build", "configurePreset": "config_build"},
                     {"name": "config_build_test", "configurePreset": "config_build_test"},
                     {"name": "config_build_test_package", "configurePreset": "config_build_test_package"},
+                    {"name": "multi-app", "configurePreset": "multi"},
+                    {"name": "multi-docs", "configurePreset": "multi"},
                 ],
                 "testPresets": [
                     {"name": "test-test", "configurePreset": "test-preset"},
                     {"name": "config_build_test", "configurePreset": "config_build_test"},
                     {"name": "config_build_test_package", "configurePreset": "config_build_test_package"},
+                    {"name": "multi-unit", "configurePreset": "multi"},
+                    {"name": "multi-integration", "configurePreset": "multi"},
                 ],
                 "packagePresets": [
                     {"name": "test-package", "configurePreset": "test-preset"},
@@ -192,6 +200,7 @@ class TestGenerateSteps:
         output = mock_stdout.write.call_args_list
         artifact_lines = [args[0] for args, _ in output if "artifact=" == args[0]]
         assert len(artifact_lines) == 1
+        assert any("cache=" == args[0] for args, _ in output)
 
     @patch(
         "sys.argv",
@@ -420,6 +429,448 @@ class TestGenerateSteps:
         # Verify the custom path and retention days
         assert "custom/path" in artifact_config["path"]
         assert artifact_config["retention_days"] == 14
+        assert artifact_config["compression_level"] == 6
+
+    @pytest.mark.parametrize(
+        "artifact, expected",
+        [
+            ('{"compression_level": 1}', {"compression_level": 1}),
+            (
+                '{"compression_level": 9, "archive": "tar.zst"}',
+                {"compression_level": 0, "archive": ".cmake-builder-artifact/test-preset.tar.zst", "archive_level": 9},
+            ),
+            (
+                '{"compression_level": 0, "archive": "tar.zst"}',
+                {"compression_level": 0, "archive": ".cmake-builder-artifact/test-preset.tar.zst", "archive_level": 1},
+            ),
+            ('{"archive": "tar.zst"}', {"compression_level": 0, "archive": ".cmake-builder-artifact/test-preset.tar.zst", "archive_level": 3}),
+        ],
+    )  # type: ignore
+    def test_main_with_artifact_compression(self, artifact: str, expected: dict[str, Any], valid_presets: Any) -> None:
+        argv = ["generate_steps.py", "--cmake-project-root", "/fake/path", "--default-artifact-retention-days", "7", "--preset", "test-preset"]
+        with patch("sys.argv", argv + ["--artifact", artifact]), patch("sys.stdout") as mock_stdout:
+            main()
+
+        artifact_line = next(args[0] for args, _ in mock_stdout.write.call_args_list if args[0].startswith("artifact="))
+        assert json.loads(artifact_line.split("=", 1)[1]) == {"path": "build/test-preset", "retention_days": 7} | expected
+
+    @pytest.mark.parametrize("path", ["/abs/path", "../sibling", "build/../../up", "C:/build", "~/build"])  # type: ignore
+    def test_main_with_archive_outside_workspace(self, path: str, valid_presets: Any) -> None:
+        artifact = json.dumps({"path": ["build", "!/excluded/is/fine", path], "archive": "tar.zst"})
+        argv = ["generate_steps.py", "--cmake-project-root", "/fake/path", "--default-artifact-retention-days", "7", "--preset", "test-preset"]
+        with patch("sys.argv", argv + ["--artifact", artifact]), patch("sys.stderr") as mock_stderr, pytest.raises(SystemExit):
+            main()
+
+        assert any(f"must be relative paths inside the workspace to be archived: {path}" in args[0] for args, _ in mock_stderr.write.call_args_list)
+
+    @patch(
+        "sys.argv",
+        [
+            "generate_steps.py",
+            "--cmake-project-root",
+            "/fake/path",
+            "--default-store-artifact",
+            "false",
+            "--default-artifact-retention-days",
+            "7",
+            "--preset",
+            "test-preset",
+            "--cache",
+            '{"launcher": "ccache", "max_size": "500M"}',
+            "--toolchain",
+            "gcc",
+            "--runs-on",
+            "ubuntu-latest",
+        ],
+    )
+    @patch("sys.stdout")
+    def test_main_with_compiler_cache(self, mock_stdout: Any, valid_presets: Any) -> None:
+        main()
+
+        output_lines = [args[0] for args, _ in mock_stdout.write.call_args_list]
+        assert "configure=cmake --preset test-preset -DCMAKE_C_COMPILER_LAUNCHER=ccache -DCMAKE_CXX_COMPILER_LAUNCHER=ccache" in output_lines
+
+        cache_line = next(line for line in output_lines if line.startswith("cache="))
+        cache_config = json.loads(cache_line.split("=", 1)[1])
+        assert cache_config["launcher"] == "ccache"
+        assert cache_config["restore_keys"] == "ccache-test-preset-gcc-ubuntu-latest-"
+        assert cache_config["key"].startswith(cache_config["restore_keys"])
+        assert cache_config["key"] == f"{cache_config['restore_keys']}{get_configure_hash(valid_presets, 'test-preset')}"
+        assert cache_config["path"] == ".cmake-builder-cache/ccache"
+        assert cache_config["dir_env"] == "CCACHE_DIR"
+        assert cache_config["size_env"] == "CCACHE_MAXSIZE"
+        assert cache_config["max_size"] == "500M"
+
+    @patch("sys.stdout")
+    def test_main_with_incremental(self, mock_stdout: Any, valid_presets: Any) -> None:
+        argv = [
+            "generate_steps.py",
+            "--cmake-project-root",
+            "/fake/path",
+            "--default-artifact-retention-days",
+            "7",
+            "--preset",
+            "test-preset",
+            "--incremental",
+            "true",
+            "--toolchain",
+            "gcc",
+            "--runs-on",
+            "ubuntu-latest",
+        ]
+        with patch("sys.argv", argv), patch.dict("os.environ", {"GITHUB_WORKSPACE": "/fake"}):
+            main()
+
+        output_lines = [args[0] for args, _ in mock_stdout.write.call_args_list]
+        incremental_line = next(line for line in output_lines if line.startswith("incremental="))
+        incremental_config = json.loads(incremental_line.split("=", 1)[1])
+        assert incremental_config["path"] == "path/build/test-preset"
+        assert incremental_config["manifest"] == "path/build/test-preset/.cmake-builder-mtimes.json"
+        assert incremental_config["key"].startswith("build-test-preset-gcc-ubuntu-latest-")
+
+    @patch("sys.stdout")
+    @patch("sys.stderr")
+    def test_main_with_incremental_outside_workspace(self, mock_stderr: Any, mock_stdout: Any, valid_presets: Any) -> None:
+        argv = [
+            "generate_steps.py",
+            "--cmake-project-root",
+            "/fake/path",
+            "--default-artifact-retention-days",
+            "7",
+            "--preset",
+            "config_build_test_package",
+            "--incremental",
+            "yes",
+        ]
+        with patch("sys.argv", argv), patch.dict("os.environ", {"GITHUB_WORKSPACE": "/fake"}):
+            main()
+
+        assert any("is outside the workspace, incremental build disabled" in args[0] for args, _ in mock_stderr.write.call_args_list)
+        assert any("incremental=" == args[0] for args, _ in mock_stdout.write.call_args_list)
+
+    def test_get_incremental_config_key_inputs(self, valid_presets: Any) -> None:
+        root = valid_presets.root
+        key = get_incremental_config(valid_presets, root, "test-preset", "gcc", "ubuntu-latest")["key"]  # type: ignore[index]
+
+        # lock files and toolchain files are part of the key
+        (root.source_dir / "conan.lock").write_text("{}")
+        lock_key = get_incremental_config(valid_presets, root, "test-preset", "gcc", "ubuntu-latest")["key"]  # type: ignore[index]
+        assert lock_key != key
+
+        (root.source_dir / "CMakePresets.json").write_text((root.source_dir / "CMakePresets.json").read_text() + " ")
+        presets_key = get_incremental_config(valid_presets, root, "test-preset", "gcc", "ubuntu-latest")["key"]  # type: ignore[index]
+        assert presets_key != lock_key
+
+        # relative binaryDir without GITHUB_WORKSPACE resolves against the project root
+        config_incremental = get_incremental_config(valid_presets, root, "config", "gcc", "ubuntu-latest")
+        assert config_incremental is not None
+        assert config_incremental["path"] == "build"
+
+        (root.source_dir / "cmake").mkdir()
+        (root.source_dir / "cmake" / "toolchain.cmake").write_text("set(CMAKE_SYSTEM_NAME Linux)")
+        toolchain_incremental = get_incremental_config(valid_presets, root, "config", "gcc", "ubuntu-latest")
+        assert toolchain_incremental is not None
+        assert toolchain_incremental["key"] != config_incremental["key"]
+
+    @pytest.mark.parametrize(
+        "shard, expected_test, has_artifact",
+        [
+            ("1/3", "test=ctest --preset test-test -I 1,,3", True),
+            ("3/3", "test=ctest --preset test-test -I 3,,3", False),
+        ],
+    )  # type: ignore
+    def test_main_with_shard(self, shard: str, expected_test: str, has_artifact: bool, valid_presets: Any) -> None:
+        argv = [
+            "generate_steps.py",
+            "--cmake-project-root",
+            "/fake/path",
+            "--default-store-artifact",
+            "true",
+            "--default-artifact-retention-days",
+            "7",
+            "--preset",
+            "test-preset",
+            "--shard",
+            shard,
+        ]
+        with patch("sys.argv", argv), patch("sys.stdout") as mock_stdout:
+            main()
+
+        output_lines = [args[0] for args, _ in mock_stdout.write.call_args_list]
+        assert expected_test in output_lines
+        assert ("artifact=" in output_lines) is not has_artifact
+
+    def test_main_with_split(self, valid_presets: Any) -> None:
+        argv = [
+            "generate_steps.py",
+            "--cmake-project-root",
+            "/fake/path",
+            "--default-artifact-retention-days",
+            "7",
+            "--preset",
+            "test-preset",
+            "--split",
+            "2",
+            "--parallel",
+            "4",
+        ]
+        with patch("sys.argv", argv), patch("sys.stdout") as mock_stdout:
+            main()
+
+        outputs = dict(args[0].split("=", 1) for args, _ in mock_stdout.write.call_args_list if "=" in args[0])
+        assert "test" not in outputs
+        assert json.loads(outputs["snapshot"])["name"] == "snapshot-test-preset"
+        assert json.loads(outputs["tests"]) == [
+            {"shard": {"index": 1, "count": 2}, "test": "ctest --preset test-test -j 4 -I 1,,2"},
+            {"shard": {"index": 2, "count": 2}, "test": "ctest --preset test-test -j 4 -I 2,,2"},
+        ]
+
+    @pytest.mark.parametrize(
+        "options, expected_test",
+        [
+            (["--test-timeout", "60"], "ctest --preset test-test --timeout 60"),
+            (["--junit", "true", "--shard", "2/3"], 'ctest --preset test-test -I 2,,3 --output-junit "$CMAKE_BUILDER_JUNIT/test-test-2of3.xml"'),
+            (
+                ["--repeat-until-pass", "3", "--junit", "true", "--parallel", "4"],
+                '(ctest --preset test-test -j 4 --output-junit "$CMAKE_BUILDER_JUNIT/test-test.xml" || '
+                'ctest --preset test-test --rerun-failed --repeat until-pass:2 -j 4 --output-junit "$CMAKE_BUILDER_JUNIT/test-test.rerun.xml")',
+            ),
+        ],
+    )  # type: ignore
+    def test_main_with_test_options(self, options: list[str], expected_test: str, valid_presets: Any) -> None:
+        argv = ["generate_steps.py", "--cmake-project-root", "/fake/path", "--default-artifact-retention-days", "7", "--preset", "test-preset", *options]
+        with patch("sys.argv", argv), patch("sys.stdout") as mock_stdout:
+            main()
+
+        output_lines = [args[0] for args, _ in mock_stdout.write.call_args_list]
+        assert f"test={expected_test}" in output_lines
+
+    def test_main_with_rerun_timing_and_split(self, valid_presets: Any) -> None:
+        argv = [
+            "generate_steps.py",
+            "--cmake-project-root",
+            "/fake/path",
+            "--default-artifact-retention-days",
+            "7",
+            "--preset",
+            "test-preset",
+            "--repeat-until-pass",
+            "2",
+            "--timing",
+            "true",
+            "--split",
+            "1",
+        ]
+        with patch("sys.argv", argv), patch("sys.stdout") as mock_stdout:
+            main()
+
+        outputs = dict(args[0].split("=", 1) for args, _ in mock_stdout.write.call_args_list if "=" in args[0])
+        # the rerun is timed as a phase of its own, so the report shows how long the retries took,
+        # and a failure of the first run is only recorded as retried
+        assert json.loads(outputs["tests"]) == [
+            {
+                "test": f"({TIMER} --preset test-preset --phase test --retried -- ctest --preset test-test || "
+                f"{TIMER} --preset test-preset --phase test-rerun -- ctest --preset test-test --rerun-failed --repeat until-pass:1)"
+            }
+        ]
+
+    @pytest.mark.parametrize(
+        "parallel, expected_build, expected_test",
+        [
+            ("4", "build=cmake --build --preset test-build --parallel 4", "test=ctest --preset test-test -j 4"),
+            ("auto", "build=cmake --build --preset test-build --parallel 3", "test=ctest --preset test-test -j 3"),
+        ],
+    )  # type: ignore
+    def test_main_with_parallel(self, parallel: str, expected_build: str, expected_test: str, valid_presets: Any) -> None:
+        argv = [
+            "generate_steps.py",
+            "--cmake-project-root",
+            "/fake/path",
+            "--default-artifact-retention-days",
+            "7",
+            "--preset",
+            "test-preset",
+            "--parallel",
+            parallel,
+            "--memory-per-job-mb",
+            "1024",
+        ]
+        with patch("sys.argv", argv), patch("sys.stdout") as mock_stdout, patch("parallelism.detect_parallelism", return_value=3) as mock_detect:
+            with patch("generate_steps.detect_parallelism", mock_detect):
+                main()
+
+        output_lines = [args[0] for args, _ in mock_stdout.write.call_args_list]
+        assert expected_build in output_lines
+        assert expected_test in output_lines
+        assert "parallel=" in output_lines
+        if parallel == "auto":
+            mock_detect.assert_called_once_with(1024)
+
+    def test_main_with_timing(self, valid_presets: Any) -> None:
+        argv = [
+            "generate_steps.py",
+            "--cmake-project-root",
+            "/fake/path",
+            "--default-artifact-retention-days",
+            "7",
+            "--preset",
+            "test-preset",
+            "--timing",
+            "true",
+        ]
+        with patch("sys.argv", argv), patch("sys.stdout") as mock_stdout:
+            main()
+
+        timer = 'uv run --script "$CMAKE_BUILDER_SCRIPTS/step_timer.py" run'
+        output_lines = [args[0] for args, _ in mock_stdout.write.call_args_list]
+        assert f"configure={timer} --preset test-preset --phase configure -- cmake --preset test-preset" in output_lines
+        assert f"build={timer} --preset test-preset --phase build -- cmake --build --preset test-build" in output_lines
+        assert f"test={timer} --preset test-preset --phase test -- ctest --preset test-test" in output_lines
+
+    def test_main_with_ninja_report(self, valid_presets: Any) -> None:
+        argv = [
+            "generate_steps.py",
+            "--cmake-project-root",
+            "/fake/path",
+            "--default-artifact-retention-days",
+            "7",
+            "--preset",
+            "test-preset",
+            "--ninja-report",
+            "true",
+            "--toolchain",
+            "gcc",
+            "--runs-on",
+            "ubuntu-latest",
+        ]
+        with patch("sys.argv", argv), patch("sys.stdout") as mock_stdout:
+            main()
+
+        output_lines = [args[0] for args, _ in mock_stdout.write.call_args_list]
+        ninja_log = next(json.loads(line.removeprefix("ninja_log=")) for line in output_lines if line.startswith("ninja_log="))
+        assert ninja_log == {"key": "ninja-report-test-preset-gcc-ubuntu-latest", "logs": {"test-preset": "build/test-preset/.ninja_log"}}
+
+    @pytest.mark.parametrize(
+        "related_presets, timing, expected_build, expected_test",
+        [
+            ("first", "false", "build=cmake --build --preset multi-app", "test=ctest --preset multi-unit"),
+            (
+                "all",
+                "false",
+                "build=cmake --build --preset multi-app && cmake --build --preset multi-docs",
+                "test=ctest --preset multi-unit && ctest --preset multi-integration",
+            ),
+            (
+                "all",
+                "true",
+                f"build={TIMER} --preset multi --phase build-multi-app -- cmake --build --preset multi-app"
+                f" && {TIMER} --preset multi --phase build-multi-docs -- cmake --build --preset multi-docs",
+                f"test={TIMER} --preset multi --phase test-multi-unit -- ctest --preset multi-unit"
+                f" && {TIMER} --preset multi --phase test-multi-integration -- ctest --preset multi-integration",
+            ),
+        ],
+    )  # type: ignore
+    def test_main_with_related_presets(self, related_presets: str, timing: str, expected_build: str, expected_test: str, valid_presets: Any) -> None:
+        argv = [
+            "generate_steps.py",
+            "--cmake-project-root",
+            "/fake/path",
+            "--default-artifact-retention-days",
+            "7",
+            "--preset",
+            "multi",
+            "--related-presets",
+            related_presets,
+            "--timing",
+            timing,
+        ]
+        with patch("sys.argv", argv), patch("sys.stdout") as mock_stdout:
+            main()
+
+        output_lines = [args[0] for args, _ in mock_stdout.write.call_args_list]
+        assert expected_build in output_lines
+        assert expected_test in output_lines
+        assert "package=" in output_lines
+
+    def test_main_with_log_limit(self, valid_presets: Any) -> None:
+        argv = ["generate_steps.py", "--cmake-project-root", "/fake/path", "--default-artifact-retention-days", "7", "--preset", "multi"]
+        argv += ["--related-presets", "all", "--log-limit-mb", "5", "--timing", "true"]
+        with patch("sys.argv", argv), patch("sys.stdout") as mock_stdout:
+            main()
+
+        log_filter = 'uv run --script "$CMAKE_BUILDER_SCRIPTS/log_filter.py"'
+        output_lines = [args[0] for args, _ in mock_stdout.write.call_args_list]
+        assert (
+            f"configure={TIMER} --preset multi --phase configure -- {log_filter} --preset multi --phase configure --limit-mb 5 -- cmake --preset multi"
+            in output_lines
+        )
+        assert (
+            f"build={TIMER} --preset multi --phase build-multi-app -- {log_filter} --preset multi --phase build-multi-app --limit-mb 5 -- "
+            f"cmake --build --preset multi-app && {TIMER} --preset multi --phase build-multi-docs -- "
+            f"{log_filter} --preset multi --phase build-multi-docs --limit-mb 5 -- cmake --build --preset multi-docs"
+        ) in output_lines
+
+    @pytest.mark.parametrize(
+        "options, expected_configure",
+        [
+            (["--unity-build", "true"], "configure=cmake --preset test-preset -DCMAKE_UNITY_BUILD=ON"),
+            (["--unity-build", "16"], "configure=cmake --preset test-preset -DCMAKE_UNITY_BUILD=ON -DCMAKE_UNITY_BUILD_BATCH_SIZE=16"),
+            (["--unity-build", "0", "--pch", "false"], "configure=cmake --preset test-preset -DCMAKE_UNITY_BUILD=OFF -DCMAKE_DISABLE_PRECOMPILE_HEADERS=ON"),
+            (["--pch", "true", "--linker", "mold"], "configure=cmake --preset test-preset -DCMAKE_DISABLE_PRECOMPILE_HEADERS=OFF -DCMAKE_LINKER_TYPE=MOLD"),
+            (
+                ["--cache", '{"launcher": "ccache"}', "--linker", "lld"],
+                "configure=cmake --preset test-preset -DCMAKE_C_COMPILER_LAUNCHER=ccache -DCMAKE_CXX_COMPILER_LAUNCHER=ccache -DCMAKE_LINKER_TYPE=LLD",
+            ),
+            (["--runs-on", "macos-14", "--linker", "lld"], "configure=cmake --preset test-preset -DCMAKE_LINKER_TYPE=LLD"),
+            ([], "configure=cmake --preset test-preset"),
+        ],
+    )  # type: ignore
+    def test_main_with_build_acceleration(self, options: list[str], expected_configure: str, valid_presets: Any) -> None:
+        argv = ["generate_steps.py", "--cmake-project-root", "/fake/path", "--default-artifact-retention-days", "7", "--preset", "test-preset"]
+        with patch("sys.argv", argv + options), patch("sys.stdout") as mock_stdout:
+            main()
+
+        output_lines = [args[0] for args, _ in mock_stdout.write.call_args_list]
+        assert expected_configure in output_lines
+
+    @pytest.mark.parametrize("linker", ["ld64", ""])  # type: ignore
+    def test_main_with_invalid_linker(self, linker: str) -> None:
+        argv = ["generate_steps.py", "--cmake-project-root", "/fake/path", "--default-artifact-retention-days", "7", "--preset", "test-preset"]
+        with patch("sys.argv", argv + ["--linker", linker]), patch("sys.stderr"), pytest.raises(SystemExit):
+            main()
+
+    @pytest.mark.parametrize("runs_on, linker", [("macos-14", "mold"), ("macos-latest", "gold"), ("windows-2022", "bfd")])  # type: ignore
+    def test_main_with_linker_unavailable_on_runner(self, runs_on: str, linker: str, valid_presets: Any) -> None:
+        argv = ["generate_steps.py", "--cmake-project-root", "/fake/path", "--default-artifact-retention-days", "7", "--preset", "test-preset"]
+        with patch("sys.argv", argv + ["--runs-on", runs_on, "--linker", linker]), patch("sys.stderr") as mock_stderr, pytest.raises(SystemExit):
+            main()
+
+        assert any(f"Linker '{linker}' is not available on {runs_on}, use one of: lld" in args[0] for args, _ in mock_stderr.write.call_args_list)
+
+    @pytest.mark.parametrize("attempts", ["1", "0", "-3", "twice"])  # type: ignore
+    def test_parse_repeat_until_pass_invalid(self, attempts: str) -> None:
+        from generate_steps import parse_repeat_until_pass
+
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_repeat_until_pass(attempts)
+
+    @pytest.mark.parametrize("parallel", ["0", "many"])  # type: ignore
+    def test_parse_parallel_invalid(self, parallel: str) -> None:
+        from generate_steps import parse_parallel
+
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_parallel(parallel)
+
+    @pytest.mark.parametrize("shard", ["2", "a/b", "0/2", "3/2"])  # type: ignore
+    def test_parse_shard_invalid(self, shard: str) -> None:
+        from generate_steps import parse_shard
+
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_shard(shard)
+
+    def test_get_configure_hash_changes_with_preset(self, valid_presets: Any) -> None:
+        assert get_configure_hash(valid_presets, "test-preset") == get_configure_hash(valid_presets, "test-preset")
+        assert get_configure_hash(valid_presets, "test-preset") != get_configure_hash(valid_presets, "config")
 
     def test_get_related_preset_names_empty(self, empty_presets: Any) -> None:
         result = get_related_preset_names(empty_presets, "test-preset")
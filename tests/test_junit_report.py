@@ -0,0 +1,142 @@
+import json
+import sys
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / ".github" / "scripts"))
+from junit_report import build_report, load_runs, main, parse_junit, render_markdown, rerun_commands
+
+CTEST_JUNIT = """<?xml version="1.0" encoding="UTF-8"?>
+<testsuite name="Linux" tests="4" failures="1" disabled="0" skipped="1" hostname="" time="3" timestamp="2026-10-18T10:00:00">
+  <testcase name="{first}" classname="{first}" time="2.5" status="{first_status}">{first_failure}</testcase>
+  <testcase name="fast" classname="fast" time="0.25" status="run"/>
+  <testcase name="not_built" classname="not_built" time="0" status="notrun"><skipped message="Unable to find executable"/></testcase>
+  <testcase name="other[1]" classname="other[1]" time="0.5" status="fail"/>
+</testsuite>
+"""
+
+RERUN_JUNIT = """<?xml version="1.0" encoding="UTF-8"?>
+<testsuite name="Linux" tests="2" failures="1">
+  <testcase name="flaky" classname="flaky" time="1.5" status="run"/>
+  <testcase name="other[1]" classname="other[1]" time="0.5" status="fail"><failure message="Failed"/></testcase>
+</testsuite>
+"""
+
+# pytest and gtest mark the outcome with child elements only
+GENERIC_JUNIT = """<?xml version="1.0" encoding="UTF-8"?>
+<testsuites>
+  <testsuite name="unit">
+    <testcase classname="unit" name="passes" time="0.1"/>
+    <testcase classname="unit" name="errors"><error message="boom"/></testcase>
+    <testcase classname="unit" name="skips" time="0.2"><skipped/></testcase>
+  </testsuite>
+</testsuites>
+"""
+
+
+class TestJunitReport:
+    @pytest.fixture(scope="function")  # type: ignore
+    def junit_dir(self, tmp_path: Path) -> Path:
+        failure = '<failure message="Failed"/>'
+        for name, content in {
+            "junit-debug/debug.xml": CTEST_JUNIT.format(first="flaky", first_status="fail", first_failure=failure),
+            "junit-debug/debug.rerun.xml": RERUN_JUNIT,
+            "junit-test-release-2of2/release-2of2.xml": CTEST_JUNIT.format(first="slow", first_status="run", first_failure=""),
+        }.items():
+            path = tmp_path / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+        return tmp_path
+
+    def test_parse_junit_ctest(self, junit_dir: Path) -> None:
+        assert parse_junit(junit_dir / "junit-debug" / "debug.xml") == [
+            {"name": "flaky", "seconds": 2.5, "outcome": "failed"},
+            {"name": "fast", "seconds": 0.25, "outcome": "passed"},
+            {"name": "not_built", "seconds": 0.0, "outcome": "skipped"},
+            {"name": "other[1]", "seconds": 0.5, "outcome": "failed"},
+        ]
+
+    def test_parse_junit_generic(self, tmp_path: Path) -> None:
+        path = tmp_path / "unit.xml"
+        path.write_text(GENERIC_JUNIT)
+
+        assert parse_junit(path) == [
+            {"name": "passes", "seconds": 0.1, "outcome": "passed"},
+            {"name": "errors", "seconds": 0.0, "outcome": "failed"},
+            {"name": "skips", "seconds": 0.2, "outcome": "skipped"},
+        ]
+
+    def test_build_report(self, junit_dir: Path) -> None:
+        report = build_report(load_runs(junit_dir))
+
+        assert report["totals"] == {"tests": 8, "passed": 4, "failed": 2, "skipped": 2, "flaky": 1, "seconds": 6.5}
+        assert [(test["preset"], test["name"], test["outcome"], test["flaky"]) for test in report["tests"][:3]] == [
+            ("debug", "flaky", "passed", True),
+            ("release", "slow", "passed", False),
+            ("debug", "other[1]", "failed", False),
+        ]
+
+    def test_build_report_without_results(self, tmp_path: Path) -> None:
+        report = build_report(load_runs(tmp_path / "missing"))
+
+        assert report == {"totals": {"tests": 0, "passed": 0, "failed": 0, "skipped": 0, "flaky": 0, "seconds": 0}, "tests": []}
+        assert render_markdown(report, 20) == "## Test results\n\nNo test results found.\n"
+
+    def test_rerun_commands(self) -> None:
+        tests = [
+            {"preset": "release", "name": "b", "outcome": "failed"},
+            {"preset": "debug", "name": "other[1]", "outcome": "failed"},
+            {"preset": "release", "name": "a", "outcome": "failed"},
+            {"preset": "release", "name": "c", "outcome": "passed"},
+        ]
+
+        assert rerun_commands(tests) == ["ctest --preset debug -R '^(other\\[1\\])$'", "ctest --preset release -R '^(a|b)$'"]
+
+    def test_render_markdown(self, junit_dir: Path) -> None:
+        markdown = render_markdown(build_report(load_runs(junit_dir)), 2)
+
+        assert "8 tests: 4 passed, 2 failed, 2 skipped, 1 flaky, 6.5s in total" in markdown
+        assert "ctest --preset debug -R '^(other\\[1\\])$'\nctest --preset release -R '^(other\\[1\\])$'" in markdown
+        assert "| debug | flaky |\n" in markdown
+        assert "| debug | flaky | 2.5s | flaky |\n| release | slow | 2.5s | passed |\n" in markdown
+
+    def test_render_markdown_all_passed(self) -> None:
+        tests = [{"preset": "debug", "name": "fast", "seconds": 0.25, "outcome": "passed", "flaky": False}]
+        markdown = render_markdown({"totals": {"tests": 1, "passed": 1, "failed": 0, "skipped": 0, "flaky": 0, "seconds": 0.25}, "tests": tests}, 20)
+
+        assert "### Failed tests" not in markdown
+        assert "### Flaky tests" not in markdown
+        assert "| debug | fast | 0.2s | passed |" in markdown
+
+    def test_main_summary(self, junit_dir: Path, tmp_path: Path) -> None:
+        summary = tmp_path / "summary.md"
+        summary.write_text("# Run\n")
+        output = tmp_path / "report.json"
+
+        with patch("sys.argv", ["junit_report.py", "--input-dir", str(junit_dir), "--summary", str(summary), "--output", str(output)]):
+            main()
+
+        assert summary.read_text().startswith("# Run\n## Test results\n")
+        assert json.loads(output.read_text())["totals"]["flaky"] == 1
+
+    @patch("sys.stdout")
+    def test_main_print(self, mock_stdout: Any, junit_dir: Path) -> None:
+        with patch("sys.argv", ["junit_report.py", "--input-dir", str(junit_dir), "--top", "1"]):
+            main()
+
+        output = "".join(args[0] for args, _ in mock_stdout.write.call_args_list)
+        assert "| debug | flaky | 2.5s | flaky |\n\n" in output
+
+    @patch("sys.stderr")
+    @patch("sys.exit")
+    def test_main_invalid_xml(self, mock_exit: Any, mock_stderr: Any, tmp_path: Path) -> None:
+        (tmp_path / "broken.xml").write_text("<testsuite>")
+
+        with patch("sys.argv", ["junit_report.py", "--input-dir", str(tmp_path)]):
+            main()
+
+        assert any("Error:" in args[0] for args, _ in mock_stderr.write.call_args_list)
+        mock_exit.assert_called_with(1)
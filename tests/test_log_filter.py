@@ -0,0 +1,184 @@
+import gzip
+import io
+import sys
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / ".github" / "scripts"))
+from log_filter import MAX_EXCERPT_LINES, LogFilter, find_error_lines, main, render_excerpt, run_filtered
+
+BUILD_LOG = b"""[1/3] Building CXX object CMakeFiles/app.dir/main.cpp.o -Werror
+FAILED: CMakeFiles/app.dir/main.cpp.o
+/src/main.cpp:3:5: error: 'foo' was not declared in this scope
+/src/util.h:1:10: fatal error: missing.h: No such file or directory
+C:\\src\\main.cpp(3): error C2065: 'foo': undeclared identifier
+/usr/bin/ld: main.cpp:(.text+0x5): undefined reference to `bar'
+collect2: error: ld returned 1 exit status
+CMake Error at CMakeLists.txt:4 (add_executable):
+ninja: build stopped: subcommand failed.
+The following tests FAILED:
+\t  2 - unit.parser (Failed)
+\t  5 - integration.net (Timeout)
+no error here - just prose
+"""
+
+
+class TestLogFilter:
+    def test_find_error_lines(self) -> None:
+        assert find_error_lines(BUILD_LOG, 20) == [
+            "FAILED: CMakeFiles/app.dir/main.cpp.o",
+            "/src/main.cpp:3:5: error: 'foo' was not declared in this scope",
+            "/src/util.h:1:10: fatal error: missing.h: No such file or directory",
+            "C:\\src\\main.cpp(3): error C2065: 'foo': undeclared identifier",
+            "/usr/bin/ld: main.cpp:(.text+0x5): undefined reference to `bar'",
+            "collect2: error: ld returned 1 exit status",
+            "CMake Error at CMakeLists.txt:4 (add_executable):",
+            "\t  2 - unit.parser (Failed)",
+            "\t  5 - integration.net (Timeout)",
+        ]
+
+    def test_find_error_lines_limit(self) -> None:
+        assert find_error_lines(BUILD_LOG, 2) == ["FAILED: CMakeFiles/app.dir/main.cpp.o", "/src/main.cpp:3:5: error: 'foo' was not declared in this scope"]
+        assert find_error_lines(BUILD_LOG, 0) == []
+
+    def test_log_filter_caps_output_at_line_boundary(self) -> None:
+        log, output = io.BytesIO(), io.BytesIO()
+        log_filter = LogFilter(log, output, 10)
+
+        log_filter.write(b"line 1\nline 2\n")
+        log_filter.write(b"line 3\n")
+        log_filter.close()
+
+        assert output.getvalue() == b"line 1\n"
+        assert log.getvalue() == b"line 1\nline 2\nline 3\n"
+        assert log_filter.truncated
+
+    def test_log_filter_cuts_a_line_longer_than_the_limit(self) -> None:
+        output = io.BytesIO()
+        log_filter = LogFilter(io.BytesIO(), output, 4)
+        log_filter.write(b"0123456789\n")
+        assert output.getvalue() == b"0123"
+
+    def test_log_filter_finds_errors_split_across_chunks(self) -> None:
+        log_filter = LogFilter(io.BytesIO(), io.BytesIO(), 1024)
+        log_filter.write(b"ok\n/src/a.cpp:1:1: err")
+        log_filter.write(b"or: split\nFAILED: unterminated")
+        log_filter.close()
+
+        assert log_filter.excerpt == ["/src/a.cpp:1:1: error: split", "FAILED: unterminated"]
+        assert not log_filter.truncated
+
+    def test_log_filter_stops_scanning_at_the_excerpt_limit(self) -> None:
+        log_filter = LogFilter(io.BytesIO(), io.BytesIO(), 1024 * 1024)
+        for i in range(MAX_EXCERPT_LINES + 5):
+            log_filter.write(f"/src/a.cpp:{i}:1: error: e{i}\n".encode())
+        log_filter.close()
+
+        assert len(log_filter.excerpt) == MAX_EXCERPT_LINES
+        assert log_filter.excerpt[-1] == f"/src/a.cpp:{MAX_EXCERPT_LINES - 1}:1: error: e{MAX_EXCERPT_LINES - 1}"
+
+    def test_run_filtered(self, tmp_path: Path) -> None:
+        log_path = tmp_path / "logs" / "debug.build.log.gz"
+        output = io.BytesIO()
+        command = [sys.executable, "-c", "import sys; print('x' * 100); print('/src/a.cpp:1:1: error: boom', file=sys.stderr); sys.exit(2)"]
+
+        exit_code, log_filter = run_filtered(command, log_path, output, 50)
+
+        assert exit_code == 2
+        assert output.getvalue() == b"x" * 50
+        assert gzip.decompress(log_path.read_bytes()).splitlines() == [b"x" * 100, b"/src/a.cpp:1:1: error: boom"]
+        assert log_filter.excerpt == ["/src/a.cpp:1:1: error: boom"]
+
+    def test_run_filtered_missing_command(self, tmp_path: Path, capsys: Any) -> None:
+        exit_code, _ = run_filtered(["does-not-exist-command"], tmp_path / "log.gz", io.BytesIO(), 50)
+        assert exit_code == 127
+        assert "Error:" in capsys.readouterr().err
+
+    def test_render_excerpt(self) -> None:
+        assert render_excerpt("debug", "build", 1, ["a: error: b"]) == "### debug: build failed with exit code 1\n\n```\na: error: b\n```\n"
+        assert "No error lines found" in render_excerpt("debug", "test", 8, [])
+
+    @pytest.mark.parametrize("limit_mb, truncated", [("1", False), ("0", True)])  # type: ignore
+    def test_main_failure(self, limit_mb: str, truncated: bool, tmp_path: Path, capsys: Any) -> None:
+        summary = tmp_path / "summary.md"
+        command = [sys.executable, "-c", "print('CMake Error at CMakeLists.txt:1'); raise SystemExit(1)"]
+        argv = ["log_filter.py", "--preset", "debug", "--phase", "configure", "--limit-mb", limit_mb, "--log-dir", str(tmp_path)]
+        argv += ["--summary", str(summary), "--", *command]
+        with patch("sys.argv", argv), pytest.raises(SystemExit) as exit_info:
+            main()
+
+        assert exit_info.value.code == 1
+        assert (tmp_path / "debug.configure.log.gz").is_file()
+        assert summary.read_text() == "### debug: configure failed with exit code 1\n\n```\nCMake Error at CMakeLists.txt:1\n```\n"
+        output = capsys.readouterr().out
+        assert ("::warning::debug: configure output truncated after 0 MB" in output) == truncated
+        assert ("### debug: configure failed" in output) == truncated
+
+    def test_main_failure_retried(self, tmp_path: Path) -> None:
+        summary = tmp_path / "summary.md"
+        command = [sys.executable, "-c", "print('The following tests FAILED:'); raise SystemExit(8)"]
+        argv = ["log_filter.py", "--preset", "debug", "--phase", "test", "--limit-mb", "1", "--log-dir", str(tmp_path), "--retried"]
+        with patch("sys.argv", [*argv, "--summary", str(summary), "--", *command]), pytest.raises(SystemExit) as exit_info:
+            main()
+
+        # the rerun summarizes the errors when it fails too
+        assert exit_info.value.code == 8
+        assert not summary.exists()
+
+    def test_main_success(self, tmp_path: Path, capsys: Any) -> None:
+        argv = [
+            "log_filter.py",
+            "--preset",
+            "debug",
+            "--phase",
+            "build",
+            "--limit-mb",
+            "1",
+            "--log-dir",
+            str(tmp_path),
+            "--",
+            sys.executable,
+            "-c",
+            "print('ok')",
+        ]
+        with patch("sys.argv", argv), patch.dict("os.environ", {"GITHUB_STEP_SUMMARY": ""}), pytest.raises(SystemExit) as exit_info:
+            main()
+        assert exit_info.value.code == 0
+        assert "ok" in capsys.readouterr().out
+
+    def test_main_failure_without_summary(self, tmp_path: Path) -> None:
+        argv = [
+            "log_filter.py",
+            "--preset",
+            "debug",
+            "--phase",
+            "test",
+            "--limit-mb",
+            "1",
+            "--log-dir",
+            str(tmp_path),
+            "--",
+            sys.executable,
+            "-c",
+            "raise SystemExit(8)",
+        ]
+        with patch("sys.argv", argv), patch.dict("os.environ", {"GITHUB_STEP_SUMMARY": ""}), pytest.raises(SystemExit) as exit_info:
+            main()
+        assert exit_info.value.code == 8
+
+    def test_main_requires_command(self) -> None:
+        with patch("sys.argv", ["log_filter.py", "--preset", "debug", "--phase", "build", "--limit-mb", "1"]), pytest.raises(SystemExit) as exit_info:
+            main()
+        assert exit_info.value.code == 2
+
+    @patch("sys.stderr")
+    def test_main_log_dir_error(self, mock_stderr: Any, tmp_path: Path) -> None:
+        (tmp_path / "file").write_text("")
+        argv = ["log_filter.py", "--preset", "debug", "--phase", "build", "--limit-mb", "1", "--log-dir", str(tmp_path / "file"), "--", "true"]
+        with patch("sys.argv", argv), pytest.raises(SystemExit) as exit_info:
+            main()
+        assert exit_info.value.code == 1
+        assert any("Error:" in args[0] for args, _ in mock_stderr.write.call_args_list)
@@ -0,0 +1,119 @@
+import json
+import sys
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / ".github" / "scripts"))
+from matrix_summary import leg_name, leg_results, load_jobs, main, render_markdown
+
+MATRIX: dict[str, Any] = {
+    "include": [
+        {"preset": "gate", "runs-on": "ubuntu-latest", "toolchain": "gcc", "critical": True},
+        {"preset": "tests", "runs-on": "ubuntu-latest", "toolchain": "gcc", "shard": {"index": 2, "count": 3}},
+        {"preset": "late", "runs-on": "macos-latest", "toolchain": "clang"},
+    ]
+}
+
+
+class TestMatrixSummary:
+    @pytest.fixture(scope="function")  # type: ignore
+    def jobs_file(self, tmp_path: Path) -> Path:
+        jobs = [
+            {"name": "build / plan", "status": "completed", "conclusion": "success"},
+            {"name": "build / gate (gcc@ubuntu-latest)", "status": "completed", "conclusion": "failure"},
+            {"name": "build / tests [2/3] (gcc@ubuntu-latest)", "status": "completed", "conclusion": "cancelled"},
+            {"name": "build / test gate (gcc@ubuntu-latest)", "status": "completed", "conclusion": "skipped"},
+            {"name": "build / verify-matrix", "status": "in_progress", "conclusion": None},
+        ]
+        path = tmp_path / "jobs.jsonl"
+        path.write_text("\n".join(json.dumps(job) for job in jobs) + "\n\n")
+        return path
+
+    def test_leg_name(self) -> None:
+        assert leg_name(MATRIX["include"][0]) == "gate (gcc@ubuntu-latest)"
+        assert leg_name(MATRIX["include"][1]) == "tests [2/3] (gcc@ubuntu-latest)"
+
+    def test_load_jobs(self, jobs_file: Path) -> None:
+        jobs = load_jobs(jobs_file)
+        assert jobs["build / gate (gcc@ubuntu-latest)"] == "failure"
+        assert jobs["build / verify-matrix"] == "in_progress"
+
+    def test_leg_results(self, jobs_file: Path) -> None:
+        legs = leg_results(MATRIX, load_jobs(jobs_file))
+        assert [(leg["name"], leg["critical"], leg["conclusion"]) for leg in legs] == [
+            ("gate (gcc@ubuntu-latest)", True, "failure"),
+            ("tests [2/3] (gcc@ubuntu-latest)", False, "cancelled"),
+            ("late (clang@macos-latest)", False, "not started"),
+        ]
+
+    def test_leg_results_of_test_jobs(self, jobs_file: Path) -> None:
+        legs = leg_results({"include": MATRIX["include"][:1]}, load_jobs(jobs_file), "test ")
+        assert [(leg["name"], leg["conclusion"]) for leg in legs] == [("test gate (gcc@ubuntu-latest)", "skipped")]
+
+    def test_render_markdown(self, jobs_file: Path) -> None:
+        markdown = render_markdown(leg_results(MATRIX, load_jobs(jobs_file)), ["docs"])
+        assert "| gate (gcc@ubuntu-latest) | yes | failure |" in markdown
+        assert "Skipped or cancelled legs: tests [2/3] (gcc@ubuntu-latest), late (clang@macos-latest)" in markdown
+        assert "Pruned presets without relevant changes: docs" in markdown
+
+    def test_render_markdown_without_legs(self) -> None:
+        assert render_markdown([], []) == "## Matrix results\n"
+
+    @pytest.mark.parametrize(
+        "results, exit_code",
+        [
+            ({"plan": "success", "main": "success"}, None),
+            ({"plan": "success", "main": "skipped"}, None),
+            ({"plan": "success", "main": "cancelled"}, 1),
+            ({"plan": "failure", "main": "skipped"}, 1),
+            ({"plan": "success", "preflight": "skipped", "main": "success"}, None),
+            ({"plan": "success", "preflight": "failure", "main": "skipped"}, 1),
+            ({"plan": "success", "main": "success", "test": "failure"}, 1),
+        ],
+    )  # type: ignore
+    @patch("sys.exit")
+    def test_main(self, mock_exit: Any, results: dict[str, str], exit_code: int | None, jobs_file: Path, tmp_path: Path, capsys: Any) -> None:
+        summary = tmp_path / "summary.md"
+        argv = ["matrix_summary.py", "--matrix", json.dumps(MATRIX), "--results", json.dumps(results), "--jobs", str(jobs_file), "--summary", str(summary)]
+        argv += ["--test-matrix", json.dumps({"include": MATRIX["include"][:1]})]
+        with patch("sys.argv", argv):
+            main()
+
+        if exit_code is None:
+            mock_exit.assert_not_called()
+        else:
+            mock_exit.assert_called_with(exit_code)
+        assert "| late (clang@macos-latest) |  | not started |" in summary.read_text()
+        assert "| test gate (gcc@ubuntu-latest) | yes | skipped |" in summary.read_text()
+        assert "## Matrix results" in capsys.readouterr().out
+
+    @patch("sys.exit")
+    def test_main_without_plan_outputs(self, mock_exit: Any, tmp_path: Path, capsys: Any) -> None:
+        argv = [
+            "matrix_summary.py",
+            "--matrix",
+            "",
+            "--pruned",
+            "",
+            "--results",
+            '{"plan": "failure", "main": "skipped"}',
+            "--jobs",
+            str(tmp_path / "missing"),
+        ]
+        with patch("sys.argv", argv):
+            main()
+        mock_exit.assert_called_with(1)
+        assert capsys.readouterr().out.startswith("## Matrix results")
+
+    @patch("sys.stderr")
+    @patch("sys.exit")
+    def test_main_invalid_json(self, mock_exit: Any, mock_stderr: Any) -> None:
+        mock_exit.side_effect = SystemExit(1)
+        with patch("sys.argv", ["matrix_summary.py", "--matrix", "{invalid", "--results", "{}"]):
+            with pytest.raises(SystemExit):
+                main()
+        assert any("Error:" in args[0] for args, _ in mock_stderr.write.call_args_list)
+        mock_exit.assert_called_with(1)
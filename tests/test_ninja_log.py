@@ -0,0 +1,168 @@
+import json
+import sys
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / ".github" / "scripts"))
+from ninja_log import analyze, classify, critical_path, diff_reports, main, parse_ninja_log, render_markdown
+
+# an earlier build followed by the last build, whose end times start over
+NINJA_LOG = """# ninja log v6
+0\t5000\t0\tCMakeFiles/old.dir/old.cpp.o\taaaa
+0\t100\t0\tCMakeFiles/app.dir/main.cpp.o\t1111
+100\t250\t0\tCMakeFiles/app.dir/util.cpp.o\t3333
+0\t300\t0\tCMakeFiles/lib.dir/slow.cpp.o\t2222
+300\t400\t0\tlibcore.so\t4444
+300\t400\t0\tlibcore.so.1\t4444
+400\t600\t0\tapp\t5555
+malformed line
+"""
+
+
+class TestNinjaLog:
+    @pytest.fixture(scope="function")  # type: ignore
+    def edges(self) -> list[dict[str, Any]]:
+        return parse_ninja_log(NINJA_LOG)
+
+    def test_parse_ninja_log_keeps_last_build(self, edges: list[dict[str, Any]]) -> None:
+        assert [edge["outputs"] for edge in edges] == [
+            ["CMakeFiles/app.dir/main.cpp.o"],
+            ["CMakeFiles/app.dir/util.cpp.o"],
+            ["CMakeFiles/lib.dir/slow.cpp.o"],
+            ["libcore.so", "libcore.so.1"],
+            ["app"],
+        ]
+
+    def test_parse_ninja_log_invalid(self) -> None:
+        with pytest.raises(ValueError):
+            parse_ninja_log("not a log\n")
+
+    @pytest.mark.parametrize(
+        "output, expected",
+        [
+            ("a.cpp.o", "compile"),
+            ("a.obj", "compile"),
+            ("app", "other"),
+            ("app.exe", "link"),
+            ("libx.so.1.2", "link"),
+            ("gen/x.h", "other"),
+            ("bin/tool", "link"),
+            ("gen/version", "other"),
+            ("CMakeFiles/codegen", "other"),
+        ],
+    )  # type: ignore
+    def test_classify(self, output: str, expected: str, tmp_path: Path) -> None:
+        (tmp_path / "bin").mkdir()
+        (tmp_path / "bin" / "tool").write_text("binary")
+        (tmp_path / "bin" / "tool").chmod(0o755)
+        # the output of a custom command, without a suffix but not executable
+        (tmp_path / "gen").mkdir()
+        (tmp_path / "gen" / "version").write_text("1.0")
+
+        assert classify({"outputs": [output]}, tmp_path) == expected
+
+    def test_critical_path(self, edges: list[dict[str, Any]]) -> None:
+        assert [edge["outputs"][0] for edge in critical_path(edges)] == ["CMakeFiles/lib.dir/slow.cpp.o", "libcore.so", "app"]
+        assert critical_path([]) == []
+
+    def test_critical_path_zero_length_edges(self) -> None:
+        edges = [{"start": 0, "end": 0, "outputs": ["a.o"]}, {"start": 0, "end": 0, "outputs": ["b.o"]}]
+        assert len(critical_path(edges)) == 2
+
+    def test_analyze(self, edges: list[dict[str, Any]], tmp_path: Path) -> None:
+        (tmp_path / "app").write_text("binary")
+        (tmp_path / "app").chmod(0o755)
+
+        report = analyze(edges, cpus=2, top=1, build_dir=tmp_path)
+
+        assert report["edges"] == 5
+        assert report["wall_ms"] == 600
+        assert report["total_ms"] == 850
+        assert report["effective_parallelism"] == 1.42
+        assert report["utilization"] == 0.71
+        assert report["critical_path_ms"] == 600
+        assert report["slowest"]["compile"] == [{"output": "CMakeFiles/lib.dir/slow.cpp.o", "kind": "compile", "ms": 300}]
+        assert report["slowest"]["link"] == [{"output": "app", "kind": "link", "ms": 200}]
+
+    def test_analyze_without_edges(self) -> None:
+        with pytest.raises(ValueError):
+            analyze([], cpus=2, top=1)
+
+    def test_analyze_instant_build(self) -> None:
+        report = analyze([{"start": 0, "end": 0, "outputs": ["a.o"]}], cpus=4, top=1)
+
+        assert report["effective_parallelism"] == 1.0
+        assert "Slowest link" not in render_markdown("debug", report, None)
+
+    def test_diff_reports(self, edges: list[dict[str, Any]]) -> None:
+        current = analyze(edges, cpus=2, top=5)
+        baseline = {
+            "wall_ms": 500,
+            "critical_path_ms": 450,
+            "durations": {"CMakeFiles/lib.dir/slow.cpp.o": 100, "app": 250, "libcore.so": 100},
+        }
+
+        diff = diff_reports(current, baseline, top=5)
+
+        assert diff["wall_ms_delta"] == 100
+        assert diff["critical_path_ms_delta"] == 150
+        assert diff["regressions"] == [{"output": "CMakeFiles/lib.dir/slow.cpp.o", "ms": 300, "baseline_ms": 100, "delta_ms": 200}]
+        assert diff["new_edges"] == 2
+
+    def test_render_markdown(self, edges: list[dict[str, Any]]) -> None:
+        report = analyze(edges, cpus=2, top=5)
+        diff = diff_reports(report, report | {"durations": {"app": 100}}, top=5)
+
+        markdown = render_markdown("debug", report, diff)
+
+        assert "### Ninja build of debug" in markdown
+        assert "Effective parallelism 1.42 on 2 CPUs (71% utilization)." in markdown
+        assert "wall time +0.0s" in markdown
+        assert "| `CMakeFiles/lib.dir/slow.cpp.o` | 0.3s |" in markdown
+        assert "| `app` | 0.2s | +0.1s |" in markdown
+
+    def test_main(self, tmp_path: Path) -> None:
+        log = tmp_path / "build" / ".ninja_log"
+        log.parent.mkdir()
+        log.write_text(NINJA_LOG)
+        reports = tmp_path / "reports"
+        summary = tmp_path / "summary.md"
+        argv = [
+            "ninja_log.py",
+            "--logs",
+            json.dumps({"debug": str(log), "missing": str(tmp_path / "missing")}),
+            "--baseline-dir",
+            str(reports),
+            "--output-dir",
+            str(reports),
+            "--summary",
+            str(summary),
+        ]
+
+        with patch("sys.argv", argv), patch("sys.stderr") as mock_stderr:
+            main()
+            # the second run diffs against the report of the first one
+            main()
+
+        assert json.loads((reports / "debug.json").read_text())["wall_ms"] == 600
+        assert "Compared to the last build on the default branch" in summary.read_text()
+        assert any("not found, skipping" in args[0] for args, _ in mock_stderr.write.call_args_list)
+
+    @patch("sys.stdout")
+    def test_main_prints_without_summary(self, mock_stdout: Any, tmp_path: Path) -> None:
+        (tmp_path / ".ninja_log").write_text(NINJA_LOG)
+        with patch("sys.argv", ["ninja_log.py", "--logs", json.dumps({"debug": str(tmp_path / ".ninja_log")})]):
+            main()
+        assert any("### Ninja build of debug" in args[0] for args, _ in mock_stdout.write.call_args_list)
+
+    @patch("sys.stderr")
+    @patch("sys.exit")
+    def test_main_invalid_log(self, mock_exit: Any, mock_stderr: Any, tmp_path: Path) -> None:
+        (tmp_path / ".ninja_log").write_text("garbage\n")
+        with patch("sys.argv", ["ninja_log.py", "--logs", json.dumps({"debug": str(tmp_path / ".ninja_log")})]):
+            main()
+        assert any("Error: not a ninja log" in args[0] for args, _ in mock_stderr.write.call_args_list)
+        mock_exit.assert_called_with(1)
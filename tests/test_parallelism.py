@@ -0,0 +1,60 @@
+import sys
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / ".github" / "scripts"))
+from parallelism import available_cpus, detect_parallelism, main, parallelism_env, resolve_parallel, total_memory_mb
+
+
+class TestParallelism:
+    @pytest.mark.parametrize(
+        "cpus, memory_mb, memory_per_job_mb, expected",
+        [
+            (4, None, None, 4),
+            (4, 16384, None, 4),
+            (4, None, 2048, 4),
+            (16, 16384, 2048, 8),
+            (4, 16384, 2048, 4),
+            (4, 1024, 2048, 1),
+        ],
+    )  # type: ignore
+    def test_resolve_parallel(self, cpus: int, memory_mb: int | None, memory_per_job_mb: int | None, expected: int) -> None:
+        assert resolve_parallel(cpus, memory_mb, memory_per_job_mb) == expected
+
+    def test_available_cpus(self) -> None:
+        assert available_cpus() >= 1
+
+    def test_available_cpus_without_affinity(self) -> None:
+        with patch("parallelism.os") as mock_os:
+            del mock_os.sched_getaffinity
+            mock_os.cpu_count.return_value = None
+            assert available_cpus() == 1
+
+    def test_total_memory_mb(self) -> None:
+        memory_mb = total_memory_mb()
+        assert memory_mb is None or memory_mb > 0
+
+        with patch("parallelism.os.sysconf", side_effect=ValueError):
+            assert total_memory_mb() is None
+
+    def test_detect_parallelism(self) -> None:
+        with patch("parallelism.available_cpus", return_value=8), patch("parallelism.total_memory_mb", return_value=8192):
+            assert detect_parallelism() == 8
+            assert detect_parallelism(4096) == 2
+
+    def test_parallelism_env(self) -> None:
+        with patch("parallelism.detect_parallelism", return_value=6):
+            assert parallelism_env() == {"CMAKE_BUILD_PARALLEL_LEVEL": "6", "CTEST_PARALLEL_LEVEL": "6"}
+
+    @patch("sys.argv", ["parallelism.py", "--memory-per-job-mb", "4096"])
+    @patch("sys.stdout")
+    def test_main(self, mock_stdout: Any) -> None:
+        with patch("parallelism.available_cpus", return_value=8), patch("parallelism.total_memory_mb", return_value=8192):
+            main()
+
+        output_lines = [args[0] for args, _ in mock_stdout.write.call_args_list]
+        assert "CMAKE_BUILD_PARALLEL_LEVEL=2" in output_lines
+        assert "CTEST_PARALLEL_LEVEL=2" in output_lines
@@ -0,0 +1,456 @@
+import json
+import subprocess
+import sys
+from collections.abc import Generator
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from cmakepresets import CMakePresets
+from cmakepresets.paths import CMakeRoot
+from pyfakefs.fake_filesystem_unittest import Patcher
+
+sys.path.insert(0, str(Path(__file__).parent.parent / ".github" / "scripts"))
+from plan import main, plan, preflight_legs, preflight_setup, split_test_matrix
+
+SCRIPTS_DIR = Path(__file__).parent.parent / ".github" / "scripts"
+
+
+class TestPlan:
+    @pytest.fixture(scope="function")  # type: ignore
+    def cmake_project(self) -> Generator[CMakeRoot]:
+        with Patcher() as patcher:
+            assert patcher.fs is not None
+            patcher.fs.add_real_file(SCRIPTS_DIR / "preset-schema.json")
+
+            project_root = Path("/fake/path")
+            project_root.mkdir(parents=True, exist_ok=True)
+
+            presets_content = {
+                "version": 6,
+                "configurePresets": [
+                    {"name": "debug", "generator": "Ninja", "binaryDir": "${sourceDir}/build/${presetName}"},
+                    {"name": "release", "generator": "Ninja", "binaryDir": "${sourceDir}/build/${presetName}"},
+                ],
+                "buildPresets": [
+                    {"name": "debug", "configurePreset": "debug"},
+                    {"name": "release", "configurePreset": "release"},
+                ],
+                "testPresets": [
+                    {"name": "debug", "configurePreset": "debug"},
+                ],
+            }
+
+            with open(project_root / "CMakePresets.json", "w") as f:
+                json.dump(presets_content, f)
+
+            yield CMakeRoot(project_root)
+
+    def test_plan_embeds_steps(self, cmake_project: CMakeRoot) -> None:
+        presets_data: dict[str, Any] = {"debug": {"toolchain": "clang"}, "release": {"artifact": {"retention_days": 1}}}
+
+        matrix = plan(presets_data, CMakePresets(cmake_project), cmake_project, "ubuntu-latest", "gcc", False, 5)
+
+        assert len(matrix["include"]) == 2
+
+        debug_entry = next(entry for entry in matrix["include"] if entry["preset"] == "debug")
+        assert debug_entry["runs-on"] == "ubuntu-latest"
+        assert debug_entry["toolchain"] == "clang"
+        assert debug_entry["configure"] == "cmake --preset debug"
+        assert debug_entry["build"] == "cmake --build --preset debug"
+        assert debug_entry["test"] == "ctest --preset debug"
+        assert "package" not in debug_entry
+        assert "artifact" not in debug_entry
+
+        release_entry = next(entry for entry in matrix["include"] if entry["preset"] == "release")
+        assert release_entry["toolchain"] == "gcc"
+        assert "test" not in release_entry
+        assert release_entry["artifact"] == {"path": "build/release", "retention_days": 1, "compression_level": 6}
+
+    def test_plan_default_store_artifact(self, cmake_project: CMakeRoot) -> None:
+        matrix = plan({"debug": {}}, CMakePresets(cmake_project), cmake_project, "ubuntu-latest", "gcc", True, 5)
+
+        assert matrix["include"][0]["artifact"] == {"path": "build/debug", "retention_days": 5, "compression_level": 6}
+
+    def test_plan_compiler_cache(self, cmake_project: CMakeRoot) -> None:
+        matrix = plan({"debug": {"cache": {"launcher": "sccache"}}}, CMakePresets(cmake_project), cmake_project, "ubuntu-latest", "gcc", False, 5)
+
+        entry = matrix["include"][0]
+        assert entry["configure"] == "cmake --preset debug -DCMAKE_C_COMPILER_LAUNCHER=sccache -DCMAKE_CXX_COMPILER_LAUNCHER=sccache"
+        assert entry["cache"]["restore_keys"] == "sccache-debug-gcc-ubuntu-latest-"
+        assert entry["cache"]["dir_env"] == "SCCACHE_DIR"
+
+    def test_plan_prunes_unchanged_presets(self, cmake_project: CMakeRoot) -> None:
+        presets_data: dict[str, Any] = {"debug": {"paths": ["src/**"]}, "release": {"paths-ignore": ["src/**"]}}
+
+        matrix = plan(presets_data, CMakePresets(cmake_project), cmake_project, "ubuntu-latest", "gcc", False, 5, ["src/main.cpp"])
+
+        assert [entry["preset"] for entry in matrix["include"]] == ["debug"]
+        assert "paths" not in matrix["include"][0]
+
+    def test_plan_batches_presets(self, cmake_project: CMakeRoot) -> None:
+        presets_data: dict[str, Any] = {
+            "debug": {"group": "all", "artifact": {"retention_days": 1}, "cache": {"launcher": "ccache"}, "incremental": True},
+            "release": {"group": "all", "artifact": {"retention_days": 3}, "cache": {"launcher": "ccache"}, "incremental": True},
+        }
+
+        matrix = plan(presets_data, CMakePresets(cmake_project), cmake_project, "ubuntu-latest", "gcc", False, 5)
+
+        assert len(matrix["include"]) == 1
+        entry = matrix["include"][0]
+        assert entry["preset"] == "all"
+        assert [member["preset"] for member in entry["presets"]] == ["debug", "release"]
+        assert entry["presets"][0]["build"] == "cmake --build --preset debug"
+        assert entry["presets"][1]["configure"].startswith("cmake --preset release -DCMAKE_C_COMPILER_LAUNCHER=ccache")
+        assert all("artifact" not in member and "cache" not in member and "incremental" not in member for member in entry["presets"])
+
+        assert entry["artifact"] == {"path": "build/debug\nbuild/release", "retention_days": 3, "compression_level": 6}
+        assert entry["cache"]["restore_keys"] == "ccache-all-gcc-ubuntu-latest-"
+        assert entry["cache"]["key"].startswith("ccache-all-gcc-ubuntu-latest-")
+        assert entry["cache"]["dir_env"] == "CCACHE_DIR"
+        assert entry["incremental"]["key"].startswith("build-all-gcc-ubuntu-latest-")
+        assert entry["incremental"]["path"] == "build/debug\nbuild/release"
+        assert entry["incremental"]["manifest"] == "build/debug/.cmake-builder-mtimes.json"
+
+    def test_plan_batch_artifact_archive(self, cmake_project: CMakeRoot) -> None:
+        presets_data: dict[str, Any] = {
+            "debug": {"group": "all", "artifact": {"compression_level": 1}},
+            "release": {"group": "all", "artifact": {"archive": "tar.zst", "compression_level": 7}},
+        }
+
+        matrix = plan(presets_data, CMakePresets(cmake_project), cmake_project, "ubuntu-latest", "gcc", False, 5)
+
+        assert matrix["include"][0]["artifact"] == {
+            "path": "build/debug\nbuild/release",
+            "retention_days": 5,
+            "compression_level": 0,
+            "archive": ".cmake-builder-artifact/all.tar.zst",
+            "archive_level": 7,
+        }
+
+        # the archive of the batch holds the paths of every preset in it
+        presets_data["debug"]["artifact"] = {"path": ["/outside"]}
+        with pytest.raises(ValueError, match="Artifact paths of 'all' must be relative paths inside the workspace to be archived: /outside"):
+            plan(presets_data, CMakePresets(cmake_project), cmake_project, "ubuntu-latest", "gcc", False, 5)
+
+        presets_data["debug"]["artifact"] = {"compression_level": 1}
+        presets_data["release"]["artifact"] = {"compression_level": 9}
+        matrix = plan(presets_data, CMakePresets(cmake_project), cmake_project, "ubuntu-latest", "gcc", False, 5)
+        assert matrix["include"][0]["artifact"]["compression_level"] == 1
+        assert "archive" not in matrix["include"][0]["artifact"]
+
+    def test_plan_batch_without_shared_configs(self, cmake_project: CMakeRoot) -> None:
+        matrix = plan({"debug": {}, "release": {}}, CMakePresets(cmake_project), cmake_project, "ubuntu-latest", "gcc", False, 5, max_presets_per_job=4)
+
+        entry = matrix["include"][0]
+        assert entry["preset"] == "debug+release"
+        assert "artifact" not in entry and "cache" not in entry and "incremental" not in entry
+        assert "critical" not in entry
+
+    def test_plan_critical(self, cmake_project: CMakeRoot) -> None:
+        presets = CMakePresets(cmake_project)
+
+        matrix = plan({"debug": {"critical": True}, "release": {}}, presets, cmake_project, "ubuntu-latest", "gcc", False, 5)
+        assert [entry.get("critical", False) for entry in matrix["include"]] == [True, False]
+
+        matrix = plan({"debug": {"group": "all"}, "release": {"group": "all", "critical": True}}, presets, cmake_project, "ubuntu-latest", "gcc", False, 5)
+        entry = matrix["include"][0]
+        assert entry["critical"] is True
+        assert [member.get("critical", False) for member in entry["presets"]] == [False, True]
+
+    def test_plan_ninja_report(self, cmake_project: CMakeRoot) -> None:
+        presets = CMakePresets(cmake_project)
+
+        matrix = plan({"debug": {"group": "all"}, "release": {"group": "all"}}, presets, cmake_project, "ubuntu-latest", "gcc", False, 5, ninja_report=True)
+
+        group_entry = matrix["include"][0]
+        assert group_entry["ninja_log"] == {
+            "key": "ninja-report-all-gcc-ubuntu-latest",
+            "logs": {"debug": "build/debug/.ninja_log", "release": "build/release/.ninja_log"},
+        }
+        assert all("ninja_log" not in member for member in group_entry["presets"])
+
+        matrix = plan({"debug": {"test": {"shards": 2}}}, presets, cmake_project, "ubuntu-latest", "gcc", False, 5, ninja_report=True)
+
+        first_shard, second_shard = matrix["include"]
+        assert first_shard["ninja_log"]["key"] == "ninja-report-debug-gcc-ubuntu-latest"
+        assert "ninja_log" not in second_shard
+
+    def test_plan_batch_mixed_launchers(self, cmake_project: CMakeRoot) -> None:
+        presets_data: dict[str, Any] = {
+            "debug": {"group": "all", "cache": {"launcher": "ccache"}},
+            "release": {"group": "all", "cache": {"launcher": "sccache"}},
+        }
+
+        with pytest.raises(ValueError) as e:
+            plan(presets_data, CMakePresets(cmake_project), cmake_project, "ubuntu-latest", "gcc", False, 5)
+        assert "must use the same compiler cache launcher" in str(e.value)
+
+    def test_plan_test_shards(self, cmake_project: CMakeRoot) -> None:
+        matrix = plan({"debug": {"test": {"shards": 2}}}, CMakePresets(cmake_project), cmake_project, "ubuntu-latest", "gcc", True, 5)
+
+        assert [(entry["shard"], entry["test"], "artifact" in entry) for entry in matrix["include"]] == [
+            ({"index": 1, "count": 2}, "ctest --preset debug -I 1,,2", True),
+            ({"index": 2, "count": 2}, "ctest --preset debug -I 2,,2", False),
+        ]
+
+    def test_plan_test_options(self, cmake_project: CMakeRoot) -> None:
+        presets_data: dict[str, Any] = {"debug": {"group": "all", "test": {"timeout": 30, "junit": True}}, "release": {"group": "all"}}
+
+        matrix = plan(presets_data, CMakePresets(cmake_project), cmake_project, "ubuntu-latest", "gcc", False, 5)
+
+        debug, release = matrix["include"][0]["presets"]
+        assert debug["test"] == 'ctest --preset debug --timeout 30 --output-junit "$CMAKE_BUILDER_JUNIT/debug.xml"'
+        assert "test_options" not in debug and "test_options" not in release
+
+    def test_plan_split(self, cmake_project: CMakeRoot) -> None:
+        presets_data: dict[str, Any] = {"debug": {"split": True, "test": {"shards": 2}, "runs-on": "ubuntu-24.04"}, "release": {"split": True}}
+
+        matrix = plan(presets_data, CMakePresets(cmake_project), cmake_project, "ubuntu-latest", "gcc", True, 5, timing=True)
+        test_matrix = split_test_matrix(matrix)
+
+        debug, release = matrix["include"]
+        assert debug["build"].endswith("cmake --build --preset debug")
+        assert "test" not in debug and "split" not in debug and "tests" not in debug
+        assert debug["artifact"]["path"] == "build/debug"
+        snapshot = 'uv run --script "$CMAKE_BUILDER_SCRIPTS/ctest_snapshot.py"'
+        assert debug["snapshot"] == {
+            "name": "snapshot-debug",
+            "path": ".cmake-builder-snapshot/debug.tar.zst",
+            "create": f'{snapshot} create --preset debug --binary-dir build/debug --workspace "$GITHUB_WORKSPACE" '
+            '--archive "$GITHUB_WORKSPACE/.cmake-builder-snapshot/debug.tar.zst"',
+            "extract": f'{snapshot} extract --workspace "$GITHUB_WORKSPACE" --archive "$GITHUB_WORKSPACE/.cmake-builder-snapshot/debug.tar.zst"',
+        }
+        # release has no test preset, so there is nothing to snapshot
+        assert "snapshot" not in release
+
+        timer = 'uv run --script "$CMAKE_BUILDER_SCRIPTS/step_timer.py" run'
+        assert test_matrix == {
+            "include": [
+                {
+                    "preset": "debug",
+                    "runs-on": "ubuntu-24.04",
+                    "toolchain": "gcc",
+                    "snapshot": debug["snapshot"],
+                    "shard": {"index": index, "count": 2},
+                    "test": f"{timer} --preset debug-{index}of2 --phase test -- ctest --preset debug -I {index},,2",
+                }
+                for index in (1, 2)
+            ]
+        }
+
+    def test_plan_split_parallel_auto(self, cmake_project: CMakeRoot) -> None:
+        presets_data: dict[str, Any] = {
+            "debug": {"split": True, "test": {"shards": 2}, "parallel": "auto", "memory_per_job_mb": 2048},
+            "release": {"parallel": 4},
+        }
+
+        matrix = plan(presets_data, CMakePresets(cmake_project), cmake_project, "ubuntu-latest", "gcc", True, 5)
+        test_matrix = split_test_matrix(matrix)
+
+        # the runner of every test job resolves the parallel level, the ctest commands read it from CTEST_PARALLEL_LEVEL
+        assert [(test["parallel"], test["test"]) for test in test_matrix["include"]] == [
+            ({"memory_per_job_mb": 2048}, f"ctest --preset debug -I {index},,2") for index in (1, 2)
+        ]
+
+        presets_data = {"debug": {"split": True, "parallel": 4}}
+        test_matrix = split_test_matrix(plan(presets_data, CMakePresets(cmake_project), cmake_project, "ubuntu-latest", "gcc", True, 5))
+        assert [("parallel" in test, test["test"]) for test in test_matrix["include"]] == [(False, "ctest --preset debug -j 4")]
+
+    def test_plan_build_acceleration(self, cmake_project: CMakeRoot) -> None:
+        presets_data: dict[str, Any] = {
+            "debug": {"group": "all", "unity_build": 8, "linker": "mold"},
+            "release": {"group": "all", "pch": False, "linker": "lld"},
+        }
+
+        matrix = plan(presets_data, CMakePresets(cmake_project), cmake_project, "ubuntu-latest", "gcc", False, 5)
+
+        entry = matrix["include"][0]
+        assert entry["linker"] == "lld mold"
+        debug, release = entry["presets"]
+        assert debug["configure"] == "cmake --preset debug -DCMAKE_UNITY_BUILD=ON -DCMAKE_UNITY_BUILD_BATCH_SIZE=8 -DCMAKE_LINKER_TYPE=MOLD"
+        assert release["configure"] == "cmake --preset release -DCMAKE_DISABLE_PRECOMPILE_HEADERS=ON -DCMAKE_LINKER_TYPE=LLD"
+        assert "unity_build" not in debug and "pch" not in release
+
+        matrix = plan({"debug": {"linker": "mold"}}, CMakePresets(cmake_project), cmake_project, "ubuntu-latest", "gcc", False, 5)
+        assert matrix["include"][0]["linker"] == "mold"
+
+    def test_preflight_legs(self, cmake_project: CMakeRoot) -> None:
+        presets_data: dict[str, Any] = {"debug": {"test": {"shards": 2}, "linker": "mold", "unity_build": True}, "release": {"toolchain": "clang"}}
+        presets = CMakePresets(cmake_project)
+
+        matrix = plan(presets_data, presets, cmake_project, "ubuntu-latest", "gcc", False, 5, timing=True)
+        # the configure command of the leg itself, without the timing wrapper
+        assert preflight_legs(matrix, "ubuntu-latest", "gcc") == [
+            {
+                "preset": "debug",
+                "configure": "cmake --preset debug -DCMAKE_UNITY_BUILD=ON -DCMAKE_LINKER_TYPE=MOLD --fresh",
+                "linker": "mold",
+            }
+        ]
+        assert not any("preflight" in entry for entry in matrix["include"])
+
+        matrix = plan(presets_data, presets, cmake_project, "ubuntu-latest", "gcc", False, 5)
+        assert preflight_legs(matrix, "ubuntu-latest", "clang") == [{"preset": "release", "configure": "cmake --preset release --fresh"}]
+
+        grouped_data: dict[str, Any] = {"debug": {"group": "all", "cache": {"launcher": "ccache"}, "linker": "lld"}, "release": {"group": "all"}}
+        grouped = plan(grouped_data, presets, cmake_project, "ubuntu-latest", "gcc", False, 5)
+        legs = preflight_legs(grouped, "ubuntu-latest", "gcc")
+        assert [(leg["preset"], leg.get("linker"), leg["launcher"]) for leg in legs] == [("debug", "lld", "ccache"), ("release", None, "ccache")]
+        assert "-DCMAKE_CXX_COMPILER_LAUNCHER=ccache" in legs[0]["configure"]
+        assert preflight_setup(legs) == {"linker": "lld", "launcher": "ccache"}
+        assert preflight_setup([]) == {"linker": "", "launcher": ""}
+
+    def test_plan_parallel(self, cmake_project: CMakeRoot) -> None:
+        presets_data: dict[str, Any] = {"debug": {"parallel": "auto", "memory_per_job_mb": 2048}, "release": {"parallel": 2}}
+
+        matrix = plan(presets_data, CMakePresets(cmake_project), cmake_project, "ubuntu-latest", "gcc", False, 5)
+
+        debug_entry, release_entry = matrix["include"]
+        # auto is left for the runner of the leg to resolve
+        assert debug_entry["build"] == "cmake --build --preset debug"
+        assert debug_entry["test"] == "ctest --preset debug"
+        assert debug_entry["parallel"] == {"memory_per_job_mb": 2048}
+        assert "memory_per_job_mb" not in debug_entry
+
+        assert release_entry["build"] == "cmake --build --preset release --parallel 2"
+        assert "parallel" not in release_entry
+
+    def test_plan_timing(self, cmake_project: CMakeRoot) -> None:
+        presets_data: dict[str, Any] = {"debug": {"test": {"shards": 2}}}
+
+        matrix = plan(presets_data, CMakePresets(cmake_project), cmake_project, "ubuntu-latest", "gcc", False, 5, timing=True)
+
+        timer = 'uv run --script "$CMAKE_BUILDER_SCRIPTS/step_timer.py" run'
+        first_shard, second_shard = matrix["include"]
+        assert first_shard["configure"] == f"{timer} --preset debug-1of2 --phase configure -- cmake --preset debug"
+        assert second_shard["test"] == f"{timer} --preset debug-2of2 --phase test -- ctest --preset debug -I 2,,2"
+
+    @pytest.mark.parametrize("argv", [[], ["--help"]])  # type: ignore
+    def test_startup_skips_heavy_imports(self, argv: list[str]) -> None:
+        # every matrix leg pays the startup cost, cmakepresets and jsonschema load only once they are used
+        code = (
+            f"import sys; sys.path.insert(0, {str(SCRIPTS_DIR)!r}); sys.argv = ['plan.py', *{argv!r}]; import plan\n"
+            "try:\n    plan.parse_arguments()\nexcept SystemExit:\n    pass\n"
+            "print(sorted({name.split('.')[0] for name in sys.modules} & {'cmakepresets', 'jsonschema', 'requests', 'rich'}))"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert result.stdout.splitlines()[-1] == "[]"
+
+    def test_main_presets_cache_hit_skips_cmakepresets(self, tmp_path: Path) -> None:
+        presets_content = {
+            "version": 6,
+            "configurePresets": [{"name": "debug", "generator": "Ninja", "binaryDir": "${sourceDir}/build/${presetName}"}],
+            "testPresets": [{"name": "debug", "configurePreset": "debug"}],
+        }
+        (tmp_path / "CMakePresets.json").write_text(json.dumps(presets_content))
+        cache_file = tmp_path / "presets-cache.json"
+        argv = [
+            "plan.py",
+            "--cmake-project-root",
+            str(tmp_path),
+            "--default-runs-on",
+            "ubuntu-latest",
+            "--default-toolchain",
+            "gcc",
+            "--default-artifact-retention-days",
+            "5",
+            "--presets",
+            '{"debug": {"incremental": true}}',
+            "--presets-cache",
+            str(cache_file),
+        ]
+        # the first run parses the presets and writes the cache
+        with patch("sys.argv", argv), patch("sys.stdout") as mock_stdout:
+            main()
+        parsed = [args[0] for args, _ in mock_stdout.write.call_args_list if args[0].startswith("matrix=")]
+        assert cache_file.is_file()
+
+        code = (
+            f"import sys; sys.path.insert(0, {str(SCRIPTS_DIR)!r}); sys.argv = {argv!r}; import plan\n"
+            "plan.main()\n"
+            "print(sorted({name.split('.')[0] for name in sys.modules} & {'cmakepresets', 'rich'}))"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        lines = result.stdout.splitlines()
+        assert lines[-1] == "[]"
+        assert [line for line in lines if line.startswith("matrix=")] == parsed
+
+    def test_plan_invalid_presets_input(self, cmake_project: CMakeRoot) -> None:
+        with pytest.raises(ValueError) as e:
+            plan({"debug": {"unknown": 1}}, CMakePresets(cmake_project), cmake_project, "ubuntu-latest", "gcc", False, 5)
+        assert "Preset validation error" in str(e.value)
+
+    def test_plan_unknown_preset(self, cmake_project: CMakeRoot) -> None:
+        with pytest.raises(ValueError) as e:
+            plan({"missing": {}}, CMakePresets(cmake_project), cmake_project, "ubuntu-latest", "gcc", False, 5)
+        assert "Preset 'missing' not found in the CMake project" in str(e.value)
+
+    @patch(
+        "sys.argv",
+        [
+            "plan.py",
+            "--cmake-project-root",
+            "/fake/path",
+            "--default-runs-on",
+            "ubuntu-latest",
+            "--default-toolchain",
+            "gcc",
+            "--default-store-artifact",
+            "false",
+            "--default-artifact-retention-days",
+            "5",
+            "--presets",
+            '{"debug": {"runs-on": "ubuntu-24.04"}}',
+        ],
+    )
+    @patch("sys.stdout")
+    def test_main(self, mock_stdout: Any, cmake_project: CMakeRoot) -> None:
+        main()
+
+        output_lines = [args[0] for args, _ in mock_stdout.write.call_args_list]
+        matrix_line = next((line for line in output_lines if line.startswith("matrix=")), None)
+        assert matrix_line is not None, "No output line starts with 'matrix='"
+
+        assert "pruned=[]" in output_lines
+        assert "preflight=[]" in output_lines
+        assert 'preflight_setup={"linker": "", "launcher": ""}' in output_lines
+        assert "runners={}" in output_lines
+        assert 'test_matrix={"include": []}' in output_lines
+        assert "junit=false" in output_lines
+
+        matrix = json.loads(matrix_line.split("matrix=", 1)[1])
+        assert matrix["include"] == [
+            {
+                "preset": "debug",
+                "runs-on": "ubuntu-24.04",
+                "toolchain": "gcc",
+                "configure": "cmake --preset debug",
+                "build": "cmake --build --preset debug",
+                "test": "ctest --preset debug",
+            },
+        ]
+
+    @patch(
+        "sys.argv",
+        [
+            "plan.py",
+            "--cmake-project-root",
+            "/fake/path",
+            "--default-runs-on",
+            "ubuntu-latest",
+            "--default-toolchain",
+            "gcc",
+            "--default-artifact-retention-days",
+            "5",
+            "--presets",
+            "{invalid}",
+        ],
+    )
+    @patch("sys.stderr")
+    @patch("sys.exit")
+    def test_main_invalid_json(self, mock_exit: Any, mock_stderr: Any, cmake_project: CMakeRoot) -> None:
+        main()
+        assert any("Error: JSON decode error:" in args[0] for args, _ in mock_stderr.write.call_args_list)
+        mock_exit.assert_called_with(1)
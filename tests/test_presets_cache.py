@@ -0,0 +1,147 @@
+import json
+import sys
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from cmakepresets import CMakePresets
+from cmakepresets.constants import BUILD, CONFIGURE
+from cmakepresets.paths import CMakeRoot
+
+sys.path.insert(0, str(Path(__file__).parent.parent / ".github" / "scripts"))
+from generate_steps import generate_outputs
+from presets_cache import CONFIGURE as CACHED_CONFIGURE
+from presets_cache import CachedPresets, SourceRoot, cache_key, find_presets_files, load_presets
+
+
+class TestPresetsCache:
+    @pytest.fixture(scope="function")  # type: ignore
+    def project(self, tmp_path: Path) -> Path:
+        presets: dict[str, Any] = {
+            "version": 6,
+            "include": ["presets/base.json"],
+            "configurePresets": [
+                {"name": "debug", "inherits": "base", "cacheVariables": {"CMAKE_BUILD_TYPE": "Debug"}},
+                {"name": "release", "inherits": "base", "binaryDir": "${sourceDir}/out/$env{BUILD_FLAVOR}"},
+            ],
+            "buildPresets": [{"name": "debug", "configurePreset": "debug"}],
+            "testPresets": [{"name": "debug", "configurePreset": "debug"}],
+        }
+        base: dict[str, Any] = {
+            "version": 6,
+            "configurePresets": [{"name": "base", "hidden": True, "generator": "Ninja", "binaryDir": "${sourceDir}/build/${presetName}"}],
+        }
+        (tmp_path / "presets").mkdir()
+        (tmp_path / "CMakePresets.json").write_text(json.dumps(presets))
+        (tmp_path / "presets" / "base.json").write_text(json.dumps(base))
+        (tmp_path / "CMakeUserPresets.json").write_text(json.dumps({"version": 6, "configurePresets": [{"name": "mine", "inherits": "debug"}]}))
+        return tmp_path
+
+    def test_find_presets_files(self, project: Path) -> None:
+        assert find_presets_files(project) == [project / "CMakePresets.json", project / "CMakeUserPresets.json", project / "presets" / "base.json"]
+
+    def test_cache_key_changes_with_included_file(self, project: Path) -> None:
+        key = cache_key(project)
+        assert cache_key(project) == key
+
+        (project / "presets" / "base.json").write_text((project / "presets" / "base.json").read_text().replace("Ninja", "Unix Makefiles"))
+        assert cache_key(project) != key
+
+    def test_cache_key_changes_with_referenced_environment(self, project: Path) -> None:
+        with patch.dict("os.environ", {"BUILD_FLAVOR": "a", "UNRELATED": "a"}):
+            key = cache_key(project)
+        with patch.dict("os.environ", {"BUILD_FLAVOR": "a", "UNRELATED": "b"}):
+            assert cache_key(project) == key
+        with patch.dict("os.environ", {"BUILD_FLAVOR": "b"}):
+            assert cache_key(project) != key
+
+    def test_cache_key_with_macro_include(self, project: Path) -> None:
+        (project / "CMakeUserPresets.json").write_text(json.dumps({"version": 6, "include": ["$env{HOME}/presets.json"]}))
+        assert cache_key(project) is None
+
+        with patch("cmakepresets.CMakePresets") as mock_presets:
+            assert load_presets(CMakeRoot(project), project / "cache.json") is mock_presets.return_value
+        assert not (project / "cache.json").exists()
+
+    def test_load_presets_without_cache_file(self, project: Path) -> None:
+        assert isinstance(load_presets(CMakeRoot(project), None), CMakePresets)
+
+    def test_load_presets_writes_and_reuses_cache(self, project: Path) -> None:
+        root = CMakeRoot(project)
+        cache_file = project / ".cache" / "presets.json"
+
+        presets = load_presets(root, cache_file)
+        assert isinstance(presets, CMakePresets)
+        assert sorted(json.loads(cache_file.read_text())["configure"]) == ["debug", "mine", "release"]
+
+        cached = load_presets(root, cache_file)
+        assert isinstance(cached, CachedPresets)
+        for preset in ("debug", "release"):
+            config: dict[str, Any] = {"cache": {"launcher": "ccache"}, "incremental": True}
+            assert generate_outputs(cached, root, preset, True, 5, config, "gcc", "ubuntu-latest") == generate_outputs(
+                presets,
+                root,
+                preset,
+                True,
+                5,
+                config,
+                "gcc",
+                "ubuntu-latest",
+            )
+
+        # editing any presets file invalidates the cache
+        (project / "CMakeUserPresets.json").write_text(json.dumps({"version": 6}))
+        assert isinstance(load_presets(root, cache_file), CMakePresets)
+        assert "mine" not in json.loads(cache_file.read_text())["configure"]
+
+    def test_cached_presets_fall_back_for_uncached_presets(self, project: Path) -> None:
+        root = CMakeRoot(project)
+        cache_file = project / "presets-cache.json"
+        load_presets(root, cache_file)
+        cached = load_presets(root, cache_file)
+        assert isinstance(cached, CachedPresets)
+
+        assert cached.get_preset_by_name(CONFIGURE, "base") is not None
+        assert cached.get_preset_by_name(BUILD, "debug") is not None
+        assert cached.resolve_macro_values(CONFIGURE, "base")["generator"] == "Ninja"
+        assert cached.find_related_presets("base") is not None
+        assert cached.presets is not None
+
+    def test_load_presets_corrupt_cache(self, project: Path) -> None:
+        cache_file = project / "presets-cache.json"
+        cache_file.write_text("{")
+
+        with patch("sys.stderr") as mock_stderr:
+            assert isinstance(load_presets(CMakeRoot(project), cache_file), CMakePresets)
+
+        assert any("ignoring corrupt presets cache" in args[0] for args, _ in mock_stderr.write.call_args_list)
+        assert json.loads(cache_file.read_text())["key"] == cache_key(project)
+
+    def test_serialize_skips_unresolvable_presets(self, project: Path) -> None:
+        with patch.object(CMakePresets, "resolve_macro_values", side_effect=ValueError("broken")):
+            load_presets(CMakeRoot(project), project / "presets-cache.json")
+        assert json.loads((project / "presets-cache.json").read_text())["configure"] == {}
+
+    def test_configure_constant(self) -> None:
+        assert CACHED_CONFIGURE == CONFIGURE
+
+    @pytest.mark.parametrize("relative", ["", "CMakePresets.json"])  # type: ignore
+    def test_source_root_matches_cmake_root(self, relative: str, project: Path) -> None:
+        root, source_root = CMakeRoot(project / relative), SourceRoot(project / relative)
+
+        assert source_root.source_dir == root.source_dir
+        for path in (project / "build" / "debug", project, project / "CMakePresets.json", project.parent / "elsewhere"):
+            assert source_root.get_relative_path(path) == root.get_relative_path(path)
+
+    def test_source_root_relative_path(self, project: Path) -> None:
+        with patch("pathlib.Path.cwd", return_value=project.parent):
+            assert SourceRoot(Path(project.name)).source_dir == project
+
+    def test_load_presets_with_source_root(self, project: Path) -> None:
+        cache_file = project / "presets-cache.json"
+        assert isinstance(load_presets(SourceRoot(project), cache_file), CMakePresets)
+
+        cached = load_presets(SourceRoot(project), cache_file)
+        assert isinstance(cached, CachedPresets)
+        assert cached.get_preset_by_name(BUILD, "debug") is not None
@@ -0,0 +1,161 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from cmakepresets import CMakePresets
+from cmakepresets.paths import CMakeRoot
+
+sys.path.insert(0, str(Path(__file__).parent.parent / ".github" / "scripts"))
+import asyncio
+
+from run_local import local_presets, main, parse_jobs, plan_legs, render_table, run_legs
+
+
+class TestRunLocal:
+    @pytest.fixture(scope="function")  # type: ignore
+    def cmake_project(self, tmp_path: Path) -> CMakeRoot:
+        presets_content = {
+            "version": 6,
+            "configurePresets": [
+                {"name": "base", "hidden": True, "generator": "Ninja", "binaryDir": "${sourceDir}/build/${presetName}"},
+                {"name": "debug", "inherits": "base"},
+                {"name": "release", "inherits": "base"},
+            ],
+            "buildPresets": [{"name": "debug", "configurePreset": "debug"}, {"name": "release", "configurePreset": "release"}],
+            "testPresets": [{"name": "debug", "configurePreset": "debug"}],
+        }
+        (tmp_path / "CMakePresets.json").write_text(json.dumps(presets_content))
+        return CMakeRoot(tmp_path)
+
+    def test_local_presets_drops_ci_only_options(self) -> None:
+        presets_data = {
+            "debug": {
+                "runs-on": "macos-latest",
+                "cache": {"launcher": "ccache"},
+                "group": "all",
+                "test": {"shards": 4, "junit": True, "timeout": 60},
+                "parallel": "auto",
+            },
+            "release": {"artifact": {"archive": "tar.zst"}, "linker": "mold", "paths": ["src/**"]},
+        }
+        assert local_presets(presets_data) == {"debug": {"test": {"timeout": 60}, "parallel": "auto"}, "release": {"linker": "mold"}}
+
+    def test_plan_legs(self, cmake_project: CMakeRoot) -> None:
+        presets_data: dict[str, Any] = {"debug": {"group": "all", "test": {"shards": 2}}, "release": {"group": "all", "cache": {"launcher": "ccache"}}}
+
+        legs = plan_legs(presets_data, CMakePresets(cmake_project), cmake_project)
+
+        assert [(leg["preset"], leg["configure"], leg["build"], leg.get("test")) for leg in legs] == [
+            ("debug", "cmake --preset debug", "cmake --build --preset debug", "ctest --preset debug"),
+            ("release", "cmake --preset release", "cmake --build --preset release", None),
+        ]
+
+    def test_run_legs(self, tmp_path: Path, capsys: Any) -> None:
+        legs = [
+            {"preset": "a", "configure": "echo configure a", "build": "echo $CMAKE_BUILD_PARALLEL_LEVEL > a.parallel", "test": "printf 'no newline'"},
+            {"preset": "broken", "configure": "echo oops >&2; exit 3", "build": "touch never"},
+        ]
+
+        with patch("run_local.available_cpus", return_value=8):
+            results = asyncio.run(run_legs(legs, tmp_path, 4))
+
+        assert [(result["preset"], result["failed"], list(result["phases"])) for result in results] == [
+            ("a", None, ["configure", "build", "test"]),
+            ("broken", "configure", ["configure"]),
+        ]
+        assert (tmp_path / "a.parallel").read_text().strip() == "4"
+        assert not (tmp_path / "never").exists()
+
+        output = capsys.readouterr().out.splitlines()
+        assert "[a     ] configure a" in output
+        assert "[a     ] no newline" in output
+        assert "[broken] oops" in output
+        assert "[broken] configure failed with exit code 3" in output
+
+    def test_run_legs_long_line(self, tmp_path: Path, capsys: Any) -> None:
+        legs = [{"preset": "a", "configure": "printf '%040d\\nshort\\n' 0"}]
+
+        with patch("run_local.available_cpus", return_value=8), patch("run_local.MAX_LINE_LENGTH", 16):
+            results = asyncio.run(run_legs(legs, tmp_path, 1))
+
+        assert results[0]["failed"] is None
+        output = capsys.readouterr().out.splitlines()
+        assert "".join(line.removeprefix("[a] ") for line in output[:-1]) == "0" * 40
+        assert output[-1] == "[a] short"
+
+    def test_run_legs_empty(self, tmp_path: Path) -> None:
+        assert asyncio.run(run_legs([], tmp_path, 4)) == []
+
+    @pytest.mark.parametrize("jobs", ["0", "-2", "many"])  # type: ignore
+    def test_parse_jobs_invalid(self, jobs: str) -> None:
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_jobs(jobs)
+
+    def test_render_table(self) -> None:
+        results: list[dict[str, Any]] = [
+            {"preset": "debug", "failed": None, "phases": {"configure": 1.0, "build": 61.5}},
+            {"preset": "release", "failed": "build", "phases": {"configure": 2.0, "build": 3.25}},
+        ]
+        assert render_table(results).splitlines() == [
+            "| Preset | Result | configure | build | Total |",
+            "|---|---|---:|---:|---:|",
+            "| debug | passed | 1.0s | 1m 01.5s | 1m 02.5s |",
+            "| release | failed (build) | 2.0s | 3.2s | 5.2s |",
+        ]
+
+    @pytest.mark.parametrize(
+        "argv, expected_presets, jobs, failed",
+        [
+            ([], ["debug", "release"], 3, False),
+            (["--presets", '{"release": {}}', "--jobs", "2"], ["release"], 2, True),
+        ],
+    )  # type: ignore
+    @patch("sys.exit")
+    def test_main(self, mock_exit: Any, argv: list[str], expected_presets: list[str], jobs: int, failed: bool, cmake_project: CMakeRoot, capsys: Any) -> None:
+        async def fake_run_legs(legs: list[dict[str, Any]], cwd: Path, max_jobs: int) -> list[dict[str, Any]]:
+            assert [leg["preset"] for leg in legs] == expected_presets
+            assert cwd == cmake_project.source_dir
+            assert max_jobs == jobs
+            return [{"preset": leg["preset"], "failed": "build" if failed else None, "phases": {"configure": 1.0}} for leg in legs]
+
+        with (
+            patch("sys.argv", ["run_local.py", "--cmake-project-root", str(cmake_project.source_dir), *argv]),
+            patch("run_local.run_legs", fake_run_legs),
+            patch("run_local.available_cpus", return_value=3),
+        ):
+            main()
+
+        assert f"| {expected_presets[0]} | {'failed (build)' if failed else 'passed'} |" in capsys.readouterr().out
+        if failed:
+            mock_exit.assert_called_with(1)
+        else:
+            mock_exit.assert_not_called()
+
+    def test_main_without_presets(self, tmp_path: Path, capsys: Any) -> None:
+        presets_content = {"version": 6, "configurePresets": [{"name": "base", "hidden": True, "generator": "Ninja"}]}
+        (tmp_path / "CMakePresets.json").write_text(json.dumps(presets_content))
+
+        with patch("sys.argv", ["run_local.py", "--cmake-project-root", str(tmp_path)]), patch("run_local.run_legs") as mock_run_legs:
+            main()
+
+        assert capsys.readouterr().out.endswith("No presets to run\n")
+        mock_run_legs.assert_not_called()
+
+    def test_main_invalid_jobs(self, cmake_project: CMakeRoot) -> None:
+        with patch("sys.argv", ["run_local.py", "--cmake-project-root", str(cmake_project.source_dir), "--jobs", "0"]), patch("sys.stderr"):
+            with pytest.raises(SystemExit):
+                main()
+
+    @patch("sys.stderr")
+    @patch("sys.exit")
+    def test_main_unknown_preset(self, mock_exit: Any, mock_stderr: Any, cmake_project: CMakeRoot) -> None:
+        mock_exit.side_effect = SystemExit(1)
+        with patch("sys.argv", ["run_local.py", "--cmake-project-root", str(cmake_project.source_dir), "--presets", '{"missing": {}}']):
+            with pytest.raises(SystemExit):
+                main()
+        assert any("Error: Preset 'missing' not found" in args[0] for args, _ in mock_stderr.write.call_args_list)
+        mock_exit.assert_called_with(1)
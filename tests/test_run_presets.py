@@ -0,0 +1,112 @@
+import json
+import sys
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / ".github" / "scripts"))
+from run_presets import main, run_preset, run_presets
+
+
+class TestRunPresets:
+    def test_run_preset_runs_phases_in_order(self, tmp_path: Path) -> None:
+        leg = {"preset": "debug", "configure": "echo configure >> log", "build": "echo build >> log", "test": "echo test >> log"}
+
+        failed_phase, elapsed = run_preset(leg, tmp_path)
+
+        assert failed_phase is None
+        assert elapsed >= 0
+        assert (tmp_path / "log").read_text().split() == ["configure", "build", "test"]
+
+    def test_run_preset_stops_at_failure(self, tmp_path: Path) -> None:
+        leg = {"preset": "debug", "configure": "exit 3", "build": "echo build >> log"}
+
+        failed_phase, _ = run_preset(leg, tmp_path)
+
+        assert failed_phase == "configure"
+        assert not (tmp_path / "log").exists()
+
+    def test_run_preset_resolves_parallel(self, tmp_path: Path) -> None:
+        leg = {"preset": "debug", "parallel": {"memory_per_job_mb": 0}, "build": "echo $CMAKE_BUILD_PARALLEL_LEVEL $CTEST_PARALLEL_LEVEL > log"}
+
+        with patch("run_presets.parallelism_env", return_value={"CMAKE_BUILD_PARALLEL_LEVEL": "5", "CTEST_PARALLEL_LEVEL": "5"}):
+            failed_phase, _ = run_preset(leg, tmp_path)
+
+        assert failed_phase is None
+        assert (tmp_path / "log").read_text().split() == ["5", "5"]
+
+    def test_run_presets_continues_past_failure(self, tmp_path: Path, capsys: Any) -> None:
+        legs = [
+            {"preset": "broken", "configure": "false"},
+            {"preset": "working", "configure": "echo working >> log"},
+        ]
+
+        assert run_presets(legs, tmp_path) == (False, False)
+        assert (tmp_path / "log").read_text().strip() == "working"
+
+        output = capsys.readouterr().out
+        assert "::error::broken: configure failed with exit code 1" in output
+        assert "broken: failure" in output
+        assert "working: success" in output
+
+    @pytest.mark.parametrize(
+        "critical, failing_phase, skipped",
+        [(True, "configure", True), (True, "build", True), (True, "test", False), (False, "build", False)],
+    )  # type: ignore
+    def test_run_presets_fail_fast(self, tmp_path: Path, capsys: Any, critical: bool, failing_phase: str, skipped: bool) -> None:
+        legs: list[dict[str, Any]] = [
+            {"preset": "gate", "critical": critical, "configure": "true", "build": "true", "test": "true", failing_phase: "false"},
+            {"preset": "next", "configure": "echo next >> log"},
+        ]
+
+        assert run_presets(legs, tmp_path, fail_fast=True) == (False, skipped)
+        assert (tmp_path / "log").exists() != skipped
+
+        output = capsys.readouterr().out
+        assert "gate: failure" in output
+        assert ("next: skipped" in output) == skipped
+
+    def test_run_presets_critical_without_fail_fast(self, tmp_path: Path) -> None:
+        legs: list[dict[str, Any]] = [{"preset": "gate", "critical": True, "configure": "false"}, {"preset": "next", "configure": "echo next >> log"}]
+
+        assert run_presets(legs, tmp_path) == (False, False)
+        assert (tmp_path / "log").exists()
+
+    @patch("sys.exit")
+    def test_main(self, mock_exit: Any, tmp_path: Path) -> None:
+        legs = [{"preset": "debug", "build": "echo build >> log"}]
+        with patch("sys.argv", ["run_presets.py", "--cwd", str(tmp_path), "--presets", json.dumps(legs)]):
+            main()
+        mock_exit.assert_not_called()
+        assert (tmp_path / "log").exists()
+
+    @patch("sys.exit")
+    def test_main_fail_fast_output(self, mock_exit: Any, tmp_path: Path) -> None:
+        legs = [{"preset": "gate", "critical": True, "build": "false"}, {"preset": "next", "build": "echo next >> log"}]
+        output = tmp_path / "github_output"
+        argv = ["run_presets.py", "--cwd", str(tmp_path), "--presets", json.dumps(legs), "--fail-fast", "--output", str(output)]
+        with patch("sys.argv", argv):
+            main()
+        mock_exit.assert_called_with(1)
+        assert output.read_text() == "critical_failure=true\n"
+        assert not (tmp_path / "log").exists()
+
+    @patch("sys.exit")
+    def test_main_failure(self, mock_exit: Any, tmp_path: Path) -> None:
+        with patch("sys.argv", ["run_presets.py", "--cwd", str(tmp_path), "--presets", '[{"preset": "debug", "build": "false"}]']):
+            main()
+        mock_exit.assert_called_with(1)
+
+    @patch("sys.stderr")
+    @patch("sys.exit")
+    def test_main_invalid_json(self, mock_exit: Any, mock_stderr: Any, tmp_path: Path) -> None:
+        mock_exit.side_effect = SystemExit(1)
+        with patch("sys.argv", ["run_presets.py", "--cwd", str(tmp_path), "--presets", "{invalid"]):
+            try:
+                main()
+            except SystemExit:
+                pass
+        assert any("Error: JSON decode error:" in args[0] for args, _ in mock_stderr.write.call_args_list)
+        mock_exit.assert_called_with(1)
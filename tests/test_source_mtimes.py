@@ -0,0 +1,77 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / ".github" / "scripts"))
+from source_mtimes import main, restore_mtimes, save_mtimes
+
+OLD_MTIME_NS = 1_000_000_000_000_000_000
+
+
+class TestSourceMtimes:
+    @pytest.fixture(scope="function")  # type: ignore
+    def checkout(self, tmp_path: Path) -> Path:
+        subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "main.cpp").write_text("int main() { return 0; }\n")
+        (tmp_path / "CMakeLists.txt").write_text("project(test)\n")
+        (tmp_path / "untracked.txt").write_text("not tracked\n")
+        subprocess.run(["git", "add", "src/main.cpp", "CMakeLists.txt"], cwd=tmp_path, check=True)
+
+        for name in ("src/main.cpp", "CMakeLists.txt"):
+            os.utime(tmp_path / name, ns=(OLD_MTIME_NS, OLD_MTIME_NS))
+        return tmp_path
+
+    def test_save_and_restore_unchanged(self, checkout: Path) -> None:
+        manifest = checkout / "build" / ".cmake-builder-mtimes.json"
+        assert save_mtimes(checkout, manifest) == 2
+
+        # simulate a fresh checkout
+        for name in ("src/main.cpp", "CMakeLists.txt"):
+            os.utime(checkout / name)
+
+        assert restore_mtimes(checkout, manifest) == 2
+        assert (checkout / "src" / "main.cpp").stat().st_mtime_ns == OLD_MTIME_NS
+        assert (checkout / "CMakeLists.txt").stat().st_mtime_ns == OLD_MTIME_NS
+
+    def test_restore_skips_changed_files(self, checkout: Path) -> None:
+        manifest = checkout / "build" / ".cmake-builder-mtimes.json"
+        save_mtimes(checkout, manifest)
+
+        (checkout / "src" / "main.cpp").write_text("int main() { return 1; }\n")
+        (checkout / "CMakeLists.txt").unlink()
+
+        assert restore_mtimes(checkout, manifest) == 0
+        assert (checkout / "src" / "main.cpp").stat().st_mtime_ns != OLD_MTIME_NS
+
+    def test_save_skips_deleted_files(self, checkout: Path) -> None:
+        (checkout / "CMakeLists.txt").unlink()
+        assert save_mtimes(checkout, checkout / "build" / "manifest.json") == 1
+
+    def test_restore_without_manifest(self, checkout: Path) -> None:
+        assert restore_mtimes(checkout, checkout / "missing.json") == 0
+
+    def test_main_save(self, checkout: Path) -> None:
+        manifest = checkout / "build" / "manifest.json"
+        argv = ["source_mtimes.py", "save", "--source-dir", str(checkout), "--manifest", str(manifest)]
+        with patch("sys.argv", argv), patch("sys.stdout") as mock_stdout:
+            main()
+        assert any("Recorded timestamps of 2 files" in args[0] for args, _ in mock_stdout.write.call_args_list)
+
+        argv = ["source_mtimes.py", "restore", "--source-dir", str(checkout), "--manifest", str(manifest)]
+        with patch("sys.argv", argv), patch("sys.stdout") as mock_stdout:
+            main()
+        assert any("Restored timestamps of 2 unchanged files" in args[0] for args, _ in mock_stdout.write.call_args_list)
+
+    @patch("sys.stderr")
+    @patch("sys.exit")
+    def test_main_not_a_git_checkout(self, mock_exit: Any, mock_stderr: Any, tmp_path: Path) -> None:
+        with patch("sys.argv", ["source_mtimes.py", "save", "--source-dir", str(tmp_path), "--manifest", str(tmp_path / "manifest.json")]):
+            main()
+        assert any("Error:" in args[0] for args, _ in mock_stderr.write.call_args_list)
+        mock_exit.assert_called_with(1)
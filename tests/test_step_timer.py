@@ -0,0 +1,84 @@
+import json
+import sys
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / ".github" / "scripts"))
+from step_timer import main, peak_child_rss_mb, run_step, start_timer, stop_timer
+
+
+class TestStepTimer:
+    def test_run_step(self) -> None:
+        exit_code, seconds, max_rss_mb = run_step([sys.executable, "-c", "import sys; sys.exit(3)"])
+
+        assert exit_code == 3
+        assert seconds >= 0
+        assert max_rss_mb is None or max_rss_mb > 0
+
+    def test_run_step_missing_command(self) -> None:
+        with patch("sys.stderr"):
+            exit_code, _, _ = run_step(["cmake-builder-missing-command"])
+        assert exit_code == 127
+
+    @pytest.mark.parametrize("platform, expected", [("linux", 2.0), ("darwin", 0.0), ("win32", None)])  # type: ignore
+    def test_peak_child_rss_mb_units(self, platform: str, expected: float | None) -> None:
+        with patch("step_timer.sys.platform", platform), patch("resource.getrusage") as mock_getrusage:
+            mock_getrusage.return_value.ru_maxrss = 2048
+            assert peak_child_rss_mb() == expected
+
+    def test_start_and_stop_timer(self, tmp_path: Path) -> None:
+        start_timer(tmp_path, "debug", "setup")
+        record = stop_timer(tmp_path, "debug", "setup", 1)
+
+        assert record["seconds"] >= 0
+        assert record["exit_code"] == 1
+        assert record["cpus"] >= 1
+        assert not (tmp_path / "debug.setup.start").exists()
+        assert json.loads((tmp_path / "debug.setup.json").read_text()) == record
+
+    def test_main_run(self, tmp_path: Path) -> None:
+        argv = ["step_timer.py", "run", "--preset", "debug", "--phase", "build", "--output-dir", str(tmp_path), "--", sys.executable, "-c", "pass"]
+        with patch("sys.argv", argv), pytest.raises(SystemExit) as e:
+            main()
+
+        assert e.value.code == 0
+        record = json.loads((tmp_path / "debug.build.json").read_text())
+        assert record["preset"] == "debug"
+        assert record["phase"] == "build"
+        assert record["exit_code"] == 0
+        assert record["cpus"] >= 1
+        assert "retried" not in record
+
+    def test_main_run_retried(self, tmp_path: Path) -> None:
+        argv = ["step_timer.py", "run", "--preset", "debug", "--phase", "test", "--output-dir", str(tmp_path), "--retried"]
+        with patch("sys.argv", [*argv, "--", sys.executable, "-c", "raise SystemExit(8)"]), pytest.raises(SystemExit) as e:
+            main()
+
+        assert e.value.code == 8
+        record = json.loads((tmp_path / "debug.test.json").read_text())
+        assert (record["exit_code"], record["retried"]) == (8, True)
+
+    def test_main_start_stop(self, tmp_path: Path) -> None:
+        for action in ("start", "stop"):
+            with patch("sys.argv", ["step_timer.py", action, "--preset", "debug", "--phase", "upload", "--output-dir", str(tmp_path)]):
+                main()
+
+        assert json.loads((tmp_path / "debug.upload.json").read_text())["exit_code"] == 0
+
+    @patch("sys.stderr")
+    @patch("sys.exit")
+    def test_main_stop_without_start(self, mock_exit: Any, mock_stderr: Any, tmp_path: Path) -> None:
+        with patch("sys.argv", ["step_timer.py", "stop", "--preset", "debug", "--phase", "upload", "--output-dir", str(tmp_path)]):
+            main()
+
+        assert any("Error:" in args[0] for args, _ in mock_stderr.write.call_args_list)
+        mock_exit.assert_called_with(1)
+
+    def test_main_run_without_command(self) -> None:
+        with patch("sys.argv", ["step_timer.py", "run", "--preset", "debug", "--phase", "build"]), patch("sys.stderr"):
+            with pytest.raises(SystemExit) as e:
+                main()
+        assert e.value.code == 2
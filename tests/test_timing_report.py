@@ -0,0 +1,98 @@
+import json
+import sys
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / ".github" / "scripts"))
+from timing_report import build_report, format_seconds, load_records, main, render_markdown
+
+
+class TestTimingReport:
+    @pytest.fixture(scope="function")  # type: ignore
+    def timings_dir(self, tmp_path: Path) -> Path:
+        records = {
+            "timings-debug/debug.configure.json": {"preset": "debug", "phase": "configure", "seconds": 10.0, "max_rss_mb": 50.0, "exit_code": 0},
+            "timings-debug/debug.build.json": {"preset": "debug", "phase": "build", "seconds": 200.0, "max_rss_mb": 900.0, "exit_code": 0, "cpus": 4},
+            "timings-debug/debug.setup.json": {"preset": "debug", "phase": "setup", "seconds": 30.0, "max_rss_mb": None, "exit_code": 0},
+            "timings-release/release.build.json": {"preset": "release", "phase": "build", "seconds": 90.0, "max_rss_mb": 700.0, "exit_code": 0},
+            "timings-release/release.test.json": {"preset": "release", "phase": "test", "seconds": 5.0, "max_rss_mb": 20.0, "exit_code": 8},
+        }
+        for name, record in records.items():
+            (tmp_path / name).parent.mkdir(exist_ok=True)
+            (tmp_path / name).write_text(json.dumps(record))
+        return tmp_path
+
+    def test_build_report(self, timings_dir: Path) -> None:
+        report = build_report(load_records(timings_dir))
+
+        assert [preset["preset"] for preset in report["presets"]] == ["debug", "release"]
+        debug, release = report["presets"]
+        assert debug["seconds"] == 240.0
+        assert debug["phases"] == {"build": 200.0, "configure": 10.0, "setup": 30.0}
+        assert debug["max_rss_mb"] == 900.0
+        assert release["failed"] == ["test"]
+        assert (debug["cpus"], release["cpus"]) == (4, None)
+        assert [step["seconds"] for step in report["steps"]] == [200.0, 90.0, 30.0, 10.0, 5.0]
+
+    def test_build_report_retried_test(self) -> None:
+        records = [
+            {"preset": "debug", "phase": "test", "seconds": 4.0, "exit_code": 8, "retried": True},
+            {"preset": "debug", "phase": "test-rerun", "seconds": 1.0, "exit_code": 0},
+            {"preset": "release", "phase": "test", "seconds": 4.0, "exit_code": 8, "retried": True},
+            {"preset": "release", "phase": "test-rerun", "seconds": 1.0, "exit_code": 8},
+        ]
+
+        # a flaky test that passes on its rerun doesn't fail the preset
+        assert [preset["failed"] for preset in build_report(records)["presets"]] == [[], ["test-rerun"]]
+
+    @pytest.mark.parametrize("seconds, expected", [(None, ""), (5.25, "5.2s"), (125.0, "2m 05.0s")])  # type: ignore
+    def test_format_seconds(self, seconds: float | None, expected: str) -> None:
+        assert format_seconds(seconds) == expected
+
+    def test_render_markdown(self, timings_dir: Path) -> None:
+        markdown = render_markdown(build_report(load_records(timings_dir)), top=2)
+        lines = markdown.splitlines()
+
+        assert "| Preset | Total | setup | configure | build | test | Peak RSS (MB) | Failed |" in lines
+        assert "| debug | 4m 00.0s | 30.0s | 10.0s | 3m 20.0s |  | 900 |  |" in lines
+        assert "| release | 1m 35.0s |  |  | 1m 30.0s | 5.0s | 700 | test |" in lines
+        assert "| debug | build | 3m 20.0s | 900 | 0 |" in lines
+        assert "| release | test | 5.0s | 20 | 8 |" not in lines
+
+    def test_render_markdown_orders_unknown_phases_last(self) -> None:
+        records = [
+            {"preset": "debug", "phase": "lint", "seconds": 1.0, "exit_code": 0},
+            {"preset": "debug", "phase": "build", "seconds": 2.0, "exit_code": 0},
+        ]
+        assert "| Preset | Total | build | lint | Peak RSS (MB) | Failed |" in render_markdown(build_report(records), top=20)
+
+    def test_render_markdown_without_records(self) -> None:
+        assert "No timing records found." in render_markdown(build_report([]), top=20)
+
+    def test_main(self, timings_dir: Path, tmp_path: Path) -> None:
+        summary = tmp_path / "summary.md"
+        output = tmp_path / "report.json"
+        argv = ["timing_report.py", "--input-dir", str(timings_dir), "--summary", str(summary), "--output", str(output)]
+        with patch("sys.argv", argv):
+            main()
+
+        assert summary.read_text().startswith("## Build performance")
+        assert json.loads(output.read_text())["presets"][0]["preset"] == "debug"
+
+    @patch("sys.stdout")
+    def test_main_prints_without_summary(self, mock_stdout: Any, timings_dir: Path) -> None:
+        with patch("sys.argv", ["timing_report.py", "--input-dir", str(timings_dir)]):
+            main()
+        assert any("## Build performance" in args[0] for args, _ in mock_stdout.write.call_args_list)
+
+    @patch("sys.stderr")
+    @patch("sys.exit")
+    def test_main_invalid_record(self, mock_exit: Any, mock_stderr: Any, tmp_path: Path) -> None:
+        (tmp_path / "broken.json").write_text("{")
+        with patch("sys.argv", ["timing_report.py", "--input-dir", str(tmp_path)]):
+            main()
+        assert any("Error:" in args[0] for args, _ in mock_stderr.write.call_args_list)
+        mock_exit.assert_called_with(1)
@@ -8,7 +8,7 @@ from pyfakefs.fake_filesystem_unittest import Patcher
 from pytest import FixtureRequest
 
 sys.path.insert(0, str(Path(__file__).parent.parent / ".github" / "scripts"))
-from validate_presets import main, parse_json, validate_presets
+from validate_presets import get_validator, main, parse_json, validate_presets
 
 
 class TestValidatePresets:
@@ -18,6 +18,16 @@ class TestValidatePresets:
             "debug": {"toolchain": "gcc", "artifact": {"path": ["build/tests", "!build/tests/broken_tests"], "retention_days": 7}},
             "release": {},
             "macos": {"runs-on": "macos-latest"},
+            "cached": {"cache": {"launcher": "sccache", "max_size": "2G"}},
+            "sharded": {"test": {"shards": 4}},
+            "parallel": {"parallel": "auto", "memory_per_job_mb": 2048},
+            "fixed": {"parallel": 8},
+            "shared_tree": {"related_presets": "all"},
+            "gate": {"critical": True},
+            "noisy": {"log_limit_mb": 10},
+            "fast": {"unity_build": True, "pch": False, "linker": "mold"},
+            "batched_unity": {"unity_build": 16},
+            "archived": {"artifact": {"archive": "tar.zst", "compression_level": 0}},
         }
 
     @pytest.fixture(scope="function")  # type: ignore
@@ -59,6 +69,16 @@ class TestValidatePresets:
             validate_presets(nested_invalid_presets)
         assert "Preset validation error @ debug -> artifact -> path: 123 is not of type 'array'" in str(e.value)
 
+    def test_validate_presets_invalid_cache_launcher(self) -> None:
+        with pytest.raises(ValueError) as e:
+            validate_presets({"debug": {"cache": {"launcher": "distcc"}}})
+        assert "Preset validation error @ debug -> cache -> launcher" in str(e.value)
+
+    def test_validate_presets_invalid_parallel(self) -> None:
+        with pytest.raises(ValueError) as e:
+            validate_presets({"debug": {"parallel": "max"}})
+        assert "Preset validation error @ debug -> parallel" in str(e.value)
+
     @patch("sys.argv", ["validate_presets.py", "--presets", "{}"])
     @patch("sys.stderr")
     @patch("sys.exit")
@@ -75,8 +95,28 @@ class TestValidatePresets:
         mock_validate.assert_called_once()
         assert any("Presets validation successful" in str(call_args) for call_args, _ in mock_stdout.write.call_args_list)
 
+    @pytest.mark.parametrize("config", [{"unity_build": 1}, {"unity_build": "on"}, {"linker": "ld64"}, {"pch": "yes"}])  # type: ignore
+    def test_validate_presets_invalid_build_acceleration(self, config: dict[str, Any]) -> None:
+        with pytest.raises(ValueError):
+            validate_presets({"debug": config})
+
+    def test_validate_presets_reports_all_errors(self) -> None:
+        with pytest.raises(ValueError) as e:
+            validate_presets({"debug": {"parallel": "max"}, "release": {"cache": {"launcher": "distcc"}}, "int": 1})
+
+        assert str(e.value).splitlines() == [
+            "Preset validation error @ debug -> parallel: 'max' is not valid under any of the given schemas",
+            "Preset validation error @ int: 1 is not of type 'object'",
+            "Preset validation error @ release -> cache -> launcher: 'distcc' is not one of ['ccache', 'sccache']",
+        ]
+
+    def test_get_validator_is_cached(self) -> None:
+        assert get_validator() is get_validator()
+
     def test_validate_presets_schema_not_found(self) -> None:
+        get_validator.cache_clear()
         with Patcher():
             with pytest.raises(ValueError) as e:
                 validate_presets({})
             assert "Schema file not found" in str(e.value)
+        get_validator.cache_clear()